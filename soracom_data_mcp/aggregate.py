@@ -0,0 +1,230 @@
+"""レコード集計 - フィルタ式とグループ集計をストリーミングで適用"""
+
+import math
+import operator
+import re
+from collections.abc import Callable, Iterable, Mapping
+from typing import Any
+
+# フィルタ式で使える比較演算子
+_OPERATORS: dict[str, Callable[[Any, Any], bool]] = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    ">=": operator.ge,
+    "<=": operator.le,
+    "=": operator.eq,
+    ">": operator.gt,
+    "<": operator.lt,
+}
+
+_FILTER_PATTERN = re.compile(r"^\s*([^=!<>\s]+)\s*(==|!=|>=|<=|=|>|<)\s*(.*?)\s*$")
+
+# 対応する集計関数
+AGGREGATE_FUNCTIONS = ("count", "sum", "avg", "min", "max")
+
+RecordFilter = Callable[[Mapping[str, Any]], bool]
+
+
+def get_field(record: Mapping[str, Any], path: str) -> Any:
+    """ドット区切りのパス（例: content.temp）でフィールドを取得"""
+    value: Any = record
+    for key in path.split("."):
+        if isinstance(value, Mapping):
+            value = value.get(key)
+        elif isinstance(value, list) and key.isdigit() and int(key) < len(value):
+            value = value[int(key)]
+        else:
+            return None
+    return value
+
+
+def to_number(value: Any) -> float | None:
+    """数値に変換（変換できない場合はNone）"""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return None
+
+
+def distribution(values: Iterable[float]) -> dict[str, float | None]:
+    """数値の分布（最小・中央値・90パーセンタイル・最大・平均、最近接順位法）"""
+    ordered = sorted(values)
+    if not ordered:
+        return dict.fromkeys(("min", "p50", "p90", "max", "mean"))
+
+    def quantile(q: float) -> float:
+        return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+    return {
+        "min": ordered[0],
+        "p50": quantile(0.5),
+        "p90": quantile(0.9),
+        "max": ordered[-1],
+        "mean": sum(ordered) / len(ordered),
+    }
+
+
+def compile_filter(expression: str) -> RecordFilter:
+    """フィルタ式（例: content.temp > 30）を判定関数にコンパイル
+
+    両辺が数値として解釈できる場合は数値比較、それ以外は文字列比較を行う
+    """
+    match = _FILTER_PATTERN.match(expression)
+    if not match:
+        raise ValueError(f"フィルタ式を解釈できません: {expression}")
+
+    path, op_symbol, raw_value = match.groups()
+    op = _OPERATORS[op_symbol]
+    expected = raw_value.strip("\"'")
+    expected_number = to_number(expected)
+
+    def _match(record: Mapping[str, Any]) -> bool:
+        actual = get_field(record, path)
+        if actual is None:
+            return False
+        if expected_number is not None:
+            actual_number = to_number(actual)
+            if actual_number is not None:
+                return op(actual_number, expected_number)
+        if isinstance(actual, bool):
+            actual = str(actual).lower()
+        try:
+            return op(str(actual), expected)
+        except TypeError:
+            return False
+
+    return _match
+
+
+def compile_filters(expressions: Iterable[str]) -> RecordFilter:
+    """複数のフィルタ式をAND条件で結合"""
+    predicates = [compile_filter(expression) for expression in expressions]
+
+    def _match_all(record: Mapping[str, Any]) -> bool:
+        return all(predicate(record) for predicate in predicates)
+
+    return _match_all
+
+
+def parse_metric(metric: str) -> tuple[str, str | None]:
+    """集計指定（例: avg:temp, count）を関数名とフィールドに分解"""
+    func, _, field = metric.partition(":")
+    func = func.strip().lower()
+    if func not in AGGREGATE_FUNCTIONS:
+        raise ValueError(f"未対応の集計関数です: {func}")
+    if func != "count" and not field:
+        raise ValueError(f"集計対象のフィールドを指定してください: {metric}")
+    return func, field.strip() or None
+
+
+def _group_key(value: Any) -> Any:
+    """グループキーとして使える値に変換（dict・listは文字列化）"""
+    if isinstance(value, (dict, list)):
+        return str(value)
+    return value
+
+
+class _Accumulator:
+    """1フィールド分の集計値"""
+
+    __slots__ = ("count", "max", "min", "sum")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.sum = 0.0
+        self.min: float | None = None
+        self.max: float | None = None
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.sum += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+
+class _Group:
+    """1グループ分の集計値"""
+
+    __slots__ = ("accumulators", "count")
+
+    def __init__(self, fields: list[str]) -> None:
+        self.count = 0
+        self.accumulators = {field: _Accumulator() for field in fields}
+
+
+class GroupAggregator:
+    """グループ単位の逐次集計
+
+    レコードを1件ずつ受け取り、グループごとの集計値だけを保持する。
+    メモリ使用量はグループ数に比例し、入力件数には依存しない。max_groups を
+    指定した場合は、上限に達した後に現れた新しいグループのレコードを集計せず
+    overflow_rows に数える
+    """
+
+    def __init__(
+        self, group_by: list[str], metrics: list[str], max_groups: int | None = None
+    ) -> None:
+        self.group_by = group_by
+        self.metrics = [parse_metric(metric) for metric in metrics]
+        self.fields = sorted({field for _, field in self.metrics if field})
+        self.max_groups = max_groups
+        self.overflow_rows = 0
+        self._groups: dict[tuple[Any, ...], _Group] = {}
+
+    def add(self, record: Mapping[str, Any]) -> None:
+        """レコードを集計に追加"""
+        key = tuple(
+            _group_key(get_field(record, field)) for field in self.group_by
+        )
+        group = self._groups.get(key)
+        if group is None:
+            if self.max_groups is not None and len(self._groups) >= self.max_groups:
+                self.overflow_rows += 1
+                return
+            group = self._groups[key] = _Group(self.fields)
+
+        group.count += 1
+        for field in self.fields:
+            value = to_number(get_field(record, field))
+            if value is not None:
+                group.accumulators[field].add(value)
+
+    def __len__(self) -> int:
+        return len(self._groups)
+
+    def rows(self, limit: int | None = None) -> list[dict[str, Any]]:
+        """集計結果を件数の多い順に返す"""
+        ordered = sorted(
+            self._groups.items(), key=lambda item: item[1].count, reverse=True
+        )
+        if limit is not None:
+            ordered = ordered[:limit]
+
+        rows = []
+        for key, group in ordered:
+            row: dict[str, Any] = dict(zip(self.group_by, key, strict=True))
+            for func, field in self.metrics:
+                if field is None:
+                    row["count"] = group.count
+                    continue
+                acc = group.accumulators[field]
+                if func == "count":
+                    row[f"count:{field}"] = acc.count
+                elif func == "sum":
+                    row[f"sum:{field}"] = acc.sum
+                elif func == "avg":
+                    row[f"avg:{field}"] = acc.sum / acc.count if acc.count else None
+                elif func == "min":
+                    row[f"min:{field}"] = acc.min
+                elif func == "max":
+                    row[f"max:{field}"] = acc.max
+            rows.append(row)
+        return rows
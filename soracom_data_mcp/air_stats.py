@@ -0,0 +1,163 @@
+"""Air通信統計 - SIMごとの通信量の取得と集計"""
+
+import heapq
+from collections.abc import Iterable
+from typing import Any
+
+from soracom_data_mcp.client import SoracomApiError, soracom_client
+from soracom_data_mcp.parallel import run_concurrently
+
+# 通信量の集計項目（APIのフィールド名 -> 集計結果の項目名）
+USAGE_FIELDS = {
+    "uploadByteSizeTotal": "upload_bytes",
+    "downloadByteSizeTotal": "download_bytes",
+    "uploadPacketSizeTotal": "upload_packets",
+    "downloadPacketSizeTotal": "download_packets",
+}
+
+# period=minutes で1回のリクエストに指定する期間の上限（秒）
+MINUTES_CHUNK_SECONDS = 86400
+
+
+def stat_summary(stat: dict[str, Any]) -> dict[str, Any]:
+    """Air統計APIのレスポンスを共通形式に変換"""
+    return {
+        "date": stat.get("date"),
+        **{name: stat.get(field) for field, name in USAGE_FIELDS.items()},
+    }
+
+
+def split_time_range(
+    from_time: int, to_time: int, chunk_seconds: int
+) -> list[tuple[int, int]]:
+    """期間を chunk_seconds ごとの連続した区間に分割（境界の時刻は両側に含まれる）"""
+    ranges = []
+    start = from_time
+    while True:
+        end = min(start + chunk_seconds, to_time)
+        ranges.append((start, end))
+        if end >= to_time:
+            return ranges
+        start = end
+
+
+def _date_key(date: Any) -> tuple[int, float, str]:
+    """date の並べ替えキー（UNIXタイムスタンプは数値、それ以外は文字列で比較）"""
+    if isinstance(date, int | float):
+        return 0, float(date), ""
+    return 1, 0.0, str(date)
+
+
+def merge_stats(chunks: Iterable[list[dict[str, Any]]]) -> list[dict[str, Any]]:
+    """区間ごとの統計を結合し、date の重複を除いて date 順に並べる"""
+    merged: dict[Any, dict[str, Any]] = {}
+    for stats in chunks:
+        for stat in stats:
+            merged[stat.get("date")] = stat
+    return sorted(merged.values(), key=lambda stat: _date_key(stat.get("date")))
+
+
+def _hour_key(date: Any) -> Any:
+    """分単位の統計の date を時単位にまとめるキー
+
+    UNIXタイムスタンプは時の始まりに切り捨て、"yyyyMMddHHmm" 形式の文字列は
+    先頭の "yyyyMMddHH" にする
+    """
+    if isinstance(date, int | float):
+        return int(date) - int(date) % 3600
+    if isinstance(date, str) and len(date) >= 12 and date.isdigit():
+        return date[:10]
+    return date
+
+
+def rollup_to_hours(stats: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """分単位の共通形式の統計を時単位に合計"""
+    hours: dict[Any, dict[str, Any]] = {}
+    for stat in stats:
+        key = _hour_key(stat.get("date"))
+        hour = hours.setdefault(
+            key, {"date": key, **{name: 0 for name in USAGE_FIELDS.values()}}
+        )
+        for name in USAGE_FIELDS.values():
+            hour[name] += int(stat.get(name) or 0)
+    return list(hours.values())
+
+
+def _fetch_range(
+    imsi: str, from_time: int, to_time: int, period: str
+) -> list[dict[str, Any]]:
+    """1回のリクエストでAir統計を取得
+
+    Raises:
+        SoracomApiError: レスポンスが統計の配列でない場合
+    """
+    response = soracom_client.get(
+        f"/stats/air/subscribers/{imsi}",
+        params={"from": from_time, "to": to_time, "period": period},
+    )
+    if not isinstance(response, list):
+        raise SoracomApiError(f"Air統計のレスポンスが配列ではありません: {response}")
+    return [stat_summary(stat) for stat in response if isinstance(stat, dict)]
+
+
+def fetch_air_stats(
+    imsi: str,
+    from_time: int,
+    to_time: int,
+    period: str = "day",
+    concurrent: bool = True,
+) -> list[dict[str, Any]]:
+    """SIMのAir統計を取得（共通形式のリスト）
+
+    period=minutes で期間が長い場合は1日ごとに分割して取得し、
+    結合して date の重複を除く
+
+    Args:
+        imsi: SIMのIMSI
+        from_time: 取得開始時刻（UNIXタイムスタンプ・秒）
+        to_time: 取得終了時刻（UNIXタイムスタンプ・秒）
+        period: 集計期間（minutes, day, month）
+        concurrent: 分割した区間を並列に取得する（SIMごとに並列化している
+            呼び出し元では False にし、同時リクエスト数を
+            SORACOM_MAX_CONCURRENCY に収める）
+    """
+    if period != "minutes" or to_time - from_time <= MINUTES_CHUNK_SECONDS:
+        return _fetch_range(imsi, from_time, to_time, period)
+
+    ranges = split_time_range(from_time, to_time, MINUTES_CHUNK_SECONDS)
+    if not concurrent:
+        return merge_stats(
+            _fetch_range(imsi, start, end, period) for start, end in ranges
+        )
+
+    results = run_concurrently(
+        lambda r: _fetch_range(imsi, r[0], r[1], period), ranges
+    )
+    chunks = []
+    for result in results:
+        if isinstance(result, SoracomApiError):
+            raise result
+        chunks.append(result)
+    return merge_stats(chunks)
+
+
+def empty_usage() -> dict[str, int]:
+    """通信量の集計の初期値"""
+    return {name: 0 for name in USAGE_FIELDS.values()} | {"total_bytes": 0}
+
+
+def add_usage(usage: dict[str, int], stats: list[dict[str, Any]]) -> dict[str, int]:
+    """共通形式の統計を通信量の集計に加算（usage を更新して返す）"""
+    for stat in stats:
+        for name in USAGE_FIELDS.values():
+            usage[name] += int(stat.get(name) or 0)
+    usage["total_bytes"] = usage["upload_bytes"] + usage["download_bytes"]
+    return usage
+
+
+def top_consumers(
+    usages: dict[str, dict[str, Any]], top_n: int, key: str = "total_bytes"
+) -> list[dict[str, Any]]:
+    """通信量の多いSIMを上位N件返す（ヒープで選択）"""
+    heaviest = heapq.nlargest(top_n, usages.items(), key=lambda item: item[1][key])
+    return [{"imsi": imsi, **usage} for imsi, usage in heaviest]
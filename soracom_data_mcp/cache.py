@@ -0,0 +1,74 @@
+"""インメモリキャッシュ - 有効期限付きのキャッシュ"""
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+from typing import Generic, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """有効期限付きのLRUキャッシュ
+
+    エントリごとに有効期限（UNIXタイムスタンプ・秒）を持ち、期限切れの
+    エントリは取得時に破棄する。max_size を超えた場合は最も古く使われた
+    エントリから削除する
+    """
+
+    def __init__(self, ttl_seconds: float, max_size: int = 1024) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._entries: OrderedDict[K, tuple[V, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: K) -> V | None:
+        """有効なエントリを取得（期限切れ・未登録の場合はNone）"""
+        entry = self.get_entry(key)
+        return None if entry is None else entry[0]
+
+    def get_entry(self, key: K) -> tuple[V, float] | None:
+        """有効なエントリを有効期限とともに取得"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[1] <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(
+        self,
+        key: K,
+        value: V,
+        ttl_seconds: float | None = None,
+        expires_at: float | None = None,
+    ) -> None:
+        """エントリを登録（expires_at を指定した場合は ttl_seconds より優先）"""
+        if expires_at is None:
+            ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+            expires_at = time.time() + ttl
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def pop(self, key: K) -> V | None:
+        """エントリを削除して返す"""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+        return None if entry is None else entry[0]
+
+    def clear(self) -> None:
+        """全エントリを削除"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
@@ -1,6 +1,10 @@
 """SORACOM APIクライアント"""
 
+import io
+import threading
 import time
+from collections.abc import Iterator
+from pathlib import Path
 from typing import Any
 
 import httpx
@@ -17,6 +21,29 @@ class SoracomApiError(Exception):
         super().__init__(message)
 
 
+class _ChunkReader(io.RawIOBase):
+    """バイト列のイテレータを読み込み可能なストリームとして扱う"""
+
+    def __init__(self, chunks: Iterator[bytes]) -> None:
+        self._chunks = chunks
+        self._pending = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: Any) -> int:
+        while not self._pending:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return 0
+            self._pending = chunk
+        view = memoryview(buffer).cast("B")
+        size = min(len(view), len(self._pending))
+        view[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+
 class SoracomClient:
     """SORACOM APIクライアントラッパー"""
 
@@ -25,6 +52,8 @@ class SoracomClient:
         self._token: str | None = None
         self._token_expires_at: float = 0
         self._client: httpx.Client | None = None
+        # 並列リクエスト時に認証が重複しないようにするためのロック
+        self._auth_lock = threading.Lock()
 
     @property
     def client(self) -> httpx.Client:
@@ -39,7 +68,11 @@ class SoracomClient:
         if self._token and time.time() < self._token_expires_at - 300:
             return
 
-        self._authenticate()
+        with self._auth_lock:
+            # ロック待ちの間に他スレッドが認証済みなら再認証しない
+            if self._token and time.time() < self._token_expires_at - 300:
+                return
+            self._authenticate()
 
     def _authenticate(self) -> None:
         """SORACOM APIで認証してトークンを取得"""
@@ -80,14 +113,14 @@ class SoracomClient:
             "Content-Type": "application/json",
         }
 
-    def request(
+    def _send(
         self,
         method: str,
         path: str,
         params: dict[str, Any] | None = None,
         json: dict[str, Any] | None = None,
-    ) -> dict[str, Any] | list[Any]:
-        """汎用APIリクエスト"""
+    ) -> httpx.Response:
+        """APIリクエストを送信し、エラーレスポンスを例外に変換"""
         url = f"{settings.api_endpoint}{path}"
         headers = self._get_headers()
 
@@ -110,12 +143,58 @@ class SoracomClient:
                 status_code=response.status_code,
             )
 
+        return response
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        params: dict[str, Any] | None = None,
+        json: dict[str, Any] | None = None,
+    ) -> dict[str, Any] | list[Any]:
+        """汎用APIリクエスト"""
+        response = self._send(method, path, params=params, json=json)
+
         if response.status_code == 204:
             return {}
 
         result: dict[str, Any] | list[Any] = response.json()
         return result
 
+    def get_page(
+        self, path: str, params: dict[str, Any] | None = None
+    ) -> tuple[list[Any], str | None]:
+        """ページング対応のGETリクエスト
+
+        Returns:
+            結果のリストと次ページのキー（x-soracom-next-key、最終ページはNone）
+        """
+        response = self._send("GET", path, params=params)
+        if response.status_code == 204:
+            return [], None
+
+        result = response.json()
+        items = result if isinstance(result, list) else [result]
+        next_key = response.headers.get("x-soracom-next-key") or None
+        return items, next_key
+
+    def iter_pages(
+        self,
+        path: str,
+        params: dict[str, Any] | None = None,
+        max_pages: int | None = None,
+    ) -> Iterator[list[Any]]:
+        """全ページを順に取得（max_pagesで取得ページ数を制限）"""
+        page_params = dict(params or {})
+        pages = 0
+        while True:
+            items, next_key = self.get_page(path, params=page_params)
+            yield items
+            pages += 1
+            if not next_key or (max_pages is not None and pages >= max_pages):
+                return
+            page_params["last_evaluated_key"] = next_key
+
     def get(
         self, path: str, params: dict[str, Any] | None = None
     ) -> dict[str, Any] | list[Any]:
@@ -131,6 +210,104 @@ class SoracomClient:
         """POSTリクエスト"""
         return self.request("POST", path, params=params, json=json)
 
+    def fetch_byte_range(
+        self, url: str, start: int | None, length: int
+    ) -> tuple[bytes, int | None]:
+        """署名付きURLからRangeリクエストで部分取得
+
+        Args:
+            url: ダウンロードURL（SORACOM APIの認証ヘッダーは付与しない）
+            start: 開始オフセット（None の場合は末尾 length バイト）
+            length: 取得バイト数
+
+        Returns:
+            取得したバイト列とオブジェクト全体のサイズ（不明な場合はNone）
+        """
+        if start is None:
+            byte_range = f"bytes=-{length}"
+        else:
+            byte_range = f"bytes={start}-{start + length - 1}"
+
+        with self.client.stream("GET", url, headers={"Range": byte_range}) as response:
+            if response.status_code >= 400:
+                response.read()
+                raise SoracomApiError(
+                    f"ダウンロードエラー: {response.text}",
+                    status_code=response.status_code,
+                )
+
+            total_size: int | None = None
+            if response.status_code == 206:
+                # Content-Range: bytes 0-4095/2147483648
+                content_range = response.headers.get("Content-Range", "")
+                total = content_range.rpartition("/")[2]
+                if total.isdigit():
+                    total_size = int(total)
+            else:
+                # Rangeが無視された場合は先頭からのみ安全に切り出せる
+                if start is None or start > 0:
+                    raise SoracomApiError(
+                        "ダウンロード先がRangeリクエストに対応していません",
+                        status_code=response.status_code,
+                    )
+                content_length = response.headers.get("Content-Length", "")
+                if content_length.isdigit():
+                    total_size = int(content_length)
+
+            # 全体を転送しないよう、必要なバイト数に達したら打ち切る
+            buffer = bytearray()
+            for chunk in response.iter_bytes():
+                buffer.extend(chunk)
+                if len(buffer) >= length:
+                    break
+
+        return bytes(buffer[:length]), total_size
+
+    def download_file(self, url: str, destination: Path) -> int:
+        """署名付きURLの内容をファイルにストリーミング保存
+
+        書き込み途中のファイルが残らないよう、一時ファイルに書いてから置き換える
+
+        Returns:
+            保存したバイト数
+        """
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        partial_path = destination.with_name(destination.name + ".part")
+        size = 0
+        with self.client.stream("GET", url) as response:
+            if response.status_code >= 400:
+                response.read()
+                raise SoracomApiError(
+                    f"ダウンロードエラー: {response.text}",
+                    status_code=response.status_code,
+                )
+            with partial_path.open("wb") as f:
+                for chunk in response.iter_bytes():
+                    f.write(chunk)
+                    size += len(chunk)
+        partial_path.replace(destination)
+        return size
+
+    def iter_lines(self, url: str) -> Iterator[str]:
+        """署名付きURLの内容を行単位でストリーミング取得
+
+        UTF-8テキストとしてデコードし、行末の改行は残す（csv モジュールが
+        引用符で囲まれたフィールド内の改行を扱えるようにする）
+        """
+        with self.client.stream("GET", url) as response:
+            if response.status_code >= 400:
+                response.read()
+                raise SoracomApiError(
+                    f"ダウンロードエラー: {response.text}",
+                    status_code=response.status_code,
+                )
+            yield from io.TextIOWrapper(
+                io.BufferedReader(_ChunkReader(response.iter_bytes())),
+                encoding="utf-8-sig",
+                errors="replace",
+                newline="",
+            )
+
 
 # シングルトンインスタンス
 soracom_client = SoracomClient()
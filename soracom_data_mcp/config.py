@@ -1,5 +1,7 @@
 """設定管理 - 環境変数から認証情報等を読み込み"""
 
+from pathlib import Path
+
 from pydantic_settings import BaseSettings
 
 
@@ -13,6 +15,15 @@ class Settings(BaseSettings):
     # カバレッジタイプ（jp: 日本, g: グローバル）
     soracom_coverage: str = "jp"
 
+    # ローカルキャッシュの保存先（未指定時は ~/.cache/soracom-data-mcp）
+    soracom_cache_dir: str | None = None
+
+    # 並列APIリクエスト数の上限
+    soracom_max_concurrency: int = 8
+
+    # エクスポートした画像・動画のローカル保存容量の上限（MB）
+    soracom_media_cache_max_mb: int = 1024
+
     model_config = {
         "env_prefix": "",  # 環境変数のプレフィックスなし
         "case_sensitive": False,
@@ -25,6 +36,13 @@ class Settings(BaseSettings):
             return "https://g.api.soracom.io/v1"
         return "https://api.soracom.io/v1"
 
+    @property
+    def cache_dir(self) -> Path:
+        """ローカルキャッシュのディレクトリを返す"""
+        if self.soracom_cache_dir:
+            return Path(self.soracom_cache_dir).expanduser()
+        return Path.home() / ".cache" / "soracom-data-mcp"
+
 
 # シングルトンインスタンス
 settings = Settings()
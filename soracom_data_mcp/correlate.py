@@ -0,0 +1,68 @@
+"""時系列の突き合わせ - 時刻順に並んだ2系列のas-of結合"""
+
+from collections import deque
+from collections.abc import Iterable, Iterator
+from typing import TypeVar
+
+L = TypeVar("L")
+R = TypeVar("R")
+
+# 結合の方向（nearest: 最も近い, backward: 直前, forward: 直後）
+DIRECTIONS = ("nearest", "backward", "forward")
+
+
+def asof_join(
+    left: Iterable[tuple[int, L]],
+    right: Iterable[tuple[int, R]],
+    tolerance: int,
+    direction: str = "nearest",
+) -> Iterator[tuple[L, R, int]]:
+    """時刻順の2系列を、左の各要素に許容範囲内の右の要素を1件対応させて結合
+
+    両系列を1回ずつ先頭から読み進めるソート済みマージで結合する。
+    右の系列は許容範囲内の要素だけをバッファに持つため、長い系列でも
+    メモリ使用量は許容範囲内の件数に比例する
+
+    Args:
+        left: (時刻, 値) の昇順の系列
+        right: (時刻, 値) の昇順の系列
+        tolerance: 時刻差の許容範囲（左右の系列と同じ単位）
+        direction: nearest（前後で最も近い）, backward（左の時刻以前）,
+            forward（左の時刻以降）
+
+    Yields:
+        (左の値, 右の値, 右の時刻 - 左の時刻)。対応する要素がない左の要素は返さない
+    """
+    if direction not in DIRECTIONS:
+        raise ValueError(f"direction は {', '.join(DIRECTIONS)} のいずれかです")
+
+    right_iter = iter(right)
+    window: deque[tuple[int, R]] = deque()
+    exhausted = False
+    lookahead = 0 if direction == "backward" else tolerance
+    lookbehind = 0 if direction == "forward" else tolerance
+
+    for time, value in left:
+        # 許容範囲より前の要素は以降の左の要素にも対応しないので捨てる
+        while window and window[0][0] < time - lookbehind:
+            window.popleft()
+        # 左の時刻 + 許容範囲までの右の要素をバッファに読み込む
+        # （左の要素の間隔が空いていても、許容範囲より前の要素は読み飛ばす）
+        while not exhausted and (not window or window[-1][0] <= time + lookahead):
+            item = next(right_iter, None)
+            if item is None:
+                exhausted = True
+                break
+            if item[0] >= time - lookbehind:
+                window.append(item)
+
+        in_range = [item for item in window if item[0] <= time + lookahead]
+        if not in_range:
+            continue
+        if direction == "backward":
+            best = in_range[-1]
+        elif direction == "forward":
+            best = in_range[0]
+        else:
+            best = min(in_range, key=lambda item: abs(item[0] - time))
+        yield value, best[1], best[0] - time
@@ -0,0 +1,250 @@
+"""ソラカメイベントストア - イベント履歴のローカル保存と差分同期"""
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from soracom_data_mcp.soracam_events import fetch_event_page
+from soracom_data_mcp.storage import database_path, open_database
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    device_id TEXT NOT NULL,
+    event_id TEXT NOT NULL,
+    event_type TEXT,
+    time INTEGER NOT NULL,
+    PRIMARY KEY (device_id, event_id)
+);
+CREATE INDEX IF NOT EXISTS events_device_time ON events (device_id, time);
+CREATE TABLE IF NOT EXISTS sync_state (
+    device_id TEXT PRIMARY KEY,
+    synced_from INTEGER NOT NULL,
+    synced_to INTEGER NOT NULL
+);
+"""
+
+# ヒートマップの集計単位（ミリ秒）
+BUCKET_MILLISECONDS = {"hour": 3_600_000, "day": 86_400_000}
+
+
+class SoracamEventStore:
+    """ソラカメのイベント履歴をデバイスごとにSQLiteへ保存するストア
+
+    同期済みの期間（synced_from〜synced_to）をデバイスごとに記録し、
+    2回目以降は保存済みの最新イベント以降だけをAPIから取得する。
+    同期済みの期間内の検索・集計はAPIを呼ばずにローカルで行う
+    """
+
+    def __init__(self, path: Path | None = None) -> None:
+        self._path = path
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """データベース接続を取得（遅延初期化）"""
+        if self._conn is None:
+            self._conn = open_database(self._path or database_path("soracam_events"))
+            self._conn.executescript(_SCHEMA)
+        return self._conn
+
+    def _fetch_range(self, device_id: str, from_time: int, to_time: int) -> int:
+        """指定期間のイベントを古い順に全ページ取得して保存"""
+        stored = 0
+        next_key: str | None = None
+        while True:
+            events, next_key = fetch_event_page(
+                device_id,
+                from_time,
+                to_time,
+                sort="asc",
+                last_evaluated_key=next_key,
+            )
+            with self._lock, self.conn:
+                before = self.conn.total_changes
+                self.conn.executemany(
+                    "INSERT OR IGNORE INTO events"
+                    " (device_id, event_id, event_type, time) VALUES (?, ?, ?, ?)",
+                    [
+                        (
+                            device_id,
+                            str(event["event_id"] or event["timestamp"]),
+                            event["event_type"],
+                            event["timestamp"],
+                        )
+                        for event in events
+                    ],
+                )
+                stored += self.conn.total_changes - before
+            if not next_key:
+                return stored
+
+    def sync(
+        self, device_id: str, since: int, now: int | None = None
+    ) -> dict[str, Any]:
+        """デバイスのイベントを差分同期
+
+        Args:
+            device_id: デバイスID
+            since: 同期対象の開始時刻（UNIXタイムスタンプ・ミリ秒）
+            now: 同期対象の終了時刻（未指定時は現在時刻）
+
+        Returns:
+            新たに保存したイベント数と同期済みの期間
+        """
+        now = now if now is not None else int(time.time() * 1000)
+        with self._lock:
+            state = self.conn.execute(
+                "SELECT synced_from, synced_to FROM sync_state WHERE device_id = ?",
+                (device_id,),
+            ).fetchone()
+            newest = self.conn.execute(
+                "SELECT MAX(time) AS newest FROM events WHERE device_id = ?",
+                (device_id,),
+            ).fetchone()["newest"]
+
+        stored = 0
+        if state is None:
+            stored += self._fetch_range(device_id, since, now)
+            synced_from = since
+        else:
+            synced_from = state["synced_from"]
+            # 同期済み期間より前が要求された場合は不足分を遡って取得
+            if since < synced_from:
+                stored += self._fetch_range(device_id, since, synced_from)
+                synced_from = since
+            # 保存済みの最新イベント以降を取得（同時刻のイベントは主キーで重複排除）
+            forward_from = newest if newest is not None else state["synced_to"]
+            stored += self._fetch_range(device_id, forward_from, now)
+
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO sync_state (device_id, synced_from, synced_to)"
+                " VALUES (?, ?, ?)",
+                (device_id, synced_from, now),
+            )
+
+        return {
+            "device_id": device_id,
+            "new_events": stored,
+            "synced_from": synced_from,
+            "synced_to": now,
+        }
+
+    def _where(
+        self,
+        device_ids: list[str] | None,
+        from_time: int | None,
+        to_time: int | None,
+        event_type: str | None,
+    ) -> tuple[str, list[Any]]:
+        """検索条件のWHERE句とパラメータを組み立てる"""
+        clauses = []
+        params: list[Any] = []
+        if device_ids:
+            clauses.append(f"device_id IN ({', '.join('?' * len(device_ids))})")
+            params.extend(device_ids)
+        if from_time is not None:
+            clauses.append("time >= ?")
+            params.append(from_time)
+        if to_time is not None:
+            clauses.append("time <= ?")
+            params.append(to_time)
+        if event_type:
+            clauses.append("event_type = ?")
+            params.append(event_type)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        return where, params
+
+    def query(
+        self,
+        device_ids: list[str] | None = None,
+        from_time: int | None = None,
+        to_time: int | None = None,
+        event_type: str | None = None,
+        sort: str = "desc",
+        limit: int = 100,
+    ) -> list[dict[str, Any]]:
+        """保存済みのイベントを検索"""
+        where, params = self._where(device_ids, from_time, to_time, event_type)
+        order = "ASC" if sort == "asc" else "DESC"
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT device_id, event_id, event_type, time FROM events"
+                f"{where} ORDER BY time {order}, device_id LIMIT ?",
+                (*params, limit),
+            ).fetchall()
+        return [
+            {
+                "event_id": row["event_id"],
+                "device_id": row["device_id"],
+                "event_type": row["event_type"],
+                "timestamp": row["time"],
+            }
+            for row in rows
+        ]
+
+    def heatmap(
+        self,
+        device_ids: list[str] | None = None,
+        from_time: int | None = None,
+        to_time: int | None = None,
+        event_type: str | None = None,
+        bucket: str = "hour",
+        utc_offset_minutes: int = 0,
+        max_buckets: int | None = None,
+    ) -> dict[str, Any]:
+        """保存済みのイベント数を時間帯ごとに集計
+
+        Returns:
+            バケットの開始時刻（UTC・ミリ秒）のリストと、デバイスごとの件数の並び
+
+        Raises:
+            ValueError: 最初と最後のイベントの間のバケット数が max_buckets を超える場合
+        """
+        size = BUCKET_MILLISECONDS[bucket]
+        offset = utc_offset_minutes * 60_000
+        where, params = self._where(device_ids, from_time, to_time, event_type)
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT device_id, ((time + ?) / ?) * ? - ? AS bucket_start,"
+                f" COUNT(*) AS count FROM events{where}"
+                " GROUP BY device_id, bucket_start",
+                (offset, size, size, offset, *params),
+            ).fetchall()
+
+        # イベントのない時間帯も0件として並べる
+        observed = [row["bucket_start"] for row in rows]
+        if not observed:
+            return {"bucket_starts": [], "counts": {}}
+        first, last = min(observed), max(observed)
+        if max_buckets is not None and (last - first) // size + 1 > max_buckets:
+            raise ValueError(
+                f"時間帯の数が上限（{max_buckets}）を超えています。"
+                "from_time・to_time で期間を絞るか bucket=day を指定してください"
+            )
+        bucket_starts = list(range(first, last + 1, size))
+        positions = {start: i for i, start in enumerate(bucket_starts)}
+        counts: dict[str, list[int]] = {}
+        for row in rows:
+            series = counts.setdefault(row["device_id"], [0] * len(bucket_starts))
+            series[positions[row["bucket_start"]]] = row["count"]
+        return {"bucket_starts": bucket_starts, "counts": counts}
+
+    def sync_states(self) -> dict[str, dict[str, int]]:
+        """デバイスごとの同期済み期間を返す"""
+        with self._lock:
+            rows = self.conn.execute("SELECT * FROM sync_state").fetchall()
+        return {
+            row["device_id"]: {
+                "synced_from": row["synced_from"],
+                "synced_to": row["synced_to"],
+            }
+            for row in rows
+        }
+
+
+# シングルトンインスタンス
+soracam_event_store = SoracamEventStore()
@@ -0,0 +1,274 @@
+"""ソラカメエクスポートキュー - 録画エクスポートジョブの永続化と再開"""
+
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+from soracom_data_mcp.client import SoracomApiError, handle_soracom_error
+from soracom_data_mcp.parallel import run_concurrently
+from soracom_data_mcp.soracam_exports import (
+    POLL_BACKOFF_FACTOR,
+    POLL_INITIAL_INTERVAL,
+    POLL_MAX_INTERVAL,
+    get_export_status,
+    is_finished,
+)
+from soracom_data_mcp.storage import database_path, open_database
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS export_jobs (
+    export_id TEXT PRIMARY KEY,
+    device_id TEXT NOT NULL,
+    from_time INTEGER NOT NULL,
+    to_time INTEGER NOT NULL,
+    status TEXT,
+    url TEXT,
+    error TEXT,
+    finished INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    next_poll_at REAL NOT NULL,
+    poll_interval REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS export_jobs_window
+    ON export_jobs (device_id, from_time, to_time);
+CREATE INDEX IF NOT EXISTS export_jobs_pending ON export_jobs (finished, next_poll_at);
+"""
+
+# 作成からこの秒数を過ぎても終了しないジョブは失敗としてポーリングを打ち切る
+MAX_JOB_AGE_SECONDS = 6 * 3600
+
+logger = logging.getLogger(__name__)
+
+_COLUMNS = (
+    "export_id, device_id, from_time, to_time, status, url, error, finished,"
+    " created_at, updated_at"
+)
+
+
+def _job(row: sqlite3.Row) -> dict[str, Any]:
+    """ジョブの行を辞書に変換"""
+    job = dict(row)
+    job["finished"] = bool(job["finished"])
+    return job
+
+
+class SoracamExportQueue:
+    """ソラカメの録画エクスポートジョブをSQLiteに保存するキュー
+
+    開始したエクスポートを記録しておき、未完了のジョブはワーカーが
+    バックオフしながらポーリングを続ける。プロセスを再起動しても
+    未完了のジョブのポーリングを再開し、同じ範囲の重複エクスポートを防ぐ
+    """
+
+    def __init__(self, path: Path | None = None) -> None:
+        self._path = path
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """データベース接続を取得（遅延初期化）"""
+        if self._conn is None:
+            self._conn = open_database(self._path or database_path("soracam_exports"))
+            self._conn.executescript(_SCHEMA)
+        return self._conn
+
+    def find_pending(
+        self, device_id: str, from_time: int, to_time: int
+    ) -> dict[str, Any] | None:
+        """同じデバイス・同じ範囲の未完了ジョブを返す"""
+        with self._lock:
+            row = self.conn.execute(
+                f"SELECT {_COLUMNS} FROM export_jobs"
+                " WHERE device_id = ? AND from_time = ? AND to_time = ?"
+                " AND finished = 0 ORDER BY created_at DESC LIMIT 1",
+                (device_id, from_time, to_time),
+            ).fetchone()
+        return None if row is None else _job(row)
+
+    def record(
+        self, device_id: str, from_time: int, to_time: int, export: dict[str, Any]
+    ) -> dict[str, Any] | None:
+        """開始したエクスポートをジョブとして保存（export_id がなければ保存しない）"""
+        export_id = export.get("export_id")
+        if not export_id:
+            return None
+        now = time.time()
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO export_jobs"
+                " (export_id, device_id, from_time, to_time, status, url, error,"
+                " finished, created_at, updated_at, next_poll_at, poll_interval)"
+                " VALUES (?, ?, ?, ?, ?, ?, NULL, ?, ?, ?, ?, ?)",
+                (
+                    export_id,
+                    device_id,
+                    from_time,
+                    to_time,
+                    export.get("status"),
+                    export.get("url"),
+                    int(is_finished(export)),
+                    now,
+                    now,
+                    now + POLL_INITIAL_INTERVAL,
+                    POLL_INITIAL_INTERVAL,
+                ),
+            )
+        return self.get(export_id)
+
+    def get(self, export_id: str) -> dict[str, Any] | None:
+        """エクスポートIDでジョブを取得"""
+        with self._lock:
+            row = self.conn.execute(
+                f"SELECT {_COLUMNS} FROM export_jobs WHERE export_id = ?",
+                (export_id,),
+            ).fetchone()
+        return None if row is None else _job(row)
+
+    def update(self, export: dict[str, Any], error: str | None = None) -> None:
+        """ポーリング結果でジョブを更新し、未完了なら次回のポーリング時刻を延ばす"""
+        now = time.time()
+        finished = is_finished(export)
+        with self._lock, self.conn:
+            self.conn.execute(
+                "UPDATE export_jobs SET status = COALESCE(?, status),"
+                " url = COALESCE(?, url), error = ?, finished = ?, updated_at = ?,"
+                " poll_interval = MIN(poll_interval * ?, ?),"
+                " next_poll_at = ? + MIN(poll_interval * ?, ?)"
+                " WHERE export_id = ?",
+                (
+                    export.get("status"),
+                    export.get("url"),
+                    error,
+                    int(finished),
+                    now,
+                    POLL_BACKOFF_FACTOR,
+                    POLL_MAX_INTERVAL,
+                    now,
+                    POLL_BACKOFF_FACTOR,
+                    POLL_MAX_INTERVAL,
+                    export.get("export_id"),
+                ),
+            )
+
+    def jobs(
+        self,
+        device_id: str | None = None,
+        status: str | None = None,
+        pending_only: bool = False,
+        limit: int = 100,
+    ) -> list[dict[str, Any]]:
+        """ジョブを新しい順に検索"""
+        clauses = []
+        params: list[Any] = []
+        if device_id:
+            clauses.append("device_id = ?")
+            params.append(device_id)
+        if status:
+            clauses.append("status = ?")
+            params.append(status)
+        if pending_only:
+            clauses.append("finished = 0")
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            rows = self.conn.execute(
+                f"SELECT {_COLUMNS} FROM export_jobs{where}"
+                " ORDER BY created_at DESC LIMIT ?",
+                (*params, limit),
+            ).fetchall()
+        return [_job(row) for row in rows]
+
+    def _poll_job(self, job: dict[str, Any]) -> None:
+        """1ジョブの状況を取得して更新"""
+        try:
+            export = get_export_status(job["device_id"], job["export_id"])
+        except SoracomApiError as e:
+            # 存在しないエクスポートはポーリングを打ち切る
+            status = "failed" if e.status_code == 404 else None
+            self.update(
+                {"export_id": job["export_id"], "status": status},
+                error=handle_soracom_error(e),
+            )
+            return
+        except (httpx.HTTPError, ValueError) as e:
+            # 通信エラーや不正なレスポンスは次回のポーリングで再試行する
+            logger.warning("エクスポート %s のポーリングに失敗: %s", job["export_id"], e)
+            self.update({"export_id": job["export_id"], "status": None}, error=str(e))
+            return
+        self.update({**export, "export_id": job["export_id"]})
+
+    def expire_stale(self) -> int:
+        """作成から MAX_JOB_AGE_SECONDS を過ぎた未完了ジョブを失敗にする
+
+        Returns:
+            失敗にしたジョブ数
+        """
+        now = time.time()
+        with self._lock, self.conn:
+            cursor = self.conn.execute(
+                "UPDATE export_jobs SET status = 'failed', error = ?, finished = 1,"
+                " updated_at = ? WHERE finished = 0 AND created_at < ?",
+                (
+                    f"{MAX_JOB_AGE_SECONDS}秒以内に完了しませんでした",
+                    now,
+                    now - MAX_JOB_AGE_SECONDS,
+                ),
+            )
+        return cursor.rowcount
+
+    def poll_due(self, force: bool = False) -> int:
+        """ポーリング時刻を過ぎた未完了ジョブを並列にポーリング
+
+        Args:
+            force: Trueの場合はポーリング時刻に関係なく全ての未完了ジョブを対象にする
+
+        Returns:
+            ポーリングしたジョブ数
+        """
+        self.expire_stale()
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT export_id, device_id FROM export_jobs"
+                " WHERE finished = 0 AND next_poll_at <= ?",
+                (float("inf") if force else time.time(),),
+            ).fetchall()
+        run_concurrently(self._poll_job, [dict(row) for row in rows])
+        return len(rows)
+
+    def seconds_until_next_poll(self) -> float | None:
+        """次にポーリングが必要になるまでの秒数（未完了ジョブがなければNone）"""
+        with self._lock:
+            next_poll_at = self.conn.execute(
+                "SELECT MIN(next_poll_at) AS next_poll_at FROM export_jobs"
+                " WHERE finished = 0"
+            ).fetchone()["next_poll_at"]
+        return None if next_poll_at is None else max(0.0, next_poll_at - time.time())
+
+    async def run_worker(self) -> None:
+        """未完了ジョブのポーリングを続けるワーカー（キャンセルされるまで動作）
+
+        1回のポーリングで予期しないエラーが起きても、記録して次の回に進む
+        """
+        while True:
+            wait: float | None = None
+            try:
+                await asyncio.to_thread(self.poll_due)
+                wait = await asyncio.to_thread(self.seconds_until_next_poll)
+            except Exception:
+                logger.exception("エクスポートジョブのポーリングに失敗しました")
+            await asyncio.sleep(
+                POLL_MAX_INTERVAL
+                if wait is None
+                else min(max(wait, POLL_INITIAL_INTERVAL), POLL_MAX_INTERVAL)
+            )
+
+
+# シングルトンインスタンス
+soracam_export_queue = SoracamExportQueue()
@@ -0,0 +1,241 @@
+"""Harvest Files一覧インデックス - ディレクトリ一覧のキャッシュと使用量集計"""
+
+import heapq
+import sqlite3
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Any
+
+from soracom_data_mcp.client import soracom_client
+from soracom_data_mcp.config import settings
+from soracom_data_mcp.storage import database_path, open_database
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS directories (
+    scope TEXT NOT NULL,
+    path TEXT NOT NULL,
+    listed_at REAL NOT NULL,
+    PRIMARY KEY (scope, path)
+);
+CREATE TABLE IF NOT EXISTS entries (
+    scope TEXT NOT NULL,
+    parent TEXT NOT NULL,
+    path TEXT NOT NULL,
+    is_directory INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    last_modified INTEGER,
+    PRIMARY KEY (scope, path)
+);
+CREATE INDEX IF NOT EXISTS entries_parent ON entries (scope, parent);
+"""
+
+# (パス, ディレクトリか, サイズ, 更新時刻)
+EntryRow = tuple[str, bool, int, Any]
+
+
+def normalize_directory(path: str) -> str:
+    """ディレクトリパスを正規化（先頭の/なし・末尾の/あり、ルートは空文字）"""
+    normalized = path.strip("/")
+    return f"{normalized}/" if normalized else ""
+
+
+def _entry_row(directory: str, entry: dict[str, Any]) -> EntryRow:
+    """APIのファイルエントリをインデックスの行に変換"""
+    is_directory = bool(entry.get("isDirectory"))
+    path = str(entry.get("filePath") or directory + str(entry.get("filename", "")))
+    path = path.lstrip("/")
+    if is_directory:
+        path = normalize_directory(path)
+    size = int(entry.get("contentLength") or 0)
+    return path, is_directory, size, entry.get("lastModifiedTime")
+
+
+class HarvestFileIndex:
+    """Harvest Filesのディレクトリ一覧をSQLiteにキャッシュするインデックス
+
+    ディレクトリ単位で一覧の取得時刻を記録し、鮮度が十分なディレクトリは
+    APIを呼ばずに再利用する。古いディレクトリだけを並列に再取得するため、
+    2回目以降の走査は変更分の取得だけで済む
+    """
+
+    def __init__(self, path: Path | None = None) -> None:
+        self._path = path
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """データベース接続を取得（遅延初期化）"""
+        if self._conn is None:
+            self._conn = open_database(self._path or database_path("harvest_files"))
+            self._conn.executescript(_SCHEMA)
+        return self._conn
+
+    def _list_directory(self, scope: str, directory: str) -> list[EntryRow]:
+        """1ディレクトリ分の一覧を全ページ取得"""
+        rows: list[EntryRow] = []
+        for page in soracom_client.iter_pages(
+            f"/files/{scope}/{directory}", params={"limit": 100}
+        ):
+            rows.extend(_entry_row(directory, entry) for entry in page)
+        return rows
+
+    def _cached_subdirectories(
+        self, scope: str, directory: str, fresh_after: float
+    ) -> list[str] | None:
+        """鮮度が十分なキャッシュがあればサブディレクトリ一覧を返す"""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT listed_at FROM directories WHERE scope = ? AND path = ?",
+                (scope, directory),
+            ).fetchone()
+            if row is None or row["listed_at"] < fresh_after:
+                return None
+            return [
+                r["path"]
+                for r in self.conn.execute(
+                    "SELECT path FROM entries"
+                    " WHERE scope = ? AND parent = ? AND is_directory = 1",
+                    (scope, directory),
+                )
+            ]
+
+    def _store_listing(
+        self,
+        scope: str,
+        directory: str,
+        rows: list[EntryRow],
+        listed_at: float,
+    ) -> None:
+        """ディレクトリ一覧を保存し、消えたサブディレクトリの配下を削除"""
+        new_subdirectories = {path for path, is_dir, _, _ in rows if is_dir}
+        with self._lock, self.conn:
+            old_subdirectories = {
+                r["path"]
+                for r in self.conn.execute(
+                    "SELECT path FROM entries"
+                    " WHERE scope = ? AND parent = ? AND is_directory = 1",
+                    (scope, directory),
+                )
+            }
+            for removed in old_subdirectories - new_subdirectories:
+                for table in ("entries", "directories"):
+                    self.conn.execute(
+                        f"DELETE FROM {table}"
+                        " WHERE scope = ? AND substr(path, 1, ?) = ?",
+                        (scope, len(removed), removed),
+                    )
+
+            self.conn.execute(
+                "DELETE FROM entries WHERE scope = ? AND parent = ?",
+                (scope, directory),
+            )
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO entries"
+                " (scope, parent, path, is_directory, size, last_modified)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (scope, directory, path, int(is_dir), size, modified)
+                    for path, is_dir, size, modified in rows
+                ],
+            )
+            self.conn.execute(
+                "INSERT OR REPLACE INTO directories (scope, path, listed_at)"
+                " VALUES (?, ?, ?)",
+                (scope, directory, listed_at),
+            )
+
+    def walk(
+        self, scope: str, root: str = "", max_age_seconds: float = 3600
+    ) -> dict[str, int]:
+        """root配下を並列に走査してインデックスを更新
+
+        Returns:
+            APIで取得したディレクトリ数とキャッシュを再利用したディレクトリ数
+        """
+        root = normalize_directory(root)
+        now = time.time()
+        fresh_after = now - max_age_seconds
+        stats = {"listed": 0, "cached": 0}
+
+        with ThreadPoolExecutor(max_workers=settings.soracom_max_concurrency) as pool:
+            pending: dict[Future[list[EntryRow]], str] = {}
+            stack = [root]
+            try:
+                while stack or pending:
+                    # キャッシュで済むディレクトリは即座に展開し、残りを並列取得
+                    while stack:
+                        directory = stack.pop()
+                        cached = self._cached_subdirectories(
+                            scope, directory, fresh_after
+                        )
+                        if cached is None:
+                            future = pool.submit(self._list_directory, scope, directory)
+                            pending[future] = directory
+                        else:
+                            stats["cached"] += 1
+                            stack.extend(cached)
+
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        directory = pending.pop(future)
+                        rows = future.result()
+                        self._store_listing(scope, directory, rows, now)
+                        stats["listed"] += 1
+                        stack.extend(path for path, is_dir, _, _ in rows if is_dir)
+            except BaseException:
+                for future in pending:
+                    future.cancel()
+                raise
+
+        return stats
+
+    def usage(
+        self, scope: str, root: str = "", depth: int = 1
+    ) -> tuple[dict[str, int], dict[str, list[int]]]:
+        """インデックスからroot配下のプレフィックス別使用量を集計
+
+        Args:
+            scope: スコープ
+            root: 集計の起点ディレクトリ
+            depth: rootから何階層目までをプレフィックスとして扱うか
+
+        Returns:
+            全体の合計と、プレフィックスごとの [サイズ, ファイル数]
+        """
+        root = normalize_directory(root)
+        totals = {"size": 0, "file_count": 0}
+        prefixes: dict[str, list[int]] = {}
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT path, size FROM entries"
+                " WHERE scope = ? AND is_directory = 0 AND substr(path, 1, ?) = ?",
+                (scope, len(root), root),
+            )
+            for row in rows:
+                # ファイル名を除いたディレクトリ部分の先頭 depth 階層をプレフィックスとする
+                parts = row["path"][len(root) :].split("/")[:-1][:depth]
+                prefix = root + "".join(f"{part}/" for part in parts)
+                rollup = prefixes.setdefault(prefix, [0, 0])
+                rollup[0] += row["size"]
+                rollup[1] += 1
+                totals["size"] += row["size"]
+                totals["file_count"] += 1
+        return totals, prefixes
+
+
+def top_prefixes(
+    prefixes: dict[str, list[int]], top_n: int
+) -> list[dict[str, Any]]:
+    """使用量の大きいプレフィックスを上位N件返す"""
+    heaviest = heapq.nlargest(top_n, prefixes.items(), key=lambda item: item[1][0])
+    return [
+        {"prefix": f"/{prefix}", "size": size, "file_count": count}
+        for prefix, (size, count) in heaviest
+    ]
+
+
+# シングルトンインスタンス
+harvest_file_index = HarvestFileIndex()
@@ -0,0 +1,104 @@
+"""Harvest Data - 時系列データのストリーミング取得"""
+
+import json
+from collections.abc import Iterator
+from typing import Any
+
+from soracom_data_mcp.aggregate import RecordFilter
+from soracom_data_mcp.client import soracom_client
+
+# Harvest Data APIの1ページあたりの最大取得件数
+HARVEST_PAGE_SIZE = 1000
+
+
+def record_content(record: dict[str, Any]) -> Any:
+    """Harvest Dataのcontentを取得（JSON文字列の場合はパースする）"""
+    content = record.get("content")
+    if isinstance(content, str):
+        try:
+            return json.loads(content)
+        except ValueError:
+            return content
+    return content
+
+
+def iter_harvest_data(
+    imsi: str,
+    from_time: int | None,
+    to_time: int | None,
+    sort: str = "asc",
+    page_size: int = HARVEST_PAGE_SIZE,
+) -> Iterator[dict[str, Any]]:
+    """SIMのHarvest Dataを時刻順に1件ずつ返す（次ページは必要になった時点で取得）"""
+    params: dict[str, Any] = {"sort": sort, "limit": page_size}
+    if from_time is not None:
+        params["from"] = from_time
+    if to_time is not None:
+        params["to"] = to_time
+    for page in soracom_client.iter_pages(f"/data/subscribers/{imsi}", params=params):
+        for record in page:
+            if isinstance(record, dict) and record.get("time") is not None:
+                yield record
+
+
+def filter_harvest_data(
+    imsi: str,
+    from_time: int | None,
+    to_time: int | None,
+    predicate: RecordFilter,
+    sort: str = "desc",
+    limit: int = 100,
+    max_scanned: int = 10000,
+) -> dict[str, Any]:
+    """条件に合うHarvest Dataだけをページを順に取得しながら集める
+
+    contentがJSON文字列の場合はパースしてから判定する。limit 件集まるか
+    max_scanned 件を調べた時点で、同じ時刻のレコードを調べ終えてから取得を
+    やめ（続きの取得で同じ時刻のレコードを読み飛ばさないように、data が
+    limit 件を超えることがある）、続きがあればそれを取得するための時刻を返す
+
+    Returns:
+        条件に合うレコード（APIのレスポンスのまま）、調べた件数、続きの有無と
+        続きを取得する from_time（asc）または to_time（desc）
+    """
+    matches: list[dict[str, Any]] = []
+    scanned = 0
+    last_time: int | None = None
+    stop_time: int | None = None
+    truncated = False
+    for record in iter_harvest_data(imsi, from_time, to_time, sort=sort):
+        record_time = int(record["time"])
+        if stop_time is not None and record_time != stop_time:
+            # 上限に達した時刻より後のレコードが残っている
+            truncated = True
+            break
+        scanned += 1
+        last_time = record_time
+        if predicate({**record, "content": record_content(record)}):
+            matches.append(record)
+        if stop_time is None and (len(matches) >= limit or scanned >= max_scanned):
+            stop_time = record_time
+
+    next_range = None
+    if truncated and last_time is not None:
+        next_range = (
+            {"from_time": last_time + 1}
+            if sort == "asc"
+            else {"to_time": last_time - 1}
+        )
+    return {
+        "data": matches,
+        "scanned": scanned,
+        "truncated": truncated,
+        "next": next_range,
+    }
+
+
+def fetch_latest_record(imsi: str) -> dict[str, Any] | None:
+    """SIMの最新のHarvest Dataを1件取得（データがない場合はNone）"""
+    response = soracom_client.get(
+        f"/data/subscribers/{imsi}", params={"sort": "desc", "limit": 1}
+    )
+    if isinstance(response, list) and response and isinstance(response[0], dict):
+        return response[0]
+    return None
@@ -0,0 +1,41 @@
+"""Harvest利用統計 - SIMごとのHarvest書き込み件数・量の取得と集計"""
+
+from typing import Any
+
+from soracom_data_mcp.client import soracom_client
+
+
+def fetch_harvest_stats(
+    imsi: str, from_time: int, to_time: int, period: str = "day"
+) -> list[dict[str, Any]]:
+    """SIMのHarvest利用統計を取得（共通形式のリスト）"""
+    response = soracom_client.get(
+        f"/stats/harvest/subscribers/{imsi}",
+        params={"from": from_time, "to": to_time, "period": period},
+    )
+    if not isinstance(response, list):
+        return []
+    return [
+        {
+            "date": stat.get("date"),
+            "count": stat.get("count"),
+            "bytes": stat.get("bytes"),
+        }
+        for stat in response
+        if isinstance(stat, dict)
+    ]
+
+
+def empty_harvest_usage() -> dict[str, int]:
+    """Harvest利用量の集計の初期値"""
+    return {"harvest_count": 0, "harvest_bytes": 0}
+
+
+def add_harvest_usage(
+    usage: dict[str, int], stats: list[dict[str, Any]]
+) -> dict[str, int]:
+    """共通形式の統計をHarvest利用量の集計に加算（usage を更新して返す）"""
+    for stat in stats:
+        usage["harvest_count"] += int(stat.get("count") or 0)
+        usage["harvest_bytes"] += int(stat.get("bytes") or 0)
+    return usage
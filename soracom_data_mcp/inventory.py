@@ -0,0 +1,232 @@
+"""SIMインベントリ - SIM一覧のローカル保存と検索"""
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from soracom_data_mcp.client import soracom_client
+from soracom_data_mcp.storage import database_path, open_database
+from soracom_data_mcp.subscribers import subscriber_summary
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS subscribers (
+    imsi TEXT PRIMARY KEY,
+    status TEXT,
+    group_id TEXT,
+    speed_class TEXT,
+    last_modified_at INTEGER,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS subscribers_status ON subscribers (status);
+CREATE INDEX IF NOT EXISTS subscribers_group ON subscribers (group_id);
+CREATE INDEX IF NOT EXISTS subscribers_speed_class ON subscribers (speed_class);
+CREATE TABLE IF NOT EXISTS subscriber_tags (
+    imsi TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (imsi, key)
+);
+CREATE INDEX IF NOT EXISTS subscriber_tags_value ON subscriber_tags (key, value);
+CREATE TABLE IF NOT EXISTS inventory_state (
+    key TEXT PRIMARY KEY,
+    value REAL NOT NULL
+);
+"""
+
+# 前方一致検索の上限に使う文字（Unicodeの最大コードポイント）
+_MAX_CHAR = "\U0010ffff"
+
+
+def tag_condition(
+    key: str, value: str, match_mode: str = "exact"
+) -> tuple[str, list[Any]]:
+    """タグ条件に合うIMSIを返すサブクエリとパラメータ（インデックスを使う）"""
+    if match_mode == "prefix":
+        query = (
+            "SELECT imsi FROM subscriber_tags"
+            " WHERE key = ? AND value >= ? AND value < ?"
+        )
+        return query, [key, value, value + _MAX_CHAR]
+    return (
+        "SELECT imsi FROM subscriber_tags WHERE key = ? AND value = ?",
+        [key, value],
+    )
+
+
+class SubscriberInventory:
+    """SIM一覧をSQLiteに保存し、ステータス・グループ・速度クラス・タグで検索するインデックス
+
+    同期時は一覧を全ページ取得するが、lastModifiedAt が変わっていないSIMは
+    書き込まずに済ませる。検索はAPIを呼ばずにローカルのインデックスで行う
+    """
+
+    def __init__(self, path: Path | None = None) -> None:
+        self._path = path
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+        # 同期のたびに増える世代番号（検索結果をキャッシュする側が更新を検知する）
+        self.generation = 0
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """データベース接続を取得（遅延初期化）"""
+        if self._conn is None:
+            self._conn = open_database(self._path or database_path("subscribers"))
+            self._conn.executescript(_SCHEMA)
+        return self._conn
+
+    @property
+    def synced_at(self) -> float | None:
+        """最後に同期した時刻（UNIXタイムスタンプ・秒、未同期の場合はNone）"""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT value FROM inventory_state WHERE key = 'synced_at'"
+            ).fetchone()
+        return None if row is None else float(row["value"])
+
+    def _store(self, subscribers: list[dict[str, Any]]) -> None:
+        """SIMとタグを保存（既存の行は置き換える）"""
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "DELETE FROM subscriber_tags WHERE imsi = ?",
+                [(sub["imsi"],) for sub in subscribers],
+            )
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO subscribers"
+                " (imsi, status, group_id, speed_class, last_modified_at, data)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        sub["imsi"],
+                        sub.get("status"),
+                        sub.get("groupId"),
+                        sub.get("speedClass"),
+                        sub.get("lastModifiedAt"),
+                        json.dumps(sub),
+                    )
+                    for sub in subscribers
+                ],
+            )
+            self.conn.executemany(
+                "INSERT INTO subscriber_tags (imsi, key, value) VALUES (?, ?, ?)",
+                [
+                    (sub["imsi"], str(key), str(value))
+                    for sub in subscribers
+                    for key, value in (sub.get("tags") or {}).items()
+                ],
+            )
+
+    def sync(self, max_age_seconds: float = 0) -> dict[str, Any]:
+        """SIM一覧を取得してインデックスを更新
+
+        一覧APIには更新日時での絞り込みがないため全ページを取得するが、
+        lastModifiedAt が保存済みの値と同じSIMは書き込まない
+
+        Args:
+            max_age_seconds: 前回の同期からこの秒数以内なら同期しない
+
+        Returns:
+            追加・更新・削除・変更なしのSIM数
+        """
+        synced_at = self.synced_at
+        now = time.time()
+        if synced_at is not None and now - synced_at < max_age_seconds:
+            return {"skipped": True, "synced_at": synced_at}
+
+        with self._lock:
+            stored = {
+                row["imsi"]: row["last_modified_at"]
+                for row in self.conn.execute(
+                    "SELECT imsi, last_modified_at FROM subscribers"
+                )
+            }
+
+        stats = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0}
+        seen: set[str] = set()
+        for page in soracom_client.iter_pages("/subscribers", params={"limit": 100}):
+            changed = []
+            for sub in page:
+                if not isinstance(sub, dict) or not sub.get("imsi"):
+                    continue
+                imsi = sub["imsi"]
+                seen.add(imsi)
+                if imsi not in stored:
+                    stats["added"] += 1
+                elif stored[imsi] != sub.get("lastModifiedAt"):
+                    stats["updated"] += 1
+                else:
+                    stats["unchanged"] += 1
+                    continue
+                changed.append(sub)
+            if changed:
+                self._store(changed)
+
+        removed = [(imsi,) for imsi in stored.keys() - seen]
+        stats["removed"] = len(removed)
+        with self._lock, self.conn:
+            for table in ("subscribers", "subscriber_tags"):
+                self.conn.executemany(f"DELETE FROM {table} WHERE imsi = ?", removed)
+            self.conn.execute(
+                "INSERT OR REPLACE INTO inventory_state (key, value)"
+                " VALUES ('synced_at', ?)",
+                (now,),
+            )
+        self.generation += 1
+        return {"skipped": False, "synced_at": now, "total": len(seen), **stats}
+
+    def tag_values(self, key: str) -> list[tuple[str, str]]:
+        """タグの値とIMSIの組をすべて返す"""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT value, imsi FROM subscriber_tags WHERE key = ?", (key,)
+            ).fetchall()
+        return [(row["value"], row["imsi"]) for row in rows]
+
+    def search(
+        self,
+        status: str | None = None,
+        group_id: str | None = None,
+        speed_class: str | None = None,
+        tags: dict[str, str] | None = None,
+        tag_match_mode: str = "exact",
+        limit: int | None = None,
+    ) -> tuple[list[dict[str, Any]], int]:
+        """条件をすべて満たすSIMを検索
+
+        Returns:
+            IMSI順のSIM（共通形式、limit 指定時は最大 limit 件）と
+            条件に合うSIMの総数
+        """
+        clauses = []
+        params: list[Any] = []
+        for column, value in (
+            ("status", status),
+            ("group_id", group_id),
+            ("speed_class", speed_class),
+        ):
+            if value:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        for key, value in (tags or {}).items():
+            subquery, subquery_params = tag_condition(key, value, tag_match_mode)
+            clauses.append(f"imsi IN ({subquery})")
+            params.extend(subquery_params)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        with self._lock:
+            total = self.conn.execute(
+                f"SELECT COUNT(*) AS count FROM subscribers{where}", params
+            ).fetchone()["count"]
+            rows = self.conn.execute(
+                f"SELECT data FROM subscribers{where} ORDER BY imsi LIMIT ?",
+                # SQLite では負の LIMIT は上限なしを表す
+                (*params, -1 if limit is None else limit),
+            ).fetchall()
+        return [subscriber_summary(json.loads(row["data"])) for row in rows], total
+
+
+# シングルトンインスタンス
+subscriber_inventory = SubscriberInventory()
@@ -0,0 +1,290 @@
+"""位置情報ストア - Harvest Dataの位置情報のローカル保存と範囲検索"""
+
+import math
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from soracom_data_mcp.aggregate import get_field, to_number
+from soracom_data_mcp.harvest_data import iter_harvest_data, record_content
+from soracom_data_mcp.storage import database_path, open_database
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS locations (
+    imsi TEXT NOT NULL,
+    time INTEGER NOT NULL,
+    lat REAL NOT NULL,
+    lon REAL NOT NULL,
+    cell INTEGER NOT NULL,
+    PRIMARY KEY (imsi, time)
+);
+CREATE INDEX IF NOT EXISTS locations_cell_time ON locations (cell, time);
+CREATE TABLE IF NOT EXISTS sync_state (
+    imsi TEXT PRIMARY KEY,
+    synced_from INTEGER NOT NULL,
+    synced_to INTEGER NOT NULL
+);
+"""
+
+# グリッドの1区画の大きさ（度、緯度方向で約1.1km）
+GRID_DEGREES = 0.01
+
+# 経度方向の区画数
+_GRID_COLUMNS = math.ceil(360 / GRID_DEGREES)
+
+# 区画の索引を使う検索範囲の最大行数（これを超える場合は緯度経度で絞り込む）
+MAX_GRID_ROWS = 200
+
+# 地球の半径（メートル）
+EARTH_RADIUS_METERS = 6_371_000
+
+
+def _grid_row(lat: float) -> int:
+    return math.floor((lat + 90) / GRID_DEGREES)
+
+
+def _grid_column(lon: float) -> int:
+    return min(math.floor((lon + 180) / GRID_DEGREES), _GRID_COLUMNS - 1)
+
+
+def grid_cell(lat: float, lon: float) -> int:
+    """緯度経度をグリッドの区画番号に変換（同じ行の区画は番号が連続する）"""
+    return _grid_row(lat) * _GRID_COLUMNS + _grid_column(lon)
+
+
+def haversine_meters(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """2点間の大円距離（メートル）"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = (
+        math.sin(d_phi / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_METERS * math.asin(min(1.0, math.sqrt(a)))
+
+
+def radius_bbox(
+    lat: float, lon: float, radius_meters: float
+) -> tuple[float, float, float, float]:
+    """円を囲む緯度経度の範囲（最小緯度, 最小経度, 最大緯度, 最大経度）"""
+    d_lat = math.degrees(radius_meters / EARTH_RADIUS_METERS)
+    cos_lat = math.cos(math.radians(lat))
+    d_lon = 180.0 if cos_lat < 1e-9 else min(180.0, d_lat / cos_lat)
+    return (
+        max(-90.0, lat - d_lat),
+        max(-180.0, lon - d_lon),
+        min(90.0, lat + d_lat),
+        min(180.0, lon + d_lon),
+    )
+
+
+def extract_location(
+    record: dict[str, Any], lat_field: str, lon_field: str
+) -> tuple[float, float] | None:
+    """Harvest Dataのcontentから緯度経度を取り出す（範囲外・数値以外はNone）"""
+    content = record_content(record)
+    lat = to_number(get_field(content, lat_field))
+    lon = to_number(get_field(content, lon_field))
+    if lat is None or lon is None:
+        return None
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        return None
+    return lat, lon
+
+
+class HarvestLocationStore:
+    """Harvest Dataの位置情報をSIMごとにSQLiteへ保存するストア
+
+    緯度経度をグリッドの区画番号で索引し、矩形・半径の範囲検索を
+    APIを呼ばずにローカルで行う。同期済みの期間をSIMごとに記録し、
+    2回目以降は保存済みの最新の位置以降だけを取得する
+    """
+
+    def __init__(self, path: Path | None = None) -> None:
+        self._path = path
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """データベース接続を取得（遅延初期化）"""
+        if self._conn is None:
+            self._conn = open_database(self._path or database_path("locations"))
+            self._conn.executescript(_SCHEMA)
+        return self._conn
+
+    def _fetch_range(
+        self,
+        imsi: str,
+        from_time: int,
+        to_time: int,
+        lat_field: str,
+        lon_field: str,
+    ) -> int:
+        """指定期間のHarvest Dataを古い順に取得し、位置情報だけを保存"""
+        stored = 0
+        batch: list[tuple[str, int, float, float, int]] = []
+
+        def flush() -> None:
+            nonlocal stored
+            with self._lock, self.conn:
+                before = self.conn.total_changes
+                self.conn.executemany(
+                    "INSERT OR IGNORE INTO locations (imsi, time, lat, lon, cell)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    batch,
+                )
+                stored += self.conn.total_changes - before
+            batch.clear()
+
+        for record in iter_harvest_data(imsi, from_time, to_time):
+            location = extract_location(record, lat_field, lon_field)
+            if location is None:
+                continue
+            lat, lon = location
+            batch.append((imsi, int(record["time"]), lat, lon, grid_cell(lat, lon)))
+            if len(batch) >= 1000:
+                flush()
+        if batch:
+            flush()
+        return stored
+
+    def sync(
+        self,
+        imsi: str,
+        since: int,
+        now: int | None = None,
+        lat_field: str = "lat",
+        lon_field: str = "lon",
+    ) -> dict[str, Any]:
+        """SIMの位置情報を差分同期
+
+        Args:
+            imsi: SIMのIMSI
+            since: 同期対象の開始時刻（UNIXタイムスタンプ・ミリ秒）
+            now: 同期対象の終了時刻（未指定時は現在時刻）
+            lat_field: 緯度のcontent内のフィールド
+            lon_field: 経度のcontent内のフィールド
+
+        Returns:
+            新たに保存した位置情報の数と同期済みの期間
+        """
+        now = now if now is not None else int(time.time() * 1000)
+        with self._lock:
+            state = self.conn.execute(
+                "SELECT synced_from, synced_to FROM sync_state WHERE imsi = ?",
+                (imsi,),
+            ).fetchone()
+
+        fields = (lat_field, lon_field)
+        stored = 0
+        if state is None:
+            stored += self._fetch_range(imsi, since, now, *fields)
+            synced_from = since
+        else:
+            synced_from = state["synced_from"]
+            # 同期済み期間より前が要求された場合は不足分を遡って取得
+            if since < synced_from:
+                stored += self._fetch_range(imsi, since, synced_from, *fields)
+                synced_from = since
+            stored += self._fetch_range(imsi, state["synced_to"], now, *fields)
+
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO sync_state (imsi, synced_from, synced_to)"
+                " VALUES (?, ?, ?)",
+                (imsi, synced_from, now),
+            )
+
+        return {
+            "imsi": imsi,
+            "new_locations": stored,
+            "synced_from": synced_from,
+            "synced_to": now,
+        }
+
+    def query_bbox(
+        self,
+        min_lat: float,
+        min_lon: float,
+        max_lat: float,
+        max_lon: float,
+        imsis: list[str] | None = None,
+        from_time: int | None = None,
+        to_time: int | None = None,
+        limit: int | None = None,
+    ) -> list[dict[str, Any]]:
+        """矩形の範囲内の位置情報を時刻順に検索（日付変更線をまたぐ範囲は非対応）"""
+        clauses = ["lat BETWEEN ? AND ?", "lon BETWEEN ? AND ?"]
+        params: list[Any] = [min_lat, max_lat, min_lon, max_lon]
+
+        first_row, last_row = _grid_row(min_lat), _grid_row(max_lat)
+        if last_row - first_row < MAX_GRID_ROWS:
+            # 行ごとに連続する区画番号の範囲で索引を引く
+            first_column, last_column = _grid_column(min_lon), _grid_column(max_lon)
+            ranges = []
+            for row in range(first_row, last_row + 1):
+                ranges.append("cell BETWEEN ? AND ?")
+                params.extend((
+                    row * _GRID_COLUMNS + first_column,
+                    row * _GRID_COLUMNS + last_column,
+                ))
+            clauses.append(f"({' OR '.join(ranges)})")
+        if imsis:
+            clauses.append(f"imsi IN ({', '.join('?' * len(imsis))})")
+            params.extend(imsis)
+        if from_time is not None:
+            clauses.append("time >= ?")
+            params.append(from_time)
+        if to_time is not None:
+            clauses.append("time <= ?")
+            params.append(to_time)
+
+        with self._lock:
+            rows = self.conn.execute(
+                f"SELECT imsi, time, lat, lon FROM locations"
+                f" WHERE {' AND '.join(clauses)} ORDER BY time, imsi LIMIT ?",
+                (*params, -1 if limit is None else limit),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def query_radius(
+        self,
+        lat: float,
+        lon: float,
+        radius_meters: float,
+        imsis: list[str] | None = None,
+        from_time: int | None = None,
+        to_time: int | None = None,
+        limit: int | None = None,
+    ) -> list[dict[str, Any]]:
+        """中心から半径内の位置情報を時刻順に検索（中心からの距離を付ける）"""
+        locations = []
+        for location in self.query_bbox(
+            *radius_bbox(lat, lon, radius_meters), imsis, from_time, to_time
+        ):
+            distance = haversine_meters(lat, lon, location["lat"], location["lon"])
+            if distance <= radius_meters:
+                locations.append({**location, "distance_meters": round(distance, 1)})
+                if limit is not None and len(locations) >= limit:
+                    break
+        return locations
+
+    def sync_states(self) -> dict[str, dict[str, int]]:
+        """SIMごとの同期済み期間を返す"""
+        with self._lock:
+            rows = self.conn.execute("SELECT * FROM sync_state").fetchall()
+        return {
+            row["imsi"]: {
+                "synced_from": row["synced_from"],
+                "synced_to": row["synced_to"],
+            }
+            for row in rows
+        }
+
+
+# シングルトンインスタンス
+harvest_location_store = HarvestLocationStore()
@@ -0,0 +1,204 @@
+"""ソラカメメディアキャッシュ - エクスポート済み画像・動画のローカル保存"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path, PurePosixPath
+from typing import Any
+from urllib.parse import urlsplit
+
+from soracom_data_mcp.client import soracom_client
+from soracom_data_mcp.config import settings
+from soracom_data_mcp.storage import open_database
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS media (
+    device_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    from_time INTEGER NOT NULL,
+    to_time INTEGER NOT NULL,
+    sha256 TEXT NOT NULL,
+    PRIMARY KEY (device_id, kind, from_time, to_time)
+);
+CREATE INDEX IF NOT EXISTS media_sha256 ON media (sha256);
+CREATE TABLE IF NOT EXISTS objects (
+    sha256 TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    last_accessed REAL NOT NULL
+);
+"""
+
+# ハッシュ計算時の読み込み単位（バイト）
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def _sha256(path: Path) -> str:
+    """ファイル内容のSHA-256を計算"""
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        while chunk := f.read(_HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class SoracamMediaCache:
+    """エクスポートした画像・動画を内容のハッシュで保存するキャッシュ
+
+    デバイスID・種別・時間範囲からファイルの SHA-256 を引く表と、
+    ハッシュごとのファイル（同じ内容は1つだけ保存）を持つ。合計サイズが
+    上限を超えた場合は最後に参照された時刻の古いファイルから削除する
+    """
+
+    def __init__(
+        self, root: Path | None = None, max_bytes: int | None = None
+    ) -> None:
+        self._root = root
+        self._max_bytes = max_bytes
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def root(self) -> Path:
+        """保存先ディレクトリ"""
+        return self._root or settings.cache_dir / "media"
+
+    @property
+    def max_bytes(self) -> int:
+        """保存するファイルの合計サイズの上限（バイト）"""
+        if self._max_bytes is not None:
+            return self._max_bytes
+        return settings.soracom_media_cache_max_mb * 1024 * 1024
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """データベース接続を取得（遅延初期化）"""
+        if self._conn is None:
+            self._conn = open_database(self.root / "media.sqlite3")
+            self._conn.executescript(_SCHEMA)
+        return self._conn
+
+    def _object_path(self, sha256: str, name: str) -> Path:
+        """ハッシュごとのファイルの保存先（先頭2文字でディレクトリを分ける）"""
+        return self.root / "objects" / sha256[:2] / name
+
+    def lookup(
+        self, device_id: str, kind: str, from_time: int, to_time: int
+    ) -> dict[str, Any] | None:
+        """保存済みのファイルを検索（見つかれば参照時刻を更新）"""
+        with self._lock, self.conn:
+            row = self.conn.execute(
+                "SELECT o.sha256, o.name, o.size FROM media m"
+                " JOIN objects o ON o.sha256 = m.sha256"
+                " WHERE m.device_id = ? AND m.kind = ?"
+                " AND m.from_time = ? AND m.to_time = ?",
+                (device_id, kind, from_time, to_time),
+            ).fetchone()
+            if row is None:
+                return None
+            path = self._object_path(row["sha256"], row["name"])
+            if not path.exists():
+                # ファイルが外部で削除された場合はキャッシュから外す
+                self.conn.execute(
+                    "DELETE FROM media WHERE sha256 = ?", (row["sha256"],)
+                )
+                self.conn.execute(
+                    "DELETE FROM objects WHERE sha256 = ?", (row["sha256"],)
+                )
+                return None
+            self.conn.execute(
+                "UPDATE objects SET last_accessed = ? WHERE sha256 = ?",
+                (time.time(), row["sha256"]),
+            )
+        return {"path": str(path), "sha256": row["sha256"], "size": row["size"]}
+
+    def store(
+        self, device_id: str, kind: str, from_time: int, to_time: int, url: str
+    ) -> dict[str, Any]:
+        """署名付きURLの内容をダウンロードして保存
+
+        Returns:
+            保存先のパス、SHA-256、サイズ
+        """
+        suffix = PurePosixPath(urlsplit(url).path).suffix
+        staging = self.root / "staging" / (
+            f"{device_id}_{kind}_{from_time}_{to_time}_{threading.get_ident()}"
+        )
+        size = soracom_client.download_file(url, staging)
+        sha256 = _sha256(staging)
+        name = f"{sha256}{suffix}"
+        path = self._object_path(sha256, name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if path.exists():
+            # 同じ内容のファイルは保存済みのものを共有する
+            staging.unlink()
+        else:
+            staging.replace(path)
+
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO objects (sha256, name, size, last_accessed)"
+                " VALUES (?, ?, ?, ?)",
+                (sha256, name, size, time.time()),
+            )
+            self.conn.execute(
+                "INSERT OR REPLACE INTO media"
+                " (device_id, kind, from_time, to_time, sha256)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (device_id, kind, from_time, to_time, sha256),
+            )
+        self.evict(keep=sha256)
+        return {"path": str(path), "sha256": sha256, "size": size}
+
+    def evict(self, keep: str | None = None) -> int:
+        """合計サイズが上限以下になるまで参照の古いファイルを削除
+
+        Args:
+            keep: 削除しないファイルのSHA-256（保存直後のファイル）
+
+        Returns:
+            削除したファイル数
+        """
+        removed = 0
+        with self._lock, self.conn:
+            total = self.conn.execute(
+                "SELECT COALESCE(SUM(size), 0) AS total FROM objects"
+            ).fetchone()["total"]
+            if total <= self.max_bytes:
+                return 0
+            rows = self.conn.execute(
+                "SELECT sha256, name, size FROM objects ORDER BY last_accessed"
+            ).fetchall()
+            for row in rows:
+                if total <= self.max_bytes:
+                    break
+                if row["sha256"] == keep:
+                    continue
+                self._object_path(row["sha256"], row["name"]).unlink(missing_ok=True)
+                self.conn.execute(
+                    "DELETE FROM media WHERE sha256 = ?", (row["sha256"],)
+                )
+                self.conn.execute(
+                    "DELETE FROM objects WHERE sha256 = ?", (row["sha256"],)
+                )
+                total -= row["size"]
+                removed += 1
+        return removed
+
+    def usage(self) -> dict[str, int]:
+        """保存済みのファイル数と合計サイズ"""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT COUNT(*) AS count, COALESCE(SUM(size), 0) AS size"
+                " FROM objects"
+            ).fetchone()
+        return {
+            "file_count": row["count"],
+            "size": row["size"],
+            "max_bytes": self.max_bytes,
+        }
+
+
+# シングルトンインスタンス
+soracam_media_cache = SoracamMediaCache()
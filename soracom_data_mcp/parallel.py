@@ -0,0 +1,40 @@
+"""並列実行ユーティリティ - APIリクエストをスレッドプールで並列化"""
+
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from typing import TypeVar
+
+from soracom_data_mcp.client import SoracomApiError
+from soracom_data_mcp.config import settings
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def run_concurrently(
+    func: Callable[[T], R],
+    items: Iterable[T],
+    max_workers: int | None = None,
+) -> list[R | SoracomApiError]:
+    """各要素に func を並列に適用し、入力順に結果を返す
+
+    SORACOM APIエラーは要素ごとに結果として返し、他の要素の処理は継続する
+
+    Args:
+        func: 各要素に適用する関数
+        items: 入力要素
+        max_workers: 並列数（未指定時は SORACOM_MAX_CONCURRENCY）
+    """
+    items = list(items)
+    if not items:
+        return []
+
+    def _call(item: T) -> R | SoracomApiError:
+        try:
+            return func(item)
+        except SoracomApiError as e:
+            return e
+
+    workers = min(max_workers or settings.soracom_max_concurrency, len(items))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_call, items))
@@ -0,0 +1,179 @@
+"""ソラカメ録画カバレッジ - 録画期間の区間インデックス"""
+
+import time
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+from typing import Any
+
+from soracom_data_mcp.cache import TTLCache
+from soracom_data_mcp.client import soracom_client
+
+# 録画期間のキャッシュ有効期間（秒）: 現在時刻付近の録画は伸び続けるため短めにする
+COVERAGE_CACHE_TTL = 300
+
+# (開始時刻, 終了時刻) UNIXタイムスタンプ・ミリ秒、終了時刻を含まない半開区間
+Interval = tuple[int, int]
+
+
+def merge_intervals(intervals: list[Interval]) -> list[Interval]:
+    """区間を開始時刻順に並べ、重なる区間・隣接する区間を結合"""
+    merged: list[Interval] = []
+    for start, end in sorted(intervals):
+        if end <= start:
+            continue
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+class RecordingCoverage:
+    """1デバイスの録画期間を結合済みの区間として保持するインデックス
+
+    区間の開始・終了時刻の配列と録画時間の累積和を持ち、時刻が録画中か
+    の判定と期間内の録画時間の集計を二分探索で O(log n) で行う
+    """
+
+    def __init__(
+        self,
+        device_id: str,
+        intervals: list[Interval],
+        from_time: int,
+        to_time: int,
+        live: bool = False,
+    ) -> None:
+        self.device_id = device_id
+        self.from_time = from_time
+        self.to_time = to_time
+        # 取得時点の現在時刻までを取得したか（キャッシュの有効期間内は最新とみなす）
+        self.live = live
+        merged = merge_intervals(
+            [(max(s, from_time), min(e, to_time)) for s, e in intervals]
+        )
+        self.starts = [start for start, _ in merged]
+        self.ends = [end for _, end in merged]
+        # cumulative[i] は先頭から i 個の区間の録画時間の合計
+        self.cumulative = [0, *accumulate(e - s for s, e in merged)]
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def contains_range(self, from_time: int, to_time: int) -> bool:
+        """指定期間がインデックスの取得範囲に含まれるか"""
+        return self.from_time <= from_time and (self.live or to_time <= self.to_time)
+
+    def interval_at(self, timestamp: int) -> Interval | None:
+        """指定時刻を含む録画区間（録画していなければNone）"""
+        i = bisect_right(self.starts, timestamp) - 1
+        if i >= 0 and timestamp < self.ends[i]:
+            return self.starts[i], self.ends[i]
+        return None
+
+    def _covered_until(self, timestamp: int) -> int:
+        """取得範囲の先頭から指定時刻までの録画時間"""
+        i = bisect_right(self.starts, timestamp)
+        if i == 0:
+            return 0
+        return self.cumulative[i - 1] + min(timestamp, self.ends[i - 1]) - (
+            self.starts[i - 1]
+        )
+
+    def covered_milliseconds(self, from_time: int, to_time: int) -> int:
+        """期間内の録画時間（ミリ秒）"""
+        if to_time <= from_time:
+            return 0
+        return self._covered_until(to_time) - self._covered_until(from_time)
+
+    def intervals(self, from_time: int, to_time: int) -> list[Interval]:
+        """期間と重なる録画区間を期間内に切り詰めて返す"""
+        first = bisect_right(self.ends, from_time)
+        last = bisect_left(self.starts, to_time)
+        return [
+            (max(self.starts[i], from_time), min(self.ends[i], to_time))
+            for i in range(first, last)
+        ]
+
+    def gaps(self, from_time: int, to_time: int) -> list[Interval]:
+        """期間内で録画されていない区間"""
+        gaps: list[Interval] = []
+        cursor = from_time
+        for start, end in self.intervals(from_time, to_time):
+            if start > cursor:
+                gaps.append((cursor, start))
+            cursor = end
+        if cursor < to_time:
+            gaps.append((cursor, to_time))
+        return gaps
+
+
+def _recording_interval(record: Any, default_end: int) -> Interval | None:
+    """録画期間のレコードを区間に変換（録画中で終了時刻がない場合は default_end）"""
+    if not isinstance(record, dict):
+        return None
+    start = record.get("from", record.get("startTime"))
+    end = record.get("to", record.get("endTime"))
+    if start is None:
+        return None
+    return int(start), int(end) if end is not None else default_end
+
+
+def fetch_recording_coverage(
+    device_id: str, from_time: int, to_time: int
+) -> RecordingCoverage:
+    """録画期間をAPIから取得してインデックスを作成（未来の時刻は含めない）"""
+    now = int(time.time() * 1000)
+    live = to_time >= now
+    to_time = min(to_time, now)
+    response = soracom_client.get(
+        f"/sora_cam/devices/{device_id}/recordings_and_events",
+        params={"from": from_time, "to": to_time},
+    )
+    records: list[Any] = []
+    if isinstance(response, dict):
+        records = list(response.get("recordings") or [])
+        # 録画とイベントが records にまとめて返る形式にも対応
+        records.extend(
+            record
+            for record in response.get("records") or []
+            if isinstance(record, dict) and record.get("type") == "recording"
+        )
+    intervals = [
+        interval
+        for record in records
+        if (interval := _recording_interval(record, to_time)) is not None
+    ]
+    return RecordingCoverage(device_id, intervals, from_time, to_time, live)
+
+
+# デバイスID -> 最後に取得した録画カバレッジ
+coverage_cache: TTLCache[str, RecordingCoverage] = TTLCache(
+    ttl_seconds=COVERAGE_CACHE_TTL, max_size=256
+)
+
+
+def get_recording_coverage(
+    device_id: str,
+    from_time: int,
+    to_time: int,
+    refresh: bool = False,
+    margin: int = 0,
+) -> RecordingCoverage:
+    """録画カバレッジを取得（キャッシュ済みの範囲に含まれればAPIを呼ばない）
+
+    Args:
+        device_id: デバイスID
+        from_time: 必要な期間の開始時刻（UNIXタイムスタンプ・ミリ秒）
+        to_time: 必要な期間の終了時刻（UNIXタイムスタンプ・ミリ秒）
+        refresh: Trueの場合はキャッシュを使わずに再取得
+        margin: 再取得時に前後へ広げて取得する幅（ミリ秒）
+    """
+    cached = None if refresh else coverage_cache.get(device_id)
+    if cached is not None and cached.contains_range(from_time, to_time):
+        return cached
+    coverage = fetch_recording_coverage(
+        device_id, from_time - margin, to_time + margin
+    )
+    coverage_cache.set(device_id, coverage)
+    return coverage
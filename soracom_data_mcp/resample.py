@@ -0,0 +1,69 @@
+"""時系列のリサンプリング - 複数系列を共通の時間グリッドに揃える"""
+
+import math
+from collections.abc import Iterable
+
+RESAMPLE_METHODS = ("mean", "ffill")
+
+
+class Resampler:
+    """1つの系列を等間隔の時間グリッドにリサンプリングする
+
+    値を1件ずつ受け取り、グリッドの区間ごとの合計・件数・最後の値だけを
+    保持する。メモリ使用量は元の点数ではなくグリッドの区間数に比例する
+    """
+
+    def __init__(self, from_time: int, to_time: int, step: int) -> None:
+        self.from_time = from_time
+        self.step = step
+        self.size = grid_size(from_time, to_time, step)
+        self._sums = [0.0] * self.size
+        self._counts = [0] * self.size
+        # 区間内で最も新しい値とその時刻
+        self._last: list[float | None] = [None] * self.size
+        self._last_times = [0] * self.size
+
+    def add(self, timestamp: int, value: float) -> None:
+        """値を追加（グリッドの範囲外の値は無視する）"""
+        index = (timestamp - self.from_time) // self.step
+        if not 0 <= index < self.size:
+            return
+        self._sums[index] += value
+        self._counts[index] += 1
+        if self._last[index] is None or timestamp >= self._last_times[index]:
+            self._last[index] = value
+            self._last_times[index] = timestamp
+
+    def values(self, method: str = "mean") -> list[float | None]:
+        """区間ごとの値
+
+        Args:
+            method: mean（区間内の平均、値のない区間はNone）,
+                ffill（区間内の最後の値、値のない区間は直前の値を引き継ぐ）
+        """
+        if method == "ffill":
+            filled: list[float | None] = []
+            previous: float | None = None
+            for last in self._last:
+                previous = last if last is not None else previous
+                filled.append(previous)
+            return filled
+        return [
+            total / count if count else None
+            for total, count in zip(self._sums, self._counts, strict=True)
+        ]
+
+
+def grid_size(from_time: int, to_time: int, step: int) -> int:
+    """グリッドの区間数（from_time から step ごとに区切り、to_time は含まない）"""
+    return max(0, math.ceil((to_time - from_time) / step))
+
+
+def align_series(
+    series: Iterable[list[float | None]], times: list[int]
+) -> list[list[float | int | None]]:
+    """区間ごとの値の列を、1行が1時刻の行列（先頭列は時刻）に並べ替える"""
+    return [
+        [timestamp, *values]
+        for timestamp, *values in zip(times, *series, strict=True)
+    ]
@@ -0,0 +1,156 @@
+"""SIM名前解決 - タグの値からIMSIを引く"""
+
+import bisect
+import difflib
+import threading
+from collections.abc import Iterable
+from typing import Any
+
+from soracom_data_mcp.inventory import SubscriberInventory, subscriber_inventory
+
+MATCH_MODES = ("exact", "prefix", "fuzzy")
+
+# あいまい検索で候補とする類似度の下限（difflib の ratio）
+FUZZY_CUTOFF = 0.6
+
+# 名前が見つからない場合、前回の同期からこの秒数が過ぎていれば同期し直す
+RESYNC_AFTER_SECONDS = 300
+
+
+class SubscriberNameError(ValueError):
+    """名前からIMSIを1つに決められない"""
+
+
+class TagIndex:
+    """1つのタグについて、値 -> IMSI の転置インデックス（大文字・小文字は区別しない）"""
+
+    def __init__(self, pairs: Iterable[tuple[str, str]]) -> None:
+        self._imsis: dict[str, list[str]] = {}
+        self._values: dict[str, str] = {}
+        for value, imsi in pairs:
+            key = value.casefold()
+            self._imsis.setdefault(key, []).append(imsi)
+            self._values.setdefault(key, value)
+        self._keys = sorted(self._imsis)
+
+    def _exact(self, query: str) -> list[str]:
+        return [query] if query in self._imsis else []
+
+    def _prefix(self, query: str, limit: int) -> list[str]:
+        keys: list[str] = []
+        for key in self._keys[bisect.bisect_left(self._keys, query):]:
+            if not key.startswith(query) or len(keys) >= limit:
+                break
+            keys.append(key)
+        return keys
+
+    def _fuzzy(self, query: str, limit: int) -> list[str]:
+        return difflib.get_close_matches(query, self._keys, limit, FUZZY_CUTOFF)
+
+    def search(
+        self, query: str, match_mode: str = "exact", limit: int = 10
+    ) -> list[dict[str, Any]]:
+        """タグの値を検索
+
+        Args:
+            query: 検索する値
+            match_mode: 一致モード（exact, prefix, fuzzy）
+            limit: 返す値の最大数
+
+        Returns:
+            一致した値とそのIMSI（fuzzy は似ている順、それ以外は値の順）
+        """
+        query = query.casefold()
+        if match_mode == "prefix":
+            keys = self._prefix(query, limit)
+        elif match_mode == "fuzzy":
+            keys = self._fuzzy(query, limit)
+        else:
+            keys = self._exact(query)
+        return [
+            {"value": self._values[key], "imsis": sorted(self._imsis[key])}
+            for key in keys
+        ]
+
+
+class SubscriberResolver:
+    """SIMインベントリのタグからIMSIを引くリゾルバ
+
+    タグごとの転置インデックスをメモリに保持し、インベントリが同期される
+    まで使い回す。インベントリが未作成の場合は最初に同期し、名前が
+    見つからない場合は RESYNC_AFTER_SECONDS ごとに同期し直す
+    """
+
+    def __init__(self, inventory: SubscriberInventory) -> None:
+        self._inventory = inventory
+        self._indexes: dict[str, TagIndex] = {}
+        self._generation = inventory.generation
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+
+    def _sync(self, max_age_seconds: float) -> None:
+        """インベントリを同期（並行して呼ばれても一覧の取得は1回だけ）"""
+        with self._sync_lock:
+            self._inventory.sync(max_age_seconds)
+
+    def index(self, tag_name: str = "name") -> TagIndex:
+        """タグの転置インデックスを取得（未作成またはインベントリ更新後は作り直す）"""
+        if self._inventory.synced_at is None:
+            self._sync(float("inf"))
+        with self._lock:
+            if self._generation != self._inventory.generation:
+                self._indexes.clear()
+                self._generation = self._inventory.generation
+            if tag_name not in self._indexes:
+                self._indexes[tag_name] = TagIndex(
+                    self._inventory.tag_values(tag_name)
+                )
+            return self._indexes[tag_name]
+
+    def search(
+        self,
+        query: str,
+        tag_name: str = "name",
+        match_mode: str = "exact",
+        limit: int = 10,
+    ) -> list[dict[str, Any]]:
+        """タグの値でSIMを検索"""
+        return self.index(tag_name).search(query, match_mode, limit)
+
+    def resolve_imsi(self, value: str, tag_name: str = "name") -> str:
+        """IMSIまたはタグの値をIMSIに変換
+
+        数字だけの値はIMSIとしてそのまま返す。タグの値に一致するSIMが
+        ない場合は、インベントリが古ければ同期し直してもう一度探す
+
+        Raises:
+            SubscriberNameError: 一致するSIMがない、または同じ値のSIMが
+                複数ある場合
+        """
+        if value.isdigit():
+            return value
+        matches = self.search(value, tag_name)
+        if not matches:
+            self._sync(RESYNC_AFTER_SECONDS)
+            matches = self.search(value, tag_name)
+        if not matches:
+            raise SubscriberNameError(
+                f"{tag_name}={value} のSIMが見つかりません。"
+                "IMSIまたは正しい名前を指定してください"
+            )
+        imsis = matches[0]["imsis"]
+        if len(imsis) > 1:
+            raise SubscriberNameError(
+                f"{tag_name}={value} のSIMが複数あります。IMSIを指定してください"
+                f"（候補: {', '.join(imsis)}）"
+            )
+        return str(imsis[0])
+
+
+# シングルトンインスタンス
+subscriber_resolver = SubscriberResolver(subscriber_inventory)
+
+
+def resolve_imsi(value: str, tag_name: str = "name") -> str:
+    """IMSIまたはSIMの名前をIMSIに変換（subscriber_resolver を使う）"""
+    return subscriber_resolver.resolve_imsi(value, tag_name)
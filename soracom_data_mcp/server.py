@@ -1,9 +1,13 @@
 """MCPサーバー本体"""
 
 import argparse
+import asyncio
+import contextlib
+from collections.abc import AsyncIterator
 
 from fastmcp import FastMCP
 
+from soracom_data_mcp.export_queue import soracam_export_queue
 from soracom_data_mcp.tools import Mode, register_tools
 
 # モードの説明
@@ -15,12 +19,25 @@ MODE_DESCRIPTIONS = {
 }
 
 
+@contextlib.asynccontextmanager
+async def soracam_lifespan(server: FastMCP) -> AsyncIterator[None]:
+    """起動中は未完了のソラカメエクスポートジョブのポーリングを続ける"""
+    worker = asyncio.create_task(soracam_export_queue.run_worker())
+    try:
+        yield
+    finally:
+        worker.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await worker
+
+
 def create_server(mode: Mode) -> FastMCP:
     """MCPサーバーを作成"""
     description = MODE_DESCRIPTIONS.get(mode, "SORACOMデータ分析MCP")
     mcp = FastMCP(
         name=f"soracom-data-mcp ({mode})",
         instructions=f"SORACOMデータ分析用MCPサーバー - {description}",
+        lifespan=soracam_lifespan if mode in ("soracam", "all") else None,
     )
 
     # モードに応じたツールを登録
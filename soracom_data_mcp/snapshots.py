@@ -0,0 +1,107 @@
+"""スナップショットストア - 一覧の前回取得結果の保存と差分計算"""
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from soracom_data_mcp.storage import database_path, open_database
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    kind TEXT PRIMARY KEY,
+    taken_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS snapshot_items (
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (kind, key)
+);
+"""
+
+
+def diff_snapshots(
+    previous: dict[str, dict[str, Any]], current: dict[str, dict[str, Any]]
+) -> dict[str, Any]:
+    """2つのスナップショットの差分を計算
+
+    Returns:
+        追加されたキー、削除されたキー、値が変わった項目
+        （キーごとに {項目名: [前回の値, 今回の値]}）
+    """
+    changed = {}
+    for key in previous.keys() & current.keys():
+        before, after = previous[key], current[key]
+        changes = {
+            field: [before.get(field), after.get(field)]
+            for field in before.keys() | after.keys()
+            if before.get(field) != after.get(field)
+        }
+        if changes:
+            changed[key] = changes
+    return {
+        "added": sorted(current.keys() - previous.keys()),
+        "removed": sorted(previous.keys() - current.keys()),
+        "changed": dict(sorted(changed.items())),
+    }
+
+
+class SnapshotStore:
+    """一覧APIの取得結果を種類ごとに1世代だけSQLiteに保存するストア
+
+    保存時に前回のスナップショットを返すため、呼び出し側は前回からの
+    差分だけを利用者に返せる。プロセスを再起動しても前回の結果が残る
+    """
+
+    def __init__(self, path: Path | None = None) -> None:
+        self._path = path
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """データベース接続を取得（遅延初期化）"""
+        if self._conn is None:
+            self._conn = open_database(self._path or database_path("snapshots"))
+            self._conn.executescript(_SCHEMA)
+        return self._conn
+
+    def replace(
+        self, kind: str, items: dict[str, dict[str, Any]]
+    ) -> tuple[dict[str, dict[str, Any]], float | None]:
+        """スナップショットを置き換え、前回のスナップショットを返す
+
+        Args:
+            kind: スナップショットの種類
+            items: キー -> 値（JSONに変換できる辞書）
+
+        Returns:
+            前回のスナップショットと取得時刻（初回は空とNone）
+        """
+        with self._lock, self.conn:
+            row = self.conn.execute(
+                "SELECT taken_at FROM snapshots WHERE kind = ?", (kind,)
+            ).fetchone()
+            previous = {
+                r["key"]: json.loads(r["value"])
+                for r in self.conn.execute(
+                    "SELECT key, value FROM snapshot_items WHERE kind = ?", (kind,)
+                )
+            }
+            self.conn.execute("DELETE FROM snapshot_items WHERE kind = ?", (kind,))
+            self.conn.executemany(
+                "INSERT INTO snapshot_items (kind, key, value) VALUES (?, ?, ?)",
+                [(kind, key, json.dumps(value)) for key, value in items.items()],
+            )
+            self.conn.execute(
+                "INSERT OR REPLACE INTO snapshots (kind, taken_at) VALUES (?, ?)",
+                (kind, time.time()),
+            )
+        return previous, None if row is None else row["taken_at"]
+
+
+# シングルトンインスタンス
+snapshot_store = SnapshotStore()
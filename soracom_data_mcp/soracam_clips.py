@@ -0,0 +1,73 @@
+"""ソラカメクリップ計画 - イベント前後の録画エクスポート範囲の結合"""
+
+from bisect import bisect_left
+from itertools import pairwise
+from typing import Any
+
+from soracom_data_mcp.recording_coverage import Interval, RecordingCoverage
+
+# 録画エクスポート1件あたりの最大長（ミリ秒）
+MAX_CLIP_DURATION = 900_000
+
+
+def merge_event_windows(
+    timestamps: list[int], pad_before: int, pad_after: int, merge_gap: int = 0
+) -> list[Interval]:
+    """イベント時刻の前後を広げた区間を、重なり・merge_gap 以内の隙間で結合"""
+    windows: list[Interval] = []
+    for timestamp in sorted(timestamps):
+        start, end = timestamp - pad_before, timestamp + pad_after
+        if windows and start <= windows[-1][1] + merge_gap:
+            windows[-1] = (windows[-1][0], max(windows[-1][1], end))
+        else:
+            windows.append((start, end))
+    return windows
+
+
+def split_interval(interval: Interval, max_duration: int) -> list[Interval]:
+    """区間を max_duration 以下の等しい長さに分割（長さ0の区間は空のリスト）"""
+    start, end = interval
+    if end <= start:
+        return []
+    count = -(-(end - start) // max_duration)
+    bounds = [start + (end - start) * i // count for i in range(count + 1)]
+    return list(pairwise(bounds))
+
+
+def plan_clips(
+    timestamps: list[int],
+    pad_before: int,
+    pad_after: int,
+    coverage: RecordingCoverage | None = None,
+    merge_gap: int = 0,
+    max_duration: int = MAX_CLIP_DURATION,
+) -> dict[str, Any]:
+    """イベント時刻からエクスポートすべき最小限のクリップを計画
+
+    前後を広げたイベント区間を結合し、録画されている区間に切り詰めたうえで
+    エクスポートの最大長ごとに分割する
+
+    Args:
+        timestamps: イベント時刻（UNIXタイムスタンプ・ミリ秒）
+        pad_before: イベント前に含める長さ（ミリ秒）
+        pad_after: イベント後に含める長さ（ミリ秒）
+        coverage: 録画カバレッジ（未指定時は録画の有無で切り詰めない）
+        merge_gap: この長さ以下の隙間しかない区間は1つのクリップに結合（ミリ秒）
+        max_duration: クリップ1件あたりの最大長（ミリ秒）
+
+    Returns:
+        クリップの一覧（各クリップに含まれるイベント数つき）と、
+        どのクリップにも含まれない（録画外の）イベント数
+    """
+    events = sorted(timestamps)
+    clips: list[dict[str, Any]] = []
+    for window in merge_event_windows(events, pad_before, pad_after, merge_gap):
+        segments = [window] if coverage is None else coverage.intervals(*window)
+        for segment in segments:
+            for start, end in split_interval(segment, max_duration):
+                # クリップは重ならない半開区間なので、各イベントは高々1件に数えられる
+                count = bisect_left(events, end) - bisect_left(events, start)
+                clips.append({"from": start, "to": end, "event_count": count})
+
+    covered = sum(clip["event_count"] for clip in clips)
+    return {"clips": clips, "uncovered_events": len(events) - covered}
@@ -0,0 +1,154 @@
+"""ソラカメイベント - 複数カメラのイベント取得とマージ"""
+
+import heapq
+from collections.abc import Iterator
+from typing import Any
+
+from soracom_data_mcp.client import (
+    SoracomApiError,
+    handle_soracom_error,
+    soracom_client,
+)
+from soracom_data_mcp.parallel import run_concurrently
+
+# イベント一覧APIの1ページあたりの取得件数
+EVENT_PAGE_SIZE = 100
+
+
+def list_devices() -> list[dict[str, Any]]:
+    """ソラカメデバイスを全ページ取得"""
+    devices: list[dict[str, Any]] = []
+    for page in soracom_client.iter_pages("/sora_cam/devices", params={"limit": 100}):
+        devices.extend(device for device in page if isinstance(device, dict))
+    return devices
+
+
+def event_summary(event: dict[str, Any]) -> dict[str, Any]:
+    """イベントAPIのレスポンスを共通形式に変換"""
+    return {
+        "event_id": event.get("eventId"),
+        "device_id": event.get("deviceId"),
+        "event_type": event.get("eventType"),
+        "timestamp": event.get("time"),
+    }
+
+
+def fetch_event_page(
+    device_id: str,
+    from_time: int | None,
+    to_time: int | None,
+    sort: str = "desc",
+    last_evaluated_key: str | None = None,
+    page_size: int = EVENT_PAGE_SIZE,
+) -> tuple[list[dict[str, Any]], str | None]:
+    """1デバイスのイベントを1ページ取得"""
+    params: dict[str, Any] = {"sort": sort, "limit": page_size}
+    if from_time is not None:
+        params["from"] = from_time
+    if to_time is not None:
+        params["to"] = to_time
+    if last_evaluated_key:
+        params["last_evaluated_key"] = last_evaluated_key
+
+    items, next_key = soracom_client.get_page(
+        f"/sora_cam/devices/{device_id}/events", params=params
+    )
+    events = []
+    for item in items:
+        if isinstance(item, dict) and item.get("time") is not None:
+            event = event_summary(item)
+            event["device_id"] = event["device_id"] or device_id
+            events.append(event)
+    return events, next_key
+
+
+def iter_device_events(
+    device_id: str,
+    from_time: int | None,
+    to_time: int | None,
+    sort: str = "desc",
+    first_page: tuple[list[dict[str, Any]], str | None] | None = None,
+) -> Iterator[dict[str, Any]]:
+    """1デバイスのイベントを時刻順に返す（次ページは必要になった時点で取得）"""
+    events, next_key = first_page or fetch_event_page(
+        device_id, from_time, to_time, sort
+    )
+    while True:
+        yield from events
+        if not next_key:
+            return
+        events, next_key = fetch_event_page(
+            device_id, from_time, to_time, sort, last_evaluated_key=next_key
+        )
+
+
+def merge_device_events(
+    device_ids: list[str],
+    from_time: int | None,
+    to_time: int | None,
+    sort: str = "desc",
+    limit: int = 100,
+    event_type: str | None = None,
+) -> dict[str, Any]:
+    """複数デバイスのイベントを時刻順にk-wayマージ
+
+    各デバイスの先頭ページだけを並列に取得し、ヒープでマージしながら
+    limit 件に達するまで必要なデバイスの次ページだけを追加取得する。
+    イベント数の多いデバイスがあっても全件の取得を待たずに結果を返す
+
+    Returns:
+        マージ済みイベント、次ページ取得用の時刻、取得に失敗したデバイス
+    """
+    limit = max(1, limit)
+    first_pages = run_concurrently(
+        lambda device_id: fetch_event_page(device_id, from_time, to_time, sort),
+        device_ids,
+    )
+
+    errors: list[dict[str, Any]] = []
+
+    def guarded(
+        device_id: str, stream: Iterator[dict[str, Any]]
+    ) -> Iterator[dict[str, Any]]:
+        # 途中のページ取得に失敗したデバイスはそこで打ち切り、他のデバイスは続行
+        try:
+            for event in stream:
+                if not event_type or event["event_type"] == event_type:
+                    yield event
+        except SoracomApiError as e:
+            errors.append({"device_id": device_id, "error": handle_soracom_error(e)})
+
+    streams = []
+    for device_id, first_page in zip(device_ids, first_pages, strict=True):
+        if isinstance(first_page, SoracomApiError):
+            errors.append({
+                "device_id": device_id,
+                "error": handle_soracom_error(first_page),
+            })
+            continue
+        stream = iter_device_events(device_id, from_time, to_time, sort, first_page)
+        streams.append(guarded(device_id, stream))
+
+    merged = heapq.merge(
+        *streams, key=lambda event: event["timestamp"], reverse=sort == "desc"
+    )
+
+    events: list[dict[str, Any]] = []
+    truncated = False
+    for event in merged:
+        # 同時刻のイベントが次ページとの境界で欠けないよう、同時刻分は含める
+        if len(events) >= limit and event["timestamp"] != events[-1]["timestamp"]:
+            truncated = True
+            break
+        events.append(event)
+
+    next_cursor = None
+    if truncated:
+        last_time = events[-1]["timestamp"]
+        next_cursor = (
+            {"to_time": last_time - 1}
+            if sort == "desc"
+            else {"from_time": last_time + 1}
+        )
+
+    return {"events": events, "next": next_cursor, "errors": errors}
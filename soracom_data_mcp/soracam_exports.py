@@ -0,0 +1,237 @@
+"""ソラカメエクスポート - エクスポートジョブの開始と完了待ち"""
+
+import asyncio
+import time
+from collections import defaultdict
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from soracom_data_mcp.client import (
+    SoracomApiError,
+    handle_soracom_error,
+    soracom_client,
+)
+
+# 完了・失敗などこれ以上状態が変わらないエクスポートステータス
+TERMINAL_STATUSES = frozenset({"completed", "failed", "expired", "limitExceeded"})
+
+# ポーリング間隔（秒）: 初回から倍率をかけて上限まで伸ばす
+POLL_INITIAL_INTERVAL = 1.0
+POLL_BACKOFF_FACTOR = 1.5
+POLL_MAX_INTERVAL = 15.0
+
+# 同時に実行するエクスポート数の既定値（ソラカメのエクスポート制限に合わせて控えめにする）
+DEFAULT_EXPORT_CONCURRENCY = 4
+
+# 同じカメラで同時に実行するエクスポート数（全ツール共通）
+PER_DEVICE_EXPORT_CONCURRENCY = 2
+
+# エクスポート数の上限に達した場合の再試行回数と待ち時間（秒）
+LIMIT_RETRY_ATTEMPTS = 3
+LIMIT_RETRY_INTERVAL = 5.0
+
+# 完了待ちの経過を通知するコールバック（エクスポート情報, 経過秒数）
+ProgressCallback = Callable[[dict[str, Any], float], Awaitable[None]]
+
+# ジョブ1件の完了を通知するコールバック（ジョブのキー, 結果）
+ResultCallback = Callable[[Any, dict[str, Any]], Awaitable[None]]
+
+
+def export_summary(response: dict[str, Any] | list[Any]) -> dict[str, Any]:
+    """エクスポートAPIのレスポンスを共通形式に変換"""
+    if not isinstance(response, dict):
+        return {"export_id": None, "status": None, "url": None, "details": response}
+    return {
+        "export_id": response.get("exportId"),
+        "status": response.get("status"),
+        "url": response.get("url"),
+        "details": response,
+    }
+
+
+def start_video_export(device_id: str, from_time: int, to_time: int) -> dict[str, Any]:
+    """録画動画のエクスポートを開始"""
+    response = soracom_client.post(
+        f"/sora_cam/devices/{device_id}/videos/exports",
+        json={"from": from_time, "to": to_time},
+    )
+    return export_summary(response)
+
+
+def start_image_export(device_id: str, timestamp: int) -> dict[str, Any]:
+    """静止画のエクスポートを開始"""
+    response = soracom_client.post(
+        f"/sora_cam/devices/{device_id}/videos/images",
+        json={"time": timestamp},
+    )
+    return export_summary(response)
+
+
+def get_export_status(device_id: str, export_id: str) -> dict[str, Any]:
+    """エクスポート状況を取得"""
+    response = soracom_client.get(
+        f"/sora_cam/devices/{device_id}/videos/exports/{export_id}"
+    )
+    return export_summary(response)
+
+
+def is_finished(export: dict[str, Any]) -> bool:
+    """エクスポートが終了状態（またはURL取得済み）かを判定"""
+    return export.get("status") in TERMINAL_STATUSES or (
+        export.get("status") is None and bool(export.get("url"))
+    )
+
+
+async def wait_for_export(
+    device_id: str,
+    export: dict[str, Any],
+    timeout_seconds: float,
+    on_progress: ProgressCallback | None = None,
+) -> dict[str, Any]:
+    """エクスポートの完了をサーバー側でポーリングして待つ
+
+    ポーリング間隔は POLL_INITIAL_INTERVAL から POLL_BACKOFF_FACTOR 倍ずつ
+    POLL_MAX_INTERVAL まで伸ばし、短時間で終わるジョブには素早く、長時間の
+    ジョブにはAPI呼び出しを抑えて追従する
+
+    Args:
+        device_id: デバイスID
+        export: 開始時のエクスポート情報（export_summary 形式）
+        timeout_seconds: 最大待ち時間（秒）
+        on_progress: ポーリングごとに呼ばれるコールバック
+
+    Returns:
+        最終的なエクスポート情報に timed_out・elapsed_seconds・polls を加えたもの
+    """
+    started = time.monotonic()
+    interval = POLL_INITIAL_INTERVAL
+    polls = 0
+
+    while not is_finished(export):
+        export_id = export.get("export_id")
+        if not export_id:
+            raise SoracomApiError("エクスポートIDを取得できませんでした")
+
+        remaining = timeout_seconds - (time.monotonic() - started)
+        if remaining <= 0:
+            break
+
+        await asyncio.sleep(min(interval, remaining))
+        interval = min(interval * POLL_BACKOFF_FACTOR, POLL_MAX_INTERVAL)
+
+        export = await asyncio.to_thread(get_export_status, device_id, export_id)
+        polls += 1
+        if on_progress is not None:
+            await on_progress(export, time.monotonic() - started)
+
+    return {
+        **export,
+        "timed_out": not is_finished(export),
+        "elapsed_seconds": round(time.monotonic() - started, 1),
+        "polls": polls,
+    }
+
+
+def skipped_export() -> dict[str, Any]:
+    """期限切れで開始しなかったエクスポートの結果（wait_for_export と同じ形式）"""
+    return {
+        "export_id": None,
+        "status": None,
+        "url": None,
+        "details": None,
+        "timed_out": True,
+        "skipped": True,
+        "elapsed_seconds": 0.0,
+        "polls": 0,
+    }
+
+
+def _is_limit_exceeded(error: SoracomApiError | None, export: dict[str, Any]) -> bool:
+    """エクスポート数の上限による失敗かを判定"""
+    if error is not None:
+        return error.status_code == 429
+    return export.get("status") == "limitExceeded"
+
+
+async def export_with_retry(
+    device_id: str,
+    start: Callable[[], dict[str, Any]],
+    deadline: float,
+) -> dict[str, Any]:
+    """エクスポートを開始して完了を待つ（上限超過時は間隔を空けて再試行）
+
+    期限を過ぎてから順番が来た場合は、結果を待てないエクスポートで上限を
+    消費しないよう、開始せずに skipped の結果を返す
+
+    Args:
+        device_id: デバイスID
+        start: エクスポートを開始する関数（export_summary 形式を返す）
+        deadline: 完了待ちの期限（time.monotonic() 基準）
+    """
+    attempt = 0
+    while True:
+        if deadline - time.monotonic() <= 0:
+            return skipped_export()
+        error: SoracomApiError | None = None
+        result: dict[str, Any] = {}
+        try:
+            export = await asyncio.to_thread(start)
+            result = await wait_for_export(
+                device_id, export, max(0.0, deadline - time.monotonic())
+            )
+        except SoracomApiError as e:
+            error = e
+
+        retryable = _is_limit_exceeded(error, result)
+        remaining = deadline - time.monotonic()
+        if not retryable or attempt >= LIMIT_RETRY_ATTEMPTS or remaining <= 0:
+            if error is not None:
+                raise error
+            return result
+
+        attempt += 1
+        await asyncio.sleep(min(LIMIT_RETRY_INTERVAL * attempt, remaining))
+
+
+async def run_export_jobs(
+    jobs: dict[Any, tuple[str, Callable[[], dict[str, Any]]]],
+    timeout_seconds: float,
+    max_concurrency: int = DEFAULT_EXPORT_CONCURRENCY,
+    on_result: ResultCallback | None = None,
+) -> dict[Any, dict[str, Any]]:
+    """複数のエクスポートジョブを同時実行数を制限して実行
+
+    全体の同時実行数を max_concurrency に、同一デバイスのエクスポートを
+    PER_DEVICE_EXPORT_CONCURRENCY 件までに制限する。全ジョブで
+    timeout_seconds の期限を共有する
+
+    Args:
+        jobs: ジョブのキー -> (デバイスID, エクスポート開始関数)
+        timeout_seconds: 全体の最大待ち時間（秒）
+        max_concurrency: 同時に実行するエクスポート数
+        on_result: ジョブ完了ごとに呼ばれるコールバック
+
+    Returns:
+        ジョブのキー -> 結果（失敗時は error を含む）
+    """
+    deadline = time.monotonic() + timeout_seconds
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    device_semaphores: defaultdict[str, asyncio.Semaphore] = defaultdict(
+        lambda: asyncio.Semaphore(PER_DEVICE_EXPORT_CONCURRENCY)
+    )
+
+    async def run(
+        key: Any, device_id: str, start: Callable[[], dict[str, Any]]
+    ) -> dict[str, Any]:
+        async with device_semaphores[device_id], semaphore:
+            try:
+                result = await export_with_retry(device_id, start, deadline)
+            except SoracomApiError as e:
+                result = {"error": handle_soracom_error(e)}
+        if on_result is not None:
+            await on_result(key, result)
+        return result
+
+    keys = list(jobs)
+    results = await asyncio.gather(*(run(key, *jobs[key]) for key in keys))
+    return dict(zip(keys, results, strict=True))
@@ -0,0 +1,95 @@
+"""統計キャッシュ - 締まった期間の統計のローカル保存"""
+
+import json
+import sqlite3
+import threading
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from soracom_data_mcp.storage import database_path, open_database
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS stats (
+    kind TEXT NOT NULL,
+    imsi TEXT NOT NULL,
+    from_time INTEGER NOT NULL,
+    to_time INTEGER NOT NULL,
+    period TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (kind, imsi, from_time, to_time, period)
+);
+"""
+
+# 期間の終了からこの秒数が経過した統計を確定したものとして保存する
+# （統計は遅れて集計されるため、終了直後の値は変わりうる）
+STATS_SETTLE_SECONDS = 86400
+
+
+class StatsCache:
+    """終了した期間のAir・Harvest統計をSQLiteに保存するキャッシュ
+
+    期間の終了から STATS_SETTLE_SECONDS 以上経過した統計は変わらないため、
+    SIM・期間・集計単位ごとに保存し、同じ条件の集計では再取得しない
+    """
+
+    def __init__(self, path: Path | None = None) -> None:
+        self._path = path
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """データベース接続を取得（遅延初期化）"""
+        if self._conn is None:
+            self._conn = open_database(self._path or database_path("stats"))
+            self._conn.executescript(_SCHEMA)
+        return self._conn
+
+    def fetch(
+        self,
+        kind: str,
+        imsi: str,
+        from_time: int,
+        to_time: int,
+        period: str,
+        fetch: Callable[[], list[dict[str, Any]]],
+    ) -> tuple[list[dict[str, Any]], bool]:
+        """統計を取得（終了した期間は保存済みのものを返し、なければ取得して保存）
+
+        Args:
+            kind: 統計の種類（air, harvest）
+            imsi: SIMのIMSI
+            from_time: 開始時刻（UNIXタイムスタンプ・秒）
+            to_time: 終了時刻（UNIXタイムスタンプ・秒）
+            period: 集計単位
+            fetch: 統計を取得する関数
+
+        Returns:
+            統計とキャッシュから返したかどうか
+        """
+        key = (kind, imsi, from_time, to_time, period)
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT data FROM stats WHERE kind = ? AND imsi = ?"
+                " AND from_time = ? AND to_time = ? AND period = ?",
+                key,
+            ).fetchone()
+        if row is not None:
+            return json.loads(row["data"]), True
+
+        stats = fetch()
+        if to_time + STATS_SETTLE_SECONDS <= time.time():
+            with self._lock, self.conn:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO stats"
+                    " (kind, imsi, from_time, to_time, period, data)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    (*key, json.dumps(stats)),
+                )
+        return stats, False
+
+
+# シングルトンインスタンス
+stats_cache = StatsCache()
@@ -0,0 +1,24 @@
+"""ローカルストレージ - キャッシュ用SQLiteデータベースの管理"""
+
+import sqlite3
+from pathlib import Path
+
+from soracom_data_mcp.config import settings
+
+
+def database_path(name: str) -> Path:
+    """キャッシュディレクトリ内のデータベースファイルパスを返す"""
+    return settings.cache_dir / f"{name}.sqlite3"
+
+
+def open_database(path: Path) -> sqlite3.Connection:
+    """SQLiteデータベースを開く（ディレクトリがなければ作成）
+
+    ツール呼び出しはワーカースレッドから行われるため、スレッド間で共有できる
+    接続を返す。書き込みの排他は呼び出し側のロックで行う
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    return conn
@@ -0,0 +1,50 @@
+"""SIM一覧 - 条件に合うSIMの全ページ取得"""
+
+from typing import Any
+
+from soracom_data_mcp.client import soracom_client
+
+
+def subscriber_summary(subscriber: dict[str, Any]) -> dict[str, Any]:
+    """SIM APIのレスポンスを一覧表示用の形式に変換"""
+    return {
+        "imsi": subscriber.get("imsi"),
+        "msisdn": subscriber.get("msisdn"),
+        "iccid": subscriber.get("iccid"),
+        "status": subscriber.get("status"),
+        "speed_class": subscriber.get("speedClass"),
+        "tags": subscriber.get("tags", {}),
+        "group_id": subscriber.get("groupId"),
+        "subscription": subscriber.get("subscription"),
+    }
+
+
+def list_all_subscribers(
+    group_id: str | None = None,
+    status_filter: str | None = None,
+    speed_class_filter: str | None = None,
+    tag_name: str | None = None,
+    tag_value: str | None = None,
+    tag_value_match_mode: str = "exact",
+) -> list[dict[str, Any]]:
+    """条件に合うSIMを全ページ取得（group_id 指定時はグループ内のSIMのみ）"""
+    params: dict[str, Any] = {"limit": 100}
+    if status_filter:
+        params["status_filter"] = status_filter
+    if speed_class_filter:
+        params["speed_class_filter"] = speed_class_filter
+    if tag_name:
+        params["tag_name"] = tag_name
+    if tag_value:
+        params["tag_value"] = tag_value
+        params["tag_value_match_mode"] = tag_value_match_mode
+
+    path = f"/groups/{group_id}/subscribers" if group_id else "/subscribers"
+    subscribers: list[dict[str, Any]] = []
+    for page in soracom_client.iter_pages(path, params=params):
+        subscribers.extend(
+            subscriber
+            for subscriber in page
+            if isinstance(subscriber, dict) and subscriber.get("imsi")
+        )
+    return subscribers
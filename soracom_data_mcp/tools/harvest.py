@@ -1,10 +1,198 @@
 """Harvest Data/Files ツール - センサーデータ・ファイルストレージ取得"""
 
+import codecs
+import csv
+import json
+import time
+from collections.abc import Iterator
+from datetime import UTC, datetime
 from typing import Any
+from urllib.parse import parse_qsl, urlsplit
 
 from fastmcp import FastMCP
 
+from soracom_data_mcp.aggregate import (
+    GroupAggregator,
+    compile_filters,
+    get_field,
+    to_number,
+)
+from soracom_data_mcp.cache import TTLCache
 from soracom_data_mcp.client import SoracomApiError, handle_soracom_error, soracom_client
+from soracom_data_mcp.file_index import harvest_file_index, top_prefixes
+from soracom_data_mcp.harvest_data import (
+    fetch_latest_record,
+    filter_harvest_data,
+    iter_harvest_data,
+    record_content,
+)
+from soracom_data_mcp.location_store import harvest_location_store
+from soracom_data_mcp.parallel import run_concurrently
+from soracom_data_mcp.resample import (
+    RESAMPLE_METHODS,
+    Resampler,
+    align_series,
+    grid_size,
+)
+from soracom_data_mcp.resolver import SubscriberNameError, resolve_imsi
+
+# プレビューで取得する最大バイト数
+MAX_PREVIEW_BYTES = 65536
+
+# ダウンロードURLを有効期限の何秒前までキャッシュから返すか
+DOWNLOAD_URL_EXPIRY_MARGIN = 60
+
+# 有効期限をURLから読み取れない場合のキャッシュ期間（秒）
+DOWNLOAD_URL_DEFAULT_TTL = 60
+
+# 一括取得できるパス数の上限
+MAX_BATCH_PATHS = 1000
+
+# ファイル集計で保持するグループ数の上限
+MAX_AGGREGATE_GROUPS = 10_000
+
+# 最新のHarvest Dataをキャッシュする期間（秒）
+LATEST_RECORD_TTL = 30
+
+# 最新値を一括取得できるSIM数の上限
+MAX_LATEST_SIMS = 1000
+
+# 時系列を揃えるグリッドの最大区間数
+MAX_GRID_POINTS = 2000
+
+# 一度に揃えられる系列（SIM）数の上限
+MAX_ALIGNED_SERIES = 50
+
+# フィルタ付きのHarvest Data取得で調べるレコード数の上限
+MAX_FILTER_SCAN = 100_000
+
+# 位置情報の検索で返す最大件数
+MAX_LOCATION_RESULTS = 5000
+
+# IMSI -> 最新のHarvest Data（データがない場合はNone）
+latest_record_cache: TTLCache[str, dict[str, Any] | None] = TTLCache(
+    ttl_seconds=LATEST_RECORD_TTL, max_size=4096
+)
+
+# (scope, path) -> (APIのレスポンス, 有効期限)
+download_url_cache: TTLCache[
+    tuple[str, str], tuple[dict[str, Any], float | None]
+] = TTLCache(ttl_seconds=DOWNLOAD_URL_DEFAULT_TTL, max_size=4096)
+
+
+def _presigned_url_expiry(url: str) -> float | None:
+    """署名付きURLのクエリから有効期限（UNIXタイムスタンプ・秒）を読み取る"""
+    query = {key.lower(): value for key, value in parse_qsl(urlsplit(url).query)}
+
+    # 署名バージョン4: X-Amz-Date（署名時刻）+ X-Amz-Expires（有効秒数）
+    signed_at = query.get("x-amz-date")
+    expires_in = query.get("x-amz-expires")
+    if signed_at and expires_in and expires_in.isdigit():
+        try:
+            signed = datetime.strptime(signed_at, "%Y%m%dT%H%M%SZ")
+        except ValueError:
+            return None
+        return signed.replace(tzinfo=UTC).timestamp() + int(expires_in)
+
+    # 署名バージョン2: Expires（有効期限のUNIXタイムスタンプ）
+    expires = query.get("expires")
+    if expires and expires.isdigit():
+        return float(expires)
+
+    return None
+
+
+def _get_download_url(scope: str, path: str) -> dict[str, Any]:
+    """ダウンロード用URLを取得（有効期限が近づくまではキャッシュを返す）
+
+    Returns:
+        APIのレスポンスに有効期限（expires_at）とキャッシュから返したか
+        （cached）を加えたもの
+    """
+    normalized_path = path.lstrip("/")
+    key = (scope, normalized_path)
+    cached = download_url_cache.get(key)
+    if cached is not None:
+        return {**cached[0], "expires_at": cached[1], "cached": True}
+
+    response = soracom_client.get(
+        f"/files/{scope}/{normalized_path}", params={"redirect": "false"}
+    )
+    result = response if isinstance(response, dict) else {"url": response}
+    if not result.get("url"):
+        return {**result, "expires_at": None, "cached": False}
+
+    expires_at = _presigned_url_expiry(str(result["url"]))
+    if expires_at is None:
+        download_url_cache.set(key, (result, None))
+    elif expires_at - DOWNLOAD_URL_EXPIRY_MARGIN > time.time():
+        download_url_cache.set(
+            key,
+            (result, expires_at),
+            expires_at=expires_at - DOWNLOAD_URL_EXPIRY_MARGIN,
+        )
+    return {**result, "expires_at": expires_at, "cached": False}
+
+
+def _resolve_download_url(scope: str, path: str) -> str:
+    """Harvest Filesのダウンロード用URLを解決"""
+    url = _get_download_url(scope, path).get("url")
+    if not url:
+        raise SoracomApiError("ダウンロードURLを取得できませんでした")
+    return str(url)
+
+
+def _decode_text(data: bytes, position: str) -> str:
+    """切り出したバイト列をUTF-8テキストとしてデコード
+
+    範囲の境界で分断されたマルチバイト文字は除外する
+    """
+    if position == "tail":
+        # 先頭の継続バイト（0b10xxxxxx）を読み飛ばす
+        skip = 0
+        while skip < min(len(data), 3) and data[skip] & 0xC0 == 0x80:
+            skip += 1
+        data = data[skip:]
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    return decoder.decode(data, final=False)
+
+
+def _detect_file_format(path: str) -> str:
+    """拡張子からファイル形式（csv / jsonl / json）を判定"""
+    lowered = path.lower()
+    if lowered.endswith((".jsonl", ".ndjson")):
+        return "jsonl"
+    if lowered.endswith(".json"):
+        return "json"
+    return "csv"
+
+
+def _iter_records(
+    lines: Iterator[str], file_format: str, delimiter: str
+) -> Iterator[dict[str, Any] | None]:
+    """行ストリームをレコードに逐次変換（解釈できない行は None）"""
+    if file_format == "csv":
+        reader = csv.DictReader(lines, delimiter=delimiter)
+        while True:
+            try:
+                row = next(reader)
+            except StopIteration:
+                return
+            except csv.Error:
+                # 上限を超える長さのフィールドなどは読み飛ばして次の行に進む
+                yield None
+                continue
+            yield row
+
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            yield None
+            continue
+        yield record if isinstance(record, dict) else None
 
 
 def register_harvest_tools(mcp: FastMCP) -> None:
@@ -22,22 +210,53 @@ def register_harvest_tools(mcp: FastMCP) -> None:
         sort: str = "desc",
         limit: int = 100,
         last_evaluated_key: str | None = None,
+        filters: list[str] | None = None,
+        max_scanned: int = 10000,
     ) -> dict[str, Any]:
         """
         特定SIMのHarvest Dataを取得します
 
+        filters を指定した場合は、ページを順に取得しながら条件に合う
+        レコードだけを返します（条件に合わないレコードは返しません）。
+        続きは next の時刻を from_time（asc）または to_time（desc）に指定して
+        取得します（同じ時刻のレコードは1回の呼び出しでまとめて返すため、
+        limit を少し超えることがあります）
+
         Args:
-            imsi: SIMのIMSI
+            imsi: SIMのIMSI、またはSIMの名前（tags.name）
             from_time: 取得開始時刻（UNIXタイムスタンプ・ミリ秒）
             to_time: 取得終了時刻（UNIXタイムスタンプ・ミリ秒）
             sort: ソート順（asc: 古い順, desc: 新しい順）
             limit: 取得件数（最大1000）
-            last_evaluated_key: ページング用キー
+            last_evaluated_key: ページング用キー（filters 指定時は使わない）
+            filters: フィルタ式のリスト（AND条件、例: ["content.temp > 30"]）
+            max_scanned: filters 指定時に調べるレコード数の上限（最大100000）
 
         Returns:
-            Harvest Dataのリストと次ページのキー
+            Harvest Dataのリストと次ページのキー（filters 指定時は調べた件数と
+            続きを取得する時刻）
         """
+        predicate = None
+        if filters:
+            try:
+                predicate = compile_filters(filters)
+            except ValueError as e:
+                return {"error": str(e)}
+
         try:
+            imsi = resolve_imsi(imsi)
+            if predicate is not None:
+                result = filter_harvest_data(
+                    imsi,
+                    from_time,
+                    to_time,
+                    predicate,
+                    sort=sort,
+                    limit=max(1, min(limit, 1000)),
+                    max_scanned=max(1, min(max_scanned, MAX_FILTER_SCAN)),
+                )
+                return {**result, "count": len(result["data"])}
+
             params: dict[str, Any] = {
                 "sort": sort,
                 "limit": min(limit, 1000),
@@ -62,6 +281,306 @@ def register_harvest_tools(mcp: FastMCP) -> None:
 
         except SoracomApiError as e:
             return {"error": handle_soracom_error(e)}
+        except SubscriberNameError as e:
+            return {"error": str(e)}
+
+    @mcp.tool()
+    def get_latest_harvest_data(
+        imsis: list[str],
+        fields: list[str] | None = None,
+        refresh: bool = False,
+    ) -> dict[str, Any]:
+        """
+        複数SIMの最新のHarvest Dataを1SIM1行の表で返します
+
+        各SIMの最新1件を並列に取得し、30秒間キャッシュします
+
+        Args:
+            imsis: SIMのIMSI、またはSIMの名前（tags.name）のリスト（最大1000件）
+            fields: 返すcontent内のフィールド（例: ["temp", "sensor.humidity"]、
+                未指定時はcontent全体）
+            refresh: キャッシュを使わずに取得する
+
+        Returns:
+            列名と行（IMSI、時刻、contentまたは各フィールドの値）、
+            データのないSIM、取得に失敗したSIM
+        """
+        errors = []
+        resolved = []
+        for value in list(dict.fromkeys(imsis))[:MAX_LATEST_SIMS]:
+            try:
+                resolved.append(resolve_imsi(value))
+            except SoracomApiError as e:
+                errors.append({"imsi": value, "error": handle_soracom_error(e)})
+            except SubscriberNameError as e:
+                errors.append({"imsi": value, "error": str(e)})
+        resolved = list(dict.fromkeys(resolved))
+
+        records: dict[str, dict[str, Any] | None] = {}
+        for imsi in resolved:
+            entry = None if refresh else latest_record_cache.get_entry(imsi)
+            if entry is not None:
+                records[imsi] = entry[0]
+        cached_count = len(records)
+
+        missing = [imsi for imsi in resolved if imsi not in records]
+        for imsi, result in zip(
+            missing, run_concurrently(fetch_latest_record, missing), strict=True
+        ):
+            if isinstance(result, SoracomApiError):
+                errors.append({"imsi": imsi, "error": handle_soracom_error(result)})
+                continue
+            latest_record_cache.set(imsi, result)
+            records[imsi] = result
+
+        rows = []
+        no_data = []
+        for imsi in resolved:
+            if imsi not in records:
+                continue
+            record = records[imsi]
+            if record is None:
+                no_data.append(imsi)
+                continue
+            content = record_content(record)
+            values = (
+                [get_field(content, field) for field in fields]
+                if fields
+                else [content]
+            )
+            rows.append([imsi, record.get("time"), *values])
+
+        return {
+            "columns": ["imsi", "time", *(fields or ["content"])],
+            "rows": rows,
+            "count": len(rows),
+            "cached_count": cached_count,
+            "no_data": no_data,
+            "errors": errors,
+        }
+
+    @mcp.tool()
+    def get_aligned_harvest_series(
+        imsis: list[str],
+        field: str,
+        from_time: int,
+        to_time: int,
+        step_seconds: int = 300,
+        method: str = "mean",
+    ) -> dict[str, Any]:
+        """
+        複数SIMのHarvest Dataの数値フィールドを共通の時間グリッドに揃えて返します
+
+        各SIMのデータを並列にストリーミング取得し、step_seconds ごとの区間に
+        まとめます。元のデータ点は返さず、時刻×SIMの行列だけを返します
+
+        Args:
+            imsis: SIMのIMSI、またはSIMの名前（tags.name）のリスト（最大50件）
+            field: 揃えるcontent内の数値フィールド（例: "temp", "sensor.temp"）
+            from_time: 開始時刻（UNIXタイムスタンプ・ミリ秒）
+            to_time: 終了時刻（UNIXタイムスタンプ・ミリ秒、含まない）
+            step_seconds: グリッドの間隔（秒、区間数は最大2000）
+            method: mean（区間内の平均、値のない区間はnull）,
+                ffill（区間内の最後の値、値のない区間は直前の値を引き継ぐ）
+
+        Returns:
+            列名（time と各IMSI）と行（区間の開始時刻と各SIMの値）、
+            SIMごとの元のデータ点数、取得に失敗したSIM
+        """
+        if method not in RESAMPLE_METHODS:
+            return {
+                "error": f"method は {', '.join(RESAMPLE_METHODS)} のいずれかです"
+            }
+        step = step_seconds * 1000
+        if step <= 0 or to_time <= from_time:
+            return {"error": "step_seconds は正の値、to_time は from_time より後にしてください"}
+        size = grid_size(from_time, to_time, step)
+        if size > MAX_GRID_POINTS:
+            return {
+                "error": f"区間数が上限（{MAX_GRID_POINTS}）を超えています。"
+                "step_seconds を大きくするか期間を短くしてください"
+            }
+
+        errors = []
+        resolved = []
+        for value in list(dict.fromkeys(imsis))[:MAX_ALIGNED_SERIES]:
+            try:
+                resolved.append(resolve_imsi(value))
+            except SoracomApiError as e:
+                errors.append({"imsi": value, "error": handle_soracom_error(e)})
+            except SubscriberNameError as e:
+                errors.append({"imsi": value, "error": str(e)})
+        resolved = list(dict.fromkeys(resolved))
+
+        def resample(imsi: str) -> tuple[list[float | None], int]:
+            resampler = Resampler(from_time, to_time, step)
+            points = 0
+            for record in iter_harvest_data(imsi, from_time, to_time):
+                value = to_number(get_field(record_content(record), field))
+                if value is not None:
+                    resampler.add(int(record["time"]), value)
+                    points += 1
+            return resampler.values(method), points
+
+        imsi_columns = []
+        series = []
+        point_counts = {}
+        for imsi, result in zip(
+            resolved, run_concurrently(resample, resolved), strict=True
+        ):
+            if isinstance(result, SoracomApiError):
+                errors.append({"imsi": imsi, "error": handle_soracom_error(result)})
+                continue
+            imsi_columns.append(imsi)
+            series.append(result[0])
+            point_counts[imsi] = result[1]
+
+        times = [from_time + i * step for i in range(size)]
+        return {
+            "field": field,
+            "method": method,
+            "step_seconds": step_seconds,
+            "columns": ["time", *imsi_columns],
+            "rows": align_series(series, times),
+            "point_counts": point_counts,
+            "errors": errors,
+        }
+
+    @mcp.tool()
+    def sync_harvest_locations(
+        imsis: list[str],
+        since_hours: int = 24,
+        lat_field: str = "lat",
+        lon_field: str = "lon",
+    ) -> dict[str, Any]:
+        """
+        SIMのHarvest Dataから位置情報（緯度経度）だけをローカルに差分同期します
+
+        2回目以降は前回の同期以降のデータだけを取得します。
+        同期した位置情報は find_harvest_locations_local で検索できます
+
+        Args:
+            imsis: SIMのIMSI、またはSIMの名前（tags.name）のリスト
+            since_hours: 初回同期で遡る時間（時間）
+            lat_field: 緯度のcontent内のフィールド（例: "lat", "gps.latitude"）
+            lon_field: 経度のcontent内のフィールド（例: "lon", "gps.longitude"）
+
+        Returns:
+            SIMごとの新規位置情報数と同期済みの期間
+        """
+        now = int(time.time() * 1000)
+        since = now - since_hours * 3_600_000
+
+        def sync(value: str) -> dict[str, Any]:
+            try:
+                imsi = resolve_imsi(value)
+            except SubscriberNameError as e:
+                return {"imsi": value, "error": str(e)}
+            return harvest_location_store.sync(imsi, since, now, lat_field, lon_field)
+
+        sims = []
+        values = list(dict.fromkeys(imsis))
+        for value, result in zip(
+            values, run_concurrently(sync, values), strict=True
+        ):
+            if isinstance(result, SoracomApiError):
+                sims.append({"imsi": value, "error": handle_soracom_error(result)})
+            else:
+                sims.append(result)
+
+        return {
+            "sims": sims,
+            "new_locations": sum(sim.get("new_locations", 0) for sim in sims),
+        }
+
+    @mcp.tool()
+    def find_harvest_locations_local(
+        bbox: list[float] | None = None,
+        center_lat: float | None = None,
+        center_lon: float | None = None,
+        radius_meters: float | None = None,
+        imsis: list[str] | None = None,
+        from_time: int | None = None,
+        to_time: int | None = None,
+        limit: int = 1000,
+    ) -> dict[str, Any]:
+        """
+        ローカルに同期済みの位置情報から範囲内のものを検索します（APIは呼びません）
+
+        bbox（矩形）か center_lat・center_lon・radius_meters（円）の
+        どちらかを指定します。事前に sync_harvest_locations で同期してください
+
+        Args:
+            bbox: [最小緯度, 最小経度, 最大緯度, 最大経度]
+            center_lat: 円の中心の緯度
+            center_lon: 円の中心の経度
+            radius_meters: 円の半径（メートル）
+            imsis: 対象のSIMのIMSI（未指定時は同期済みの全SIM）
+            from_time: 検索開始時刻（UNIXタイムスタンプ・ミリ秒）
+            to_time: 検索終了時刻（UNIXタイムスタンプ・ミリ秒）
+            limit: 返す位置情報の最大数（最大5000）
+
+        Returns:
+            範囲内の位置情報（時刻順）、SIMごとの件数と最初・最後の時刻
+        """
+        try:
+            imsis = [resolve_imsi(value) for value in imsis] if imsis else None
+        except SubscriberNameError as e:
+            return {"error": str(e)}
+        except SoracomApiError as e:
+            return {"error": handle_soracom_error(e)}
+
+        if bbox is not None:
+            if len(bbox) != 4 or bbox[0] > bbox[2] or bbox[1] > bbox[3]:
+                return {
+                    "error": "bbox は [最小緯度, 最小経度, 最大緯度, 最大経度] で"
+                    "指定してください"
+                }
+            min_lat, min_lon, max_lat, max_lon = bbox
+            locations = harvest_location_store.query_bbox(
+                min_lat,
+                min_lon,
+                max_lat,
+                max_lon,
+                imsis=imsis,
+                from_time=from_time,
+                to_time=to_time,
+            )
+        elif (
+            center_lat is not None
+            and center_lon is not None
+            and radius_meters is not None
+            and radius_meters > 0
+        ):
+            locations = harvest_location_store.query_radius(
+                center_lat,
+                center_lon,
+                radius_meters,
+                imsis=imsis,
+                from_time=from_time,
+                to_time=to_time,
+            )
+        else:
+            return {
+                "error": "bbox、または center_lat・center_lon・radius_meters を"
+                "指定してください"
+            }
+
+        sims: dict[str, dict[str, Any]] = {}
+        for location in locations:
+            sim = sims.setdefault(
+                location["imsi"], {"count": 0, "first_time": location["time"]}
+            )
+            sim["count"] += 1
+            sim["last_time"] = location["time"]
+
+        limit = max(1, min(limit, MAX_LOCATION_RESULTS))
+        return {
+            "locations": locations[:limit],
+            "count": len(locations),
+            "truncated": len(locations) > limit,
+            "sims": sims,
+        }
 
     @mcp.tool()
     def get_harvest_data_by_resource(
@@ -187,6 +706,54 @@ def register_harvest_tools(mcp: FastMCP) -> None:
         except SoracomApiError as e:
             return {"error": handle_soracom_error(e)}
 
+    @mcp.tool()
+    def get_harvest_file_usage(
+        scope: str = "private",
+        path: str = "/",
+        depth: int = 1,
+        top_n: int = 10,
+        max_age_seconds: int = 3600,
+        refresh: bool = False,
+    ) -> dict[str, Any]:
+        """
+        Harvest Filesのプレフィックス（ディレクトリ）別の使用量を集計します
+
+        ディレクトリ一覧はローカルにキャッシュされ、max_age_seconds より古い
+        ディレクトリだけを並列に再取得します
+
+        Args:
+            scope: スコープ（private または operators/{operator_id}）
+            path: 集計の起点ディレクトリ（デフォルト: /）
+            depth: 起点から何階層目までをプレフィックスとして集計するか
+            top_n: 返すプレフィックス数（使用量の大きい順）
+            max_age_seconds: キャッシュを再利用するディレクトリ一覧の有効期間（秒）
+            refresh: Trueの場合はキャッシュを使わずすべて再取得
+
+        Returns:
+            合計使用量とプレフィックス別の使用量ランキング
+        """
+        try:
+            walk_stats = harvest_file_index.walk(
+                scope, path, max_age_seconds=0 if refresh else max_age_seconds
+            )
+            totals, prefixes = harvest_file_index.usage(
+                scope, path, depth=max(depth, 0)
+            )
+
+            return {
+                "scope": scope,
+                "path": path,
+                "total_size": totals["size"],
+                "file_count": totals["file_count"],
+                "prefix_count": len(prefixes),
+                "top_prefixes": top_prefixes(prefixes, top_n),
+                "directories_listed": walk_stats["listed"],
+                "directories_cached": walk_stats["cached"],
+            }
+
+        except SoracomApiError as e:
+            return {"error": handle_soracom_error(e)}
+
     @mcp.tool()
     def get_harvest_file_download_url(
         scope: str,
@@ -200,21 +767,189 @@ def register_harvest_tools(mcp: FastMCP) -> None:
             path: ファイルパス
 
         Returns:
-            ダウンロード用URL（リダイレクトURL）
+            ダウンロード用URL（リダイレクトURL）に、有効期限（expires_at、
+            UNIXタイムスタンプ・秒）とキャッシュから返したか（cached）を加えたもの
         """
         try:
-            # パスの先頭の / を除去
-            normalized_path = path.lstrip("/")
-            endpoint = f"/files/{scope}/{normalized_path}"
+            return _get_download_url(scope, path)
 
-            # redirect=false でURLを取得
-            response = soracom_client.get(endpoint, params={"redirect": "false"})
+        except SoracomApiError as e:
+            return {"error": handle_soracom_error(e)}
 
-            if isinstance(response, dict):
-                return response
+    @mcp.tool()
+    def get_harvest_file_download_urls(
+        scope: str,
+        paths: list[str],
+    ) -> dict[str, Any]:
+        """
+        Harvest Filesの複数ファイルのダウンロード用URLをまとめて取得します
+
+        有効期限内のURLはキャッシュから返し、残りは並列に取得します
+
+        Args:
+            scope: スコープ（private または operators/{operator_id}）
+            paths: ファイルパスのリスト（最大1000件）
 
-            return {"url": response}
+        Returns:
+            パスごとのダウンロード用URL（取得に失敗したパスはerror）。
+            上限を超えたパスは取得せず、その件数を dropped_count に返します
+        """
+        unique_paths = list(dict.fromkeys(paths))
+        paths = unique_paths[:MAX_BATCH_PATHS]
+        results = run_concurrently(lambda path: _get_download_url(scope, path), paths)
+
+        urls = []
+        for path, result in zip(paths, results, strict=True):
+            if isinstance(result, SoracomApiError):
+                urls.append({"path": path, "error": handle_soracom_error(result)})
+            else:
+                urls.append({"path": path, **result})
+
+        return {
+            "scope": scope,
+            "urls": urls,
+            "count": len(urls),
+            "cached_count": sum(1 for url in urls if url.get("cached")),
+            "error_count": sum(1 for url in urls if "error" in url),
+            "truncated": len(unique_paths) > MAX_BATCH_PATHS,
+            "dropped_count": len(unique_paths) - len(paths),
+        }
+
+    @mcp.tool()
+    def preview_harvest_file(
+        scope: str,
+        path: str,
+        position: str = "head",
+        length: int = 4096,
+        encoding: str = "text",
+    ) -> dict[str, Any]:
+        """
+        Harvest Filesのファイルの先頭または末尾だけを取得します（全体はダウンロードしません）
+
+        Args:
+            scope: スコープ（private または operators/{operator_id}）
+            path: ファイルパス
+            position: 取得位置（head: 先頭, tail: 末尾）
+            length: 取得バイト数（最大65536）
+            encoding: 出力形式（text: UTF-8テキスト, hex: 16進数）
+
+        Returns:
+            取得したバイト範囲と内容、ファイル全体のサイズ
+        """
+        if position not in ("head", "tail"):
+            return {"error": "position には head または tail を指定してください"}
+        if encoding not in ("text", "hex"):
+            return {"error": "encoding には text または hex を指定してください"}
+
+        try:
+            length = max(1, min(length, MAX_PREVIEW_BYTES))
+            url = _resolve_download_url(scope, path)
+
+            start = 0 if position == "head" else None
+            data, total_size = soracom_client.fetch_byte_range(url, start, length)
+
+            if position == "head":
+                offset = 0
+            elif total_size is not None:
+                offset = total_size - len(data)
+            else:
+                offset = None
+
+            content = data.hex() if encoding == "hex" else _decode_text(data, position)
+
+            return {
+                "scope": scope,
+                "path": path,
+                "position": position,
+                "offset": offset,
+                "length": len(data),
+                "total_size": total_size,
+                "encoding": encoding,
+                "content": content,
+            }
 
         except SoracomApiError as e:
             return {"error": handle_soracom_error(e)}
 
+    @mcp.tool()
+    def aggregate_harvest_file(
+        scope: str,
+        path: str,
+        group_by: list[str] | None = None,
+        metrics: list[str] | None = None,
+        filters: list[str] | None = None,
+        file_format: str = "auto",
+        delimiter: str = ",",
+        max_groups: int = 100,
+    ) -> dict[str, Any]:
+        """
+        Harvest FilesのCSV/JSON Linesファイルをストリーミングで集計します
+
+        ファイル全体は保持せず、1行ずつ解析してグループごとの集計値のみを返します。
+        JSON配列のファイル（.json）は1行ずつ解析できないため対応していません。
+        グループ数が上限（10000）に達した後に現れたグループは集計せず、
+        その行数を overflow_rows として返します
+
+        Args:
+            scope: スコープ（private または operators/{operator_id}）
+            path: ファイルパス
+            group_by: グループ化するカラム（JSONはドット区切りでネスト指定可）
+            metrics: 集計指定（count, sum:カラム, avg:カラム, min:カラム, max:カラム）
+            filters: フィルタ式のリスト（例: status=ok, temp>30）、AND条件で適用
+            file_format: ファイル形式（auto: 拡張子から判定, csv, jsonl）
+            delimiter: CSVの区切り文字（1文字）
+            max_groups: 返すグループ数の上限（件数の多い順）
+
+        Returns:
+            集計結果のテーブルと処理件数
+        """
+        if file_format == "auto":
+            file_format = _detect_file_format(path)
+        if file_format == "json":
+            return {
+                "error": "JSON配列のファイルは集計できません。JSON Lines 形式の場合は"
+                " file_format=jsonl を指定してください"
+            }
+        if file_format not in ("csv", "jsonl"):
+            return {"error": "file_format には auto, csv, jsonl を指定してください"}
+        if len(delimiter) != 1:
+            return {"error": "delimiter には1文字を指定してください"}
+
+        try:
+            aggregator = GroupAggregator(
+                group_by or [], metrics or ["count"], max_groups=MAX_AGGREGATE_GROUPS
+            )
+            matches = compile_filters(filters or [])
+        except ValueError as e:
+            return {"error": str(e)}
+
+        try:
+            url = _resolve_download_url(scope, path)
+            parse_errors = 0
+            rows_scanned = 0
+            rows_matched = 0
+            lines = soracom_client.iter_lines(url)
+            for record in _iter_records(lines, file_format, delimiter):
+                if record is None:
+                    parse_errors += 1
+                    continue
+                rows_scanned += 1
+                if matches(record):
+                    rows_matched += 1
+                    aggregator.add(record)
+
+            return {
+                "scope": scope,
+                "path": path,
+                "file_format": file_format,
+                "rows_scanned": rows_scanned,
+                "rows_matched": rows_matched,
+                "parse_errors": parse_errors,
+                "group_count": len(aggregator),
+                "groups": aggregator.rows(limit=max_groups),
+                "truncated": len(aggregator) > max_groups,
+                "overflow_rows": aggregator.overflow_rows,
+            }
+
+        except SoracomApiError as e:
+            return {"error": handle_soracom_error(e)}
@@ -1,10 +1,134 @@
 """ソラカメ（SoraCam）ツール - クラウドカメラ映像・イベント取得"""
 
+import asyncio
+import time
+from collections.abc import Callable, Iterator
+from functools import partial
+from itertools import islice
+from pathlib import Path, PurePosixPath
 from typing import Any
+from urllib.parse import urlsplit
 
-from fastmcp import FastMCP
+import httpx
+from fastmcp import Context, FastMCP
 
+from soracom_data_mcp.aggregate import get_field, to_number
+from soracom_data_mcp.cache import TTLCache
 from soracom_data_mcp.client import SoracomApiError, handle_soracom_error, soracom_client
+from soracom_data_mcp.config import settings
+from soracom_data_mcp.correlate import DIRECTIONS, asof_join
+from soracom_data_mcp.event_store import BUCKET_MILLISECONDS, soracam_event_store
+from soracom_data_mcp.export_queue import soracam_export_queue
+from soracom_data_mcp.harvest_data import iter_harvest_data, record_content
+from soracom_data_mcp.media_cache import soracam_media_cache
+from soracom_data_mcp.parallel import run_concurrently
+from soracom_data_mcp.recording_coverage import get_recording_coverage
+from soracom_data_mcp.resolver import SubscriberNameError, resolve_imsi
+from soracom_data_mcp.snapshots import diff_snapshots, snapshot_store
+from soracom_data_mcp.soracam_clips import plan_clips
+from soracom_data_mcp.soracam_events import (
+    iter_device_events,
+    list_devices,
+    merge_device_events,
+)
+from soracom_data_mcp.soracam_exports import (
+    DEFAULT_EXPORT_CONCURRENCY,
+    export_summary,
+    run_export_jobs,
+    start_image_export,
+    start_video_export,
+    wait_for_export,
+)
+
+# エクスポート完了待ちの最大時間（秒）
+MAX_EXPORT_WAIT_SECONDS = 900
+
+# 一括エクスポートで扱える静止画の最大数
+MAX_BATCH_IMAGES = 1000
+
+# 一括エクスポートの同時実行数の上限
+MAX_EXPORT_CONCURRENCY = 10
+
+# 全カメラのイベント一覧で一度に返す最大件数
+MAX_FLEET_EVENTS = 1000
+
+# タイムラプスの最大フレーム数と最大待ち時間（秒）
+MAX_TIMELAPSE_FRAMES = 5000
+MAX_TIMELAPSE_WAIT_SECONDS = 3600
+
+# 録画判定で前後に取得する録画期間の幅（ミリ秒）
+COVERAGE_LOOKUP_MARGIN = 3_600_000
+
+# 録画カバレッジで返す欠落区間の最大数
+MAX_COVERAGE_GAPS = 500
+
+# イベントとHarvest Dataの突き合わせで返す最大組数
+MAX_CORRELATION_PAIRS = 1000
+
+# イベントクリップの計画で扱うデバイスあたりの最大イベント数と最大クリップ数
+MAX_CLIP_EVENTS = 5000
+MAX_CLIP_EXPORTS = 200
+
+# イベントのヒートマップで返す最大の時間帯数（イベントのない時間帯も含む）
+MAX_HEATMAP_BUCKETS = 2000
+
+
+# ストリーミングURLを有効期限の何秒前までキャッシュするか
+STREAM_URL_EXPIRY_MARGIN = 30
+
+# カメラ詳細情報のキャッシュ期間（秒）
+DEVICE_SNAPSHOT_TTL = 30
+
+# デバイスID -> ストリーミングURL（有効期限の少し前まで）
+stream_url_cache: TTLCache[str, dict[str, Any]] = TTLCache(
+    ttl_seconds=DEVICE_SNAPSHOT_TTL, max_size=256
+)
+
+# デバイスID -> カメラ詳細情報
+device_cache: TTLCache[str, dict[str, Any]] = TTLCache(
+    ttl_seconds=DEVICE_SNAPSHOT_TTL, max_size=256
+)
+
+
+def _frame_path(output_dir: Path, index: int, timestamp: int, url: str) -> Path:
+    """タイムラプスのフレーム保存先（ファイル名順が時刻順になる）"""
+    suffix = PurePosixPath(urlsplit(url).path).suffix or ".jpg"
+    return output_dir / f"frame_{index:05d}_{timestamp}{suffix}"
+
+
+def _cached_media(cached: dict[str, Any]) -> dict[str, Any]:
+    """ローカルに保存済みのメディアをエクスポート結果の形式で返す"""
+    return {
+        "export_id": None,
+        "status": "completed",
+        "url": None,
+        **cached,
+        "cached": True,
+    }
+
+
+def _store_media(
+    device_id: str, kind: str, from_time: int, to_time: int, export: dict[str, Any]
+) -> dict[str, Any]:
+    """完了したエクスポートをダウンロードしてローカルに保存
+
+    同じ範囲を保存済みの場合はダウンロードせずにそのファイルを返す
+
+    Returns:
+        エクスポート結果に追加する項目（保存先、または保存に失敗した理由）
+    """
+    url = export.get("url")
+    if not url or export.get("status") not in ("completed", None):
+        return {}
+    cached = soracam_media_cache.lookup(device_id, kind, from_time, to_time)
+    if cached is not None:
+        return {**cached, "cached": True}
+    try:
+        stored = soracam_media_cache.store(device_id, kind, from_time, to_time, url)
+    except (SoracomApiError, OSError) as e:
+        message = handle_soracom_error(e) if isinstance(e, SoracomApiError) else str(e)
+        return {"cache_error": message}
+    return {**stored, "cached": False}
 
 
 def register_soracam_tools(mcp: FastMCP) -> None:
@@ -59,21 +183,28 @@ def register_soracam_tools(mcp: FastMCP) -> None:
             return {"error": handle_soracom_error(e)}
 
     @mcp.tool()
-    def get_soracam_device(device_id: str) -> dict[str, Any]:
+    def get_soracam_device(device_id: str, refresh: bool = False) -> dict[str, Any]:
         """
         ソラカメデバイス（カメラ）の詳細情報を取得します
 
+        取得結果は短時間（30秒）キャッシュされ、その間の再取得ではAPIを呼びません
+
         Args:
             device_id: デバイスID
+            refresh: Trueの場合はキャッシュを使わずに取得
 
         Returns:
             カメラ詳細情報
         """
+        cached = None if refresh else device_cache.get(device_id)
+        if cached is not None:
+            return {**cached, "cached": True}
+
         try:
             response = soracom_client.get(f"/sora_cam/devices/{device_id}")
 
             if isinstance(response, dict):
-                return {
+                device = {
                     "device_id": response.get("deviceId"),
                     "name": response.get("name"),
                     "status": response.get("status"),
@@ -81,12 +212,65 @@ def register_soracam_tools(mcp: FastMCP) -> None:
                     "firmware_version": response.get("firmwareVersion"),
                     "configuration": response.get("configuration"),
                 }
+                device_cache.set(device_id, device)
+                return {**device, "cached": False}
 
             return {"data": response}
 
         except SoracomApiError as e:
             return {"error": handle_soracom_error(e)}
 
+    @mcp.tool()
+    def get_soracam_fleet_status_changes() -> dict[str, Any]:
+        """
+        前回の確認以降に接続状態等が変わったカメラだけを返します
+
+        カメラ一覧を1回取得して前回の一覧と比較し、接続・切断したカメラ、
+        追加・削除されたカメラ、ステータス等が変わったカメラを返します。
+        前回の一覧はローカルに保存され、初回は全カメラの現在の状態を返します
+
+        Returns:
+            接続・切断したカメラ、追加・削除されたカメラ、その他の変更
+        """
+        try:
+            devices = list_devices()
+        except SoracomApiError as e:
+            return {"error": handle_soracom_error(e)}
+
+        current = {
+            device["deviceId"]: {
+                "name": device.get("name"),
+                "status": device.get("status"),
+                "connected": device.get("connected"),
+                "firmware_version": device.get("firmwareVersion"),
+            }
+            for device in devices
+            if device.get("deviceId")
+        }
+        previous, previous_taken_at = snapshot_store.replace("soracam_devices", current)
+        diff = diff_snapshots(previous, current)
+
+        connected: list[str] = []
+        disconnected: list[str] = []
+        for device_id, changes in diff["changed"].items():
+            if "connected" in changes:
+                target = connected if changes["connected"][1] else disconnected
+                target.append(device_id)
+
+        result: dict[str, Any] = {
+            "previous_taken_at": previous_taken_at,
+            "device_count": len(current),
+            "connected_count": sum(1 for d in current.values() if d["connected"]),
+            "connected": connected,
+            "disconnected": disconnected,
+            "added": diff["added"],
+            "removed": diff["removed"],
+            "changed": diff["changed"],
+        }
+        if previous_taken_at is None:
+            result["devices"] = current
+        return result
+
     # ===================
     # イベント検出 API
     # ===================
@@ -149,6 +333,288 @@ def register_soracam_tools(mcp: FastMCP) -> None:
         except SoracomApiError as e:
             return {"error": handle_soracom_error(e)}
 
+    @mcp.tool()
+    def list_soracam_fleet_events(
+        from_time: int | None = None,
+        to_time: int | None = None,
+        device_ids: list[str] | None = None,
+        event_type: str | None = None,
+        sort: str = "desc",
+        limit: int = 100,
+    ) -> dict[str, Any]:
+        """
+        全カメラ（または指定カメラ）のイベントを時刻順にマージして取得します
+
+        各カメラの先頭ページを並列に取得し、必要な分だけ次ページを追加取得します
+
+        Args:
+            from_time: 取得開始時刻（UNIXタイムスタンプ・ミリ秒）
+            to_time: 取得終了時刻（UNIXタイムスタンプ・ミリ秒）
+            device_ids: 対象のデバイスID（未指定時は全カメラ）
+            event_type: イベント種別でフィルタ
+            sort: ソート順（asc: 古い順, desc: 新しい順）
+            limit: 取得件数（最大1000）
+
+        Returns:
+            マージ済みのイベント一覧と、続きを取得するための時刻指定（next）
+        """
+        try:
+            if device_ids is None:
+                device_ids = [
+                    device["deviceId"]
+                    for device in list_devices()
+                    if device.get("deviceId")
+                ]
+
+            result = merge_device_events(
+                device_ids,
+                from_time,
+                to_time,
+                sort=sort,
+                limit=min(limit, MAX_FLEET_EVENTS),
+                event_type=event_type,
+            )
+            return {
+                **result,
+                "count": len(result["events"]),
+                "device_count": len(device_ids),
+            }
+
+        except SoracomApiError as e:
+            return {"error": handle_soracom_error(e)}
+
+    @mcp.tool()
+    def sync_soracam_events(
+        device_ids: list[str] | None = None,
+        since_hours: int = 168,
+    ) -> dict[str, Any]:
+        """
+        ソラカメのイベント履歴をローカルに差分同期します
+
+        2回目以降は保存済みの最新イベント以降だけを取得します
+
+        Args:
+            device_ids: 対象のデバイスID（未指定時は全カメラ）
+            since_hours: 初回同期で遡る時間（時間）
+
+        Returns:
+            デバイスごとの新規イベント数と同期済みの期間
+        """
+        try:
+            if device_ids is None:
+                device_ids = [
+                    device["deviceId"]
+                    for device in list_devices()
+                    if device.get("deviceId")
+                ]
+
+            now = int(time.time() * 1000)
+            since = now - since_hours * 3_600_000
+            results = run_concurrently(
+                lambda device_id: soracam_event_store.sync(device_id, since, now),
+                device_ids,
+            )
+
+            devices = []
+            for device_id, result in zip(device_ids, results, strict=True):
+                if isinstance(result, SoracomApiError):
+                    devices.append({
+                        "device_id": device_id,
+                        "error": handle_soracom_error(result),
+                    })
+                else:
+                    devices.append(result)
+
+            return {
+                "devices": devices,
+                "new_events": sum(d.get("new_events", 0) for d in devices),
+            }
+
+        except SoracomApiError as e:
+            return {"error": handle_soracom_error(e)}
+
+    @mcp.tool()
+    def query_soracam_events_local(
+        device_ids: list[str] | None = None,
+        from_time: int | None = None,
+        to_time: int | None = None,
+        event_type: str | None = None,
+        sort: str = "desc",
+        limit: int = 100,
+    ) -> dict[str, Any]:
+        """
+        ローカルに同期済みのソラカメイベントを検索します（APIは呼びません）
+
+        事前に sync_soracam_events で同期してください
+
+        Args:
+            device_ids: 対象のデバイスID（未指定時は全カメラ）
+            from_time: 検索開始時刻（UNIXタイムスタンプ・ミリ秒）
+            to_time: 検索終了時刻（UNIXタイムスタンプ・ミリ秒）
+            event_type: イベント種別でフィルタ
+            sort: ソート順（asc: 古い順, desc: 新しい順）
+            limit: 取得件数（最大1000）
+
+        Returns:
+            イベント一覧とデバイスごとの同期済み期間
+        """
+        events = soracam_event_store.query(
+            device_ids, from_time, to_time, event_type, sort, min(limit, 1000)
+        )
+        states = soracam_event_store.sync_states()
+        return {
+            "events": events,
+            "count": len(events),
+            "synced": {
+                device_id: state
+                for device_id, state in states.items()
+                if not device_ids or device_id in device_ids
+            },
+        }
+
+    @mcp.tool()
+    def get_soracam_event_heatmap(
+        device_ids: list[str] | None = None,
+        from_time: int | None = None,
+        to_time: int | None = None,
+        event_type: str | None = None,
+        bucket: str = "hour",
+        utc_offset_hours: int = 9,
+    ) -> dict[str, Any]:
+        """
+        ローカルに同期済みのソラカメイベント数を時間帯ごとに集計します（APIは呼びません）
+
+        Args:
+            device_ids: 対象のデバイスID（未指定時は全カメラ）
+            from_time: 集計開始時刻（UNIXタイムスタンプ・ミリ秒）
+            to_time: 集計終了時刻（UNIXタイムスタンプ・ミリ秒）
+            event_type: イベント種別でフィルタ
+            bucket: 集計単位（hour: 1時間ごと, day: 1日ごと）
+            utc_offset_hours: 日の区切りに使うタイムゾーン（UTCからの時差、デフォルト: 9）
+
+        Returns:
+            各時間帯の開始時刻とデバイスごとのイベント数
+            （時間帯が2000を超える場合はエラー）
+        """
+        if bucket not in BUCKET_MILLISECONDS:
+            return {"error": "bucket には hour または day を指定してください"}
+
+        try:
+            heatmap = soracam_event_store.heatmap(
+                device_ids,
+                from_time,
+                to_time,
+                event_type,
+                bucket=bucket,
+                utc_offset_minutes=utc_offset_hours * 60,
+                max_buckets=MAX_HEATMAP_BUCKETS,
+            )
+        except ValueError as e:
+            return {"error": str(e)}
+        return {"bucket": bucket, **heatmap}
+
+    @mcp.tool()
+    def correlate_soracam_events_with_harvest(
+        device_id: str,
+        imsi: str,
+        from_time: int,
+        to_time: int,
+        tolerance_seconds: float = 30,
+        direction: str = "nearest",
+        event_type: str | None = None,
+        fields: list[str] | None = None,
+        limit: int = 100,
+    ) -> dict[str, Any]:
+        """
+        カメラのイベントとSIMのHarvest Dataを時刻で突き合わせ、対応する組だけを返します
+
+        両方のデータを古い順にストリーミング取得し、イベントごとに許容範囲内の
+        Harvest Dataを1件対応させます（対応するデータがないイベントは返しません）。
+        続きは next の時刻を from_time に指定して取得します（同じ時刻のイベントは
+        1回の呼び出しでまとめて返すため、limit を少し超えることがあります）
+
+        Args:
+            device_id: デバイスID
+            imsi: SIMのIMSI、またはSIMの名前（tags.name）
+            from_time: 開始時刻（UNIXタイムスタンプ・ミリ秒）
+            to_time: 終了時刻（UNIXタイムスタンプ・ミリ秒）
+            tolerance_seconds: 時刻差の許容範囲（秒）
+            direction: nearest（前後で最も近いデータ）, backward（イベント以前の
+                直近のデータ）, forward（イベント以降の直近のデータ）
+            event_type: イベント種別でフィルタ
+            fields: 返すcontent内のフィールド（例: ["door", "sensor.temp"]、
+                未指定時はcontent全体）
+            limit: 返す組の最大数（最大1000）
+
+        Returns:
+            イベントとHarvest Dataの組（offset_ms はデータの時刻 - イベントの時刻）
+        """
+        if direction not in DIRECTIONS:
+            return {"error": f"direction は {', '.join(DIRECTIONS)} のいずれかです"}
+
+        try:
+            imsi = resolve_imsi(imsi)
+        except SoracomApiError as e:
+            return {"error": handle_soracom_error(e)}
+        except SubscriberNameError as e:
+            return {"error": str(e)}
+
+        tolerance = int(tolerance_seconds * 1000)
+        limit = max(1, min(limit, MAX_CORRELATION_PAIRS))
+        counts = {"events": 0, "records": 0}
+
+        def events() -> Iterator[tuple[int, dict[str, Any]]]:
+            for event in iter_device_events(device_id, from_time, to_time, sort="asc"):
+                if not event_type or event["event_type"] == event_type:
+                    counts["events"] += 1
+                    yield event["timestamp"], event
+
+        def records() -> Iterator[tuple[int, dict[str, Any]]]:
+            # 許容範囲の分だけ前後に広げて取得し、範囲の端のイベントも対応させる
+            for record in iter_harvest_data(
+                imsi, from_time - tolerance, to_time + tolerance
+            ):
+                counts["records"] += 1
+                yield int(record["time"]), record
+
+        pairs: list[dict[str, Any]] = []
+        truncated = False
+        try:
+            for event, record, offset in asof_join(
+                events(), records(), tolerance, direction
+            ):
+                # 上限に達しても、最後の組と同じ時刻のイベントは続けて返す
+                if (
+                    len(pairs) >= limit
+                    and event["timestamp"] != pairs[-1]["event"]["timestamp"]
+                ):
+                    truncated = True
+                    break
+                content = record_content(record)
+                if fields:
+                    content = {field: get_field(content, field) for field in fields}
+                pairs.append({
+                    "event": event,
+                    "harvest": {"time": record["time"], "content": content},
+                    "offset_ms": offset,
+                })
+        except SoracomApiError as e:
+            return {"error": handle_soracom_error(e)}
+
+        return {
+            "pairs": pairs,
+            "matched": len(pairs),
+            "events_scanned": counts["events"],
+            "records_scanned": counts["records"],
+            "truncated": truncated,
+            # 続きは最後に対応したイベントの直後から取得できる
+            "next": (
+                {"from_time": pairs[-1]["event"]["timestamp"] + 1}
+                if truncated
+                else None
+            ),
+        }
+
     @mcp.tool()
     def get_soracam_event(device_id: str, event_id: str) -> dict[str, Any]:
         """
@@ -224,34 +690,152 @@ def register_soracam_tools(mcp: FastMCP) -> None:
         except SoracomApiError as e:
             return {"error": handle_soracom_error(e)}
 
+    @mcp.tool()
+    def check_soracam_recording(
+        device_id: str,
+        timestamp: int,
+        refresh: bool = False,
+    ) -> dict[str, Any]:
+        """
+        ソラカメが指定時刻に録画していたかを判定します
+
+        録画期間はデバイスごとにキャッシュされ、キャッシュ済みの範囲内の
+        時刻であればAPIを呼ばずに判定します
+
+        Args:
+            device_id: デバイスID
+            timestamp: 判定したい時刻（UNIXタイムスタンプ・ミリ秒）
+            refresh: Trueの場合はキャッシュを使わずに録画期間を再取得
+
+        Returns:
+            録画の有無と、録画中の場合はその録画区間
+        """
+        try:
+            coverage = get_recording_coverage(
+                device_id,
+                timestamp,
+                timestamp + 1,
+                refresh=refresh,
+                margin=COVERAGE_LOOKUP_MARGIN,
+            )
+        except SoracomApiError as e:
+            return {"error": handle_soracom_error(e)}
+
+        interval = coverage.interval_at(timestamp)
+        return {
+            "device_id": device_id,
+            "timestamp": timestamp,
+            "recorded": interval is not None,
+            "recording": (
+                {"from": interval[0], "to": interval[1]} if interval else None
+            ),
+        }
+
+    @mcp.tool()
+    def get_soracam_recording_coverage(
+        device_id: str,
+        from_time: int | None = None,
+        to_time: int | None = None,
+        min_gap_seconds: int = 0,
+        refresh: bool = False,
+    ) -> dict[str, Any]:
+        """
+        ソラカメの録画カバレッジ（録画率と録画されていない区間）を取得します
+
+        録画期間を結合済みの区間として保持し、録画率を累積和と二分探索で
+        求めます。録画期間はデバイスごとにキャッシュされます
+
+        Args:
+            device_id: デバイスID
+            from_time: 集計開始時刻（UNIXタイムスタンプ・ミリ秒、未指定時は7日前）
+            to_time: 集計終了時刻（UNIXタイムスタンプ・ミリ秒、未指定時は現在時刻）
+            min_gap_seconds: この秒数より短い欠落区間は一覧から除外
+            refresh: Trueの場合はキャッシュを使わずに録画期間を再取得
+
+        Returns:
+            録画率（%）、録画時間、録画されていない区間の一覧
+        """
+        now = int(time.time() * 1000)
+        to_time = min(to_time if to_time is not None else now, now)
+        from_time = (
+            from_time if from_time is not None else to_time - 7 * 86_400_000
+        )
+        if from_time >= to_time:
+            return {"error": "from_time は to_time より前の時刻を指定してください"}
+
+        try:
+            coverage = get_recording_coverage(
+                device_id, from_time, to_time, refresh=refresh
+            )
+        except SoracomApiError as e:
+            return {"error": handle_soracom_error(e)}
+
+        to_time = min(to_time, coverage.to_time)
+        covered = coverage.covered_milliseconds(from_time, to_time)
+        span = max(to_time - from_time, 1)
+        gaps = [
+            {"from": start, "to": end, "duration_seconds": (end - start) / 1000}
+            for start, end in coverage.gaps(from_time, to_time)
+            if end - start >= min_gap_seconds * 1000
+        ]
+        return {
+            "device_id": device_id,
+            "from_time": from_time,
+            "to_time": to_time,
+            "coverage_percent": round(covered / span * 100, 2),
+            "recorded_seconds": covered / 1000,
+            "gap_count": len(gaps),
+            "gaps": gaps[:MAX_COVERAGE_GAPS],
+            "truncated": len(gaps) > MAX_COVERAGE_GAPS,
+        }
+
     @mcp.tool()
     def export_soracam_image(
         device_id: str,
         timestamp: int,
+        use_cache: bool = True,
     ) -> dict[str, Any]:
         """
         ソラカメの静止画をエクスポートします
 
+        ローカルに保存済みの静止画があればエクスポートせずにそのファイルを返し、
+        エクスポートした静止画はダウンロードしてローカルに保存します。
+        静止画のエクスポートはジョブとして記録しないため、応答にURLが含まれない
+        （処理中の）場合は、後で完了しても保存されません
+
         Args:
             device_id: デバイスID
             timestamp: 取得したい時刻（UNIXタイムスタンプ・ミリ秒）
+            use_cache: Falseの場合はローカルの保存を使わずにエクスポート
 
         Returns:
-            静止画エクスポート情報（ダウンロードURL等）
+            静止画エクスポート情報（ダウンロードURL、ローカルの保存先等）
         """
         try:
+            if use_cache:
+                cached = soracam_media_cache.lookup(
+                    device_id, "image", timestamp, timestamp
+                )
+                if cached is not None:
+                    return _cached_media(cached)
+
             response = soracom_client.post(
                 f"/sora_cam/devices/{device_id}/videos/images",
                 json={"time": timestamp},
             )
 
             if isinstance(response, dict):
-                return {
+                result = {
                     "export_id": response.get("exportId"),
                     "status": response.get("status"),
                     "url": response.get("url"),
                     "details": response,
                 }
+                if use_cache:
+                    result.update(
+                        _store_media(device_id, "image", timestamp, timestamp, result)
+                    )
+                return result
 
             return {"data": response}
 
@@ -263,19 +847,41 @@ def register_soracam_tools(mcp: FastMCP) -> None:
         device_id: str,
         from_time: int,
         to_time: int,
+        use_cache: bool = True,
     ) -> dict[str, Any]:
         """
         ソラカメの録画動画をエクスポートします
 
+        同じ範囲の動画をローカルに保存済みの場合はエクスポートせずにそのファイルを
+        返します（完了した動画は get_soracam_video_export_status で保存されます）
+
         Args:
             device_id: デバイスID
             from_time: 開始時刻（UNIXタイムスタンプ・ミリ秒）
             to_time: 終了時刻（UNIXタイムスタンプ・ミリ秒）
+            use_cache: Falseの場合はローカルの保存を使わずにエクスポート
 
         Returns:
-            録画エクスポート情報（export_id等）
+            録画エクスポート情報（export_id等）。同じ範囲のエクスポートが
+            未完了の場合は新たに開始せず、そのジョブを返します（deduplicated）
         """
         try:
+            if use_cache:
+                cached = soracam_media_cache.lookup(
+                    device_id, "video", from_time, to_time
+                )
+                if cached is not None:
+                    return _cached_media(cached)
+
+            pending = soracam_export_queue.find_pending(device_id, from_time, to_time)
+            if pending is not None:
+                return {
+                    "export_id": pending["export_id"],
+                    "status": pending["status"],
+                    "details": pending,
+                    "deduplicated": True,
+                }
+
             response = soracom_client.post(
                 f"/sora_cam/devices/{device_id}/videos/exports",
                 json={
@@ -285,10 +891,14 @@ def register_soracam_tools(mcp: FastMCP) -> None:
             )
 
             if isinstance(response, dict):
+                soracam_export_queue.record(
+                    device_id, from_time, to_time, export_summary(response)
+                )
                 return {
                     "export_id": response.get("exportId"),
                     "status": response.get("status"),
                     "details": response,
+                    "deduplicated": False,
                 }
 
             return {"data": response}
@@ -300,16 +910,21 @@ def register_soracam_tools(mcp: FastMCP) -> None:
     def get_soracam_video_export_status(
         device_id: str,
         export_id: str,
+        use_cache: bool = True,
     ) -> dict[str, Any]:
         """
         ソラカメの録画エクスポート状況を取得します
 
+        export_soracam_video で開始したエクスポートが完了している場合は、
+        動画をダウンロードしてローカルに保存します
+
         Args:
             device_id: デバイスID
             export_id: エクスポートID
+            use_cache: Falseの場合は完了した動画をローカルに保存しない
 
         Returns:
-            エクスポート状況（status, url等）
+            エクスポート状況（status, url、保存した場合はローカルの保存先等）
         """
         try:
             response = soracom_client.get(
@@ -317,12 +932,24 @@ def register_soracam_tools(mcp: FastMCP) -> None:
             )
 
             if isinstance(response, dict):
-                return {
+                soracam_export_queue.update({
+                    **export_summary(response),
+                    "export_id": export_id,
+                })
+                result = {
                     "export_id": response.get("exportId"),
                     "status": response.get("status"),
                     "url": response.get("url"),
                     "details": response,
                 }
+                job = soracam_export_queue.get(export_id)
+                if use_cache and job is not None:
+                    result.update(
+                        _store_media(
+                            device_id, "video", job["from_time"], job["to_time"], result
+                        )
+                    )
+                return result
 
             return {"data": response}
 
@@ -330,28 +957,465 @@ def register_soracam_tools(mcp: FastMCP) -> None:
             return {"error": handle_soracom_error(e)}
 
     @mcp.tool()
-    def get_soracam_stream_url(device_id: str) -> dict[str, Any]:
+    def list_soracam_export_jobs(
+        device_id: str | None = None,
+        status: str | None = None,
+        pending_only: bool = False,
+        refresh: bool = False,
+        limit: int = 100,
+    ) -> dict[str, Any]:
+        """
+        ローカルに記録された録画エクスポートジョブの一覧と状況を取得します
+
+        export_soracam_video で開始したジョブはサーバーの再起動後も記録され、
+        未完了のジョブはバックグラウンドでポーリングが続けられます
+
+        Args:
+            device_id: デバイスIDでフィルタ
+            status: ステータスでフィルタ（processing, completed, failed等）
+            pending_only: Trueの場合は未完了のジョブのみ
+            refresh: Trueの場合は未完了のジョブの状況をその場で取得してから返す
+            limit: 取得件数（最大1000）
+
+        Returns:
+            ジョブ一覧（新しい順）
+        """
+        polled = soracam_export_queue.poll_due(force=True) if refresh else 0
+        jobs = soracam_export_queue.jobs(
+            device_id=device_id,
+            status=status,
+            pending_only=pending_only,
+            limit=max(1, min(limit, 1000)),
+        )
+        return {"jobs": jobs, "count": len(jobs), "polled": polled}
+
+    @mcp.tool()
+    def get_soracam_stream_url(
+        device_id: str, refresh: bool = False
+    ) -> dict[str, Any]:
         """
         ソラカメのライブストリーミングURLを取得します
 
+        URLは有効期限（expiresAt）の少し前までキャッシュされ、その間の再取得では
+        APIを呼びません
+
         Args:
             device_id: デバイスID
+            refresh: Trueの場合はキャッシュを使わずに取得
 
         Returns:
             ストリーミングURL
         """
+        cached = None if refresh else stream_url_cache.get(device_id)
+        if cached is not None:
+            return {**cached, "cached": True}
+
         try:
             response = soracom_client.get(f"/sora_cam/devices/{device_id}/stream")
 
             if isinstance(response, dict):
-                return {
+                stream = {
                     "url": response.get("url"),
                     "expires_at": response.get("expiresAt"),
                     "details": response,
                 }
+                expires_at = to_number(response.get("expiresAt"))
+                if stream["url"] and expires_at is not None:
+                    cache_until = expires_at / 1000 - STREAM_URL_EXPIRY_MARGIN
+                    if cache_until > time.time():
+                        stream_url_cache.set(device_id, stream, expires_at=cache_until)
+                return {**stream, "cached": False}
 
             return {"data": response}
 
         except SoracomApiError as e:
             return {"error": handle_soracom_error(e)}
 
+    @mcp.tool()
+    async def export_soracam_and_wait(
+        device_id: str,
+        export_type: str = "video",
+        from_time: int | None = None,
+        to_time: int | None = None,
+        timestamp: int | None = None,
+        timeout_seconds: int = 300,
+        ctx: Context | None = None,
+    ) -> dict[str, Any]:
+        """
+        ソラカメのエクスポートを開始し、完了までサーバー側で待ってURLを返します
+
+        完了状況はポーリング間隔を徐々に伸ばしながら確認し、経過を進捗通知で送ります
+
+        Args:
+            device_id: デバイスID
+            export_type: エクスポート種別（video: 録画動画, image: 静止画）
+            from_time: 動画の開始時刻（UNIXタイムスタンプ・ミリ秒、video時に必須）
+            to_time: 動画の終了時刻（UNIXタイムスタンプ・ミリ秒、video時に必須）
+            timestamp: 静止画の時刻（UNIXタイムスタンプ・ミリ秒、image時に必須）
+            timeout_seconds: 最大待ち時間（秒、最大900）
+
+        Returns:
+            最終的なエクスポート情報（status, url等）とタイムアウトしたかどうか
+        """
+        start: Callable[[], dict[str, Any]]
+        if export_type == "video" and from_time is not None and to_time is not None:
+            start = partial(start_video_export, device_id, from_time, to_time)
+        elif export_type == "image" and timestamp is not None:
+            start = partial(start_image_export, device_id, timestamp)
+        else:
+            return {
+                "error": "video では from_time と to_time を、"
+                "image では timestamp を指定してください"
+            }
+
+        timeout = max(0, min(timeout_seconds, MAX_EXPORT_WAIT_SECONDS))
+
+        async def report(export: dict[str, Any], elapsed: float) -> None:
+            if ctx is not None:
+                await ctx.report_progress(
+                    progress=min(elapsed, timeout),
+                    total=timeout,
+                    message=f"エクスポート状況: {export.get('status')}",
+                )
+
+        try:
+            export = await asyncio.to_thread(start)
+            result = await wait_for_export(device_id, export, timeout, report)
+            return {"device_id": device_id, "export_type": export_type, **result}
+
+        except SoracomApiError as e:
+            return {"error": handle_soracom_error(e)}
+
+    @mcp.tool()
+    async def export_soracam_images_batch(
+        device_ids: list[str],
+        timestamps: list[int],
+        max_concurrency: int = DEFAULT_EXPORT_CONCURRENCY,
+        timeout_seconds: int = 600,
+        ctx: Context | None = None,
+    ) -> dict[str, Any]:
+        """
+        複数カメラ×複数時刻の静止画をまとめてエクスポートし、URLの表を返します
+
+        重複するリクエストは1回だけ実行し、同時実行数を制限しながら完了まで待ちます
+        （同じカメラのエクスポートは同時に2件までです）
+
+        Args:
+            device_ids: デバイスIDのリスト
+            timestamps: 取得したい時刻のリスト（UNIXタイムスタンプ・ミリ秒）
+            max_concurrency: 同時に実行するエクスポート数（最大10）
+            timeout_seconds: 全体の最大待ち時間（秒、最大900）
+
+        Returns:
+            デバイスID×時刻ごとのダウンロードURLの表と失敗したエクスポートの一覧
+        """
+        devices = list(dict.fromkeys(device_ids))
+        times = list(dict.fromkeys(timestamps))
+        if len(devices) * len(times) > MAX_BATCH_IMAGES:
+            return {
+                "error": f"静止画の数（デバイス数×時刻数）は{MAX_BATCH_IMAGES}件以下に"
+                "してください"
+            }
+
+        jobs: dict[Any, tuple[str, Callable[[], dict[str, Any]]]] = {
+            (device_id, timestamp): (
+                device_id,
+                partial(start_image_export, device_id, timestamp),
+            )
+            for device_id in devices
+            for timestamp in times
+        }
+        completed = 0
+
+        async def report(key: Any, result: dict[str, Any]) -> None:
+            nonlocal completed
+            completed += 1
+            if ctx is not None:
+                await ctx.report_progress(
+                    progress=completed,
+                    total=len(jobs),
+                    message=f"{completed}/{len(jobs)} 件のエクスポートが終了",
+                )
+
+        results = await run_export_jobs(
+            jobs,
+            timeout_seconds=max(0, min(timeout_seconds, MAX_EXPORT_WAIT_SECONDS)),
+            max_concurrency=max(1, min(max_concurrency, MAX_EXPORT_CONCURRENCY)),
+            on_result=report,
+        )
+
+        grid: dict[str, dict[str, str | None]] = {
+            device_id: {} for device_id in devices
+        }
+        failures = []
+        for (device_id, timestamp), result in results.items():
+            completed_ok = result.get("status") in ("completed", None)
+            url = result.get("url") if completed_ok else None
+            grid[device_id][str(timestamp)] = url
+            if not url:
+                failures.append({
+                    "device_id": device_id,
+                    "timestamp": timestamp,
+                    "status": result.get("status"),
+                    "timed_out": result.get("timed_out", False),
+                    "skipped": result.get("skipped", False),
+                    "error": result.get("error"),
+                })
+
+        return {
+            "device_ids": devices,
+            "timestamps": times,
+            "grid": grid,
+            "requested": len(device_ids) * len(timestamps),
+            "exported": len(jobs) - len(failures),
+            "failures": failures,
+        }
+
+    @mcp.tool()
+    async def export_soracam_event_clips(
+        device_ids: list[str],
+        from_time: int,
+        to_time: int,
+        event_type: str | None = None,
+        pad_before_seconds: int = 5,
+        pad_after_seconds: int = 15,
+        merge_gap_seconds: int = 0,
+        dry_run: bool = False,
+        max_concurrency: int = DEFAULT_EXPORT_CONCURRENCY,
+        timeout_seconds: int = 900,
+        ctx: Context | None = None,
+    ) -> dict[str, Any]:
+        """
+        イベント前後の録画を、重なる範囲をまとめた最小限のエクスポートで取得します
+
+        イベントごとに前後を広げた範囲を結合し、録画されている範囲と
+        エクスポートの最大長（15分）に収めてから、カメラ間で並列にエクスポートします
+
+        Args:
+            device_ids: デバイスIDのリスト
+            from_time: イベント検索の開始時刻（UNIXタイムスタンプ・ミリ秒）
+            to_time: イベント検索の終了時刻（UNIXタイムスタンプ・ミリ秒）
+            event_type: イベント種別でフィルタ
+            pad_before_seconds: イベント前に含める秒数
+            pad_after_seconds: イベント後に含める秒数
+            merge_gap_seconds: この秒数以下の隙間しかないクリップは1つに結合
+            dry_run: Trueの場合はエクスポートせずに計画だけを返す
+            max_concurrency: 同時に実行するエクスポート数（最大10、同じカメラでは2件まで）
+            timeout_seconds: 全体の最大待ち時間（秒、最大900）
+
+        Returns:
+            デバイスごとのクリップ一覧（エクスポート結果つき）と、
+            イベントごとにエクスポートした場合との件数比較。デバイスあたり
+            5000件を超えたイベントは計画に含めず、dropped_events に件数を返します
+        """
+        devices = list(dict.fromkeys(device_ids))
+        pad_before = max(0, pad_before_seconds) * 1000
+        pad_after = max(0, pad_after_seconds) * 1000
+        if pad_before + pad_after <= 0:
+            return {
+                "error": "pad_before_seconds と pad_after_seconds の合計は"
+                "1秒以上にしてください"
+            }
+
+        def plan(device_id: str) -> dict[str, Any]:
+            events = (
+                event["timestamp"]
+                for event in iter_device_events(
+                    device_id, from_time, to_time, sort="asc"
+                )
+                if not event_type or event["event_type"] == event_type
+            )
+            timestamps = list(islice(events, MAX_CLIP_EVENTS))
+            # 上限を超えたイベントは計画に含めず、件数だけを数える
+            dropped = sum(1 for _ in events)
+            coverage = get_recording_coverage(
+                device_id, from_time - pad_before, to_time + pad_after
+            )
+            return {
+                "event_count": len(timestamps),
+                "truncated": dropped > 0,
+                "dropped_events": dropped,
+                **plan_clips(
+                    timestamps,
+                    pad_before,
+                    pad_after,
+                    coverage=coverage,
+                    merge_gap=max(0, merge_gap_seconds) * 1000,
+                ),
+            }
+
+        plans: dict[str, dict[str, Any]] = {}
+        errors = []
+        planned = await asyncio.to_thread(run_concurrently, plan, devices)
+        for device_id, result in zip(devices, planned, strict=True):
+            if isinstance(result, SoracomApiError):
+                errors.append({
+                    "device_id": device_id,
+                    "error": handle_soracom_error(result),
+                })
+            else:
+                plans[device_id] = result
+
+        jobs: dict[Any, tuple[str, Callable[[], dict[str, Any]]]] = {
+            (device_id, index): (
+                device_id,
+                partial(start_video_export, device_id, clip["from"], clip["to"]),
+            )
+            for device_id, device_plan in plans.items()
+            for index, clip in enumerate(device_plan["clips"])
+        }
+        if len(jobs) > MAX_CLIP_EXPORTS:
+            return {
+                "error": f"クリップ数が上限（{MAX_CLIP_EXPORTS}）を超えています。"
+                "期間を短くするか merge_gap_seconds を大きくしてください"
+            }
+
+        if not dry_run and jobs:
+            completed = 0
+
+            async def report(key: Any, result: dict[str, Any]) -> None:
+                nonlocal completed
+                completed += 1
+                if ctx is not None:
+                    await ctx.report_progress(
+                        progress=completed,
+                        total=len(jobs),
+                        message=f"{completed}/{len(jobs)} 件のクリップが終了",
+                    )
+
+            results = await run_export_jobs(
+                jobs,
+                timeout_seconds=max(0, min(timeout_seconds, MAX_EXPORT_WAIT_SECONDS)),
+                max_concurrency=max(1, min(max_concurrency, MAX_EXPORT_CONCURRENCY)),
+                on_result=report,
+            )
+            for (device_id, index), result in results.items():
+                plans[device_id]["clips"][index].update({
+                    "export_id": result.get("export_id"),
+                    "status": result.get("status"),
+                    "url": result.get("url"),
+                    "timed_out": result.get("timed_out", False),
+                    "error": result.get("error"),
+                })
+
+        event_count = sum(device_plan["event_count"] for device_plan in plans.values())
+        # 成功した（dry_run では計画した）クリップについて、イベントごとに
+        # エクスポートした場合より減らせた件数
+        exported = [
+            clip
+            for device_plan in plans.values()
+            for clip in device_plan["clips"]
+            if dry_run
+            or (clip.get("url") and clip.get("status") in ("completed", None))
+        ]
+        saved = sum(clip["event_count"] for clip in exported) - len(exported)
+        return {
+            "devices": plans,
+            "event_count": event_count,
+            "clip_count": len(jobs),
+            "exports_saved": max(0, saved),
+            "dry_run": dry_run,
+            "errors": errors,
+        }
+
+    @mcp.tool()
+    async def create_soracam_timelapse(
+        device_id: str,
+        from_time: int,
+        to_time: int,
+        interval_minutes: float = 10,
+        output_dir: str | None = None,
+        max_concurrency: int = DEFAULT_EXPORT_CONCURRENCY,
+        timeout_seconds: int = 1800,
+        ctx: Context | None = None,
+    ) -> dict[str, Any]:
+        """
+        一定間隔の静止画をエクスポートしてローカルに保存し、タイムラプス用の連番画像を作成します
+
+        Args:
+            device_id: デバイスID
+            from_time: 開始時刻（UNIXタイムスタンプ・ミリ秒）
+            to_time: 終了時刻（UNIXタイムスタンプ・ミリ秒）
+            interval_minutes: 静止画を取得する間隔（分）
+            output_dir: 保存先ディレクトリ（未指定時はキャッシュディレクトリ配下）
+            max_concurrency: 同時に実行するエクスポート数（同じカメラのため実際は最大2）
+            timeout_seconds: 全体の最大待ち時間（秒、最大3600）
+
+        Returns:
+            保存先ディレクトリ、時刻順のフレーム一覧と失敗したフレームの一覧
+        """
+        interval_ms = int(interval_minutes * 60_000)
+        if interval_ms <= 0 or to_time < from_time:
+            return {"error": "interval_minutes は正の値、to_time は from_time 以降にしてください"}
+
+        timestamps = list(range(from_time, to_time + 1, interval_ms))
+        if len(timestamps) > MAX_TIMELAPSE_FRAMES:
+            return {
+                "error": f"フレーム数が上限（{MAX_TIMELAPSE_FRAMES}）を超えています。"
+                "interval_minutes を大きくするか期間を短くしてください"
+            }
+
+        directory = (
+            Path(output_dir).expanduser()
+            if output_dir
+            else settings.cache_dir / "timelapse" / f"{device_id}_{from_time}_{to_time}"
+        )
+        jobs: dict[Any, tuple[str, Callable[[], dict[str, Any]]]] = {
+            index: (device_id, partial(start_image_export, device_id, timestamp))
+            for index, timestamp in enumerate(timestamps)
+        }
+        frames: dict[int, dict[str, Any]] = {}
+        failures: list[dict[str, Any]] = []
+
+        async def on_result(index: Any, result: dict[str, Any]) -> None:
+            timestamp = timestamps[index]
+            url = result.get("url")
+            if url and result.get("status") in ("completed", None):
+                path = _frame_path(directory, index, timestamp, url)
+                try:
+                    size = await asyncio.to_thread(
+                        soracom_client.download_file, url, path
+                    )
+                    frames[index] = {
+                        "timestamp": timestamp,
+                        "path": str(path),
+                        "size": size,
+                    }
+                except (SoracomApiError, OSError, httpx.HTTPError) as e:
+                    failures.append({
+                        "timestamp": timestamp,
+                        "error": handle_soracom_error(e)
+                        if isinstance(e, SoracomApiError)
+                        else str(e),
+                    })
+            else:
+                failures.append({
+                    "timestamp": timestamp,
+                    "status": result.get("status"),
+                    "timed_out": result.get("timed_out", False),
+                    "skipped": result.get("skipped", False),
+                    "error": result.get("error"),
+                })
+
+            if ctx is not None:
+                done = len(frames) + len(failures)
+                await ctx.report_progress(
+                    progress=done,
+                    total=len(jobs),
+                    message=f"{done}/{len(jobs)} フレーム処理済み（失敗 {len(failures)}）",
+                )
+
+        await run_export_jobs(
+            jobs,
+            timeout_seconds=max(0, min(timeout_seconds, MAX_TIMELAPSE_WAIT_SECONDS)),
+            max_concurrency=max(1, min(max_concurrency, MAX_EXPORT_CONCURRENCY)),
+            on_result=on_result,
+        )
+
+        return {
+            "device_id": device_id,
+            "output_dir": str(directory),
+            "frame_count": len(frames),
+            "frames": [frames[index] for index in sorted(frames)],
+            "failures": sorted(failures, key=lambda failure: failure["timestamp"]),
+        }
@@ -4,7 +4,40 @@ from typing import Any
 
 from fastmcp import FastMCP
 
+from soracom_data_mcp.aggregate import distribution
+from soracom_data_mcp.air_stats import (
+    add_usage,
+    empty_usage,
+    fetch_air_stats,
+    rollup_to_hours,
+    top_consumers,
+)
 from soracom_data_mcp.client import SoracomApiError, handle_soracom_error, soracom_client
+from soracom_data_mcp.harvest_stats import (
+    add_harvest_usage,
+    empty_harvest_usage,
+    fetch_harvest_stats,
+)
+from soracom_data_mcp.inventory import subscriber_inventory
+from soracom_data_mcp.parallel import run_concurrently
+from soracom_data_mcp.resolver import (
+    MATCH_MODES,
+    SubscriberNameError,
+    resolve_imsi,
+    subscriber_resolver,
+)
+from soracom_data_mcp.snapshots import diff_snapshots, snapshot_store
+from soracom_data_mcp.stats_cache import stats_cache
+from soracom_data_mcp.subscribers import list_all_subscribers, subscriber_summary
+
+# 集計結果で返す通信量上位SIMの最大数
+MAX_TOP_N = 100
+
+# 集計結果で返す取得エラーの最大数
+MAX_REPORTED_ERRORS = 20
+
+# 接続状態の変化で種類ごとに返すSIMの最大数
+MAX_REPORTED_CHANGES = 500
 
 
 def register_stats_tools(mcp: FastMCP) -> None:
@@ -58,18 +91,7 @@ def register_stats_tools(mcp: FastMCP) -> None:
             response = soracom_client.get("/subscribers", params=params)
 
             if isinstance(response, list):
-                subscribers = []
-                for sub in response:
-                    subscribers.append({
-                        "imsi": sub.get("imsi"),
-                        "msisdn": sub.get("msisdn"),
-                        "iccid": sub.get("iccid"),
-                        "status": sub.get("status"),
-                        "speed_class": sub.get("speedClass"),
-                        "tags": sub.get("tags", {}),
-                        "group_id": sub.get("groupId"),
-                        "subscription": sub.get("subscription"),
-                    })
+                subscribers = [subscriber_summary(sub) for sub in response]
                 return {
                     "subscribers": subscribers,
                     "count": len(subscribers),
@@ -86,12 +108,13 @@ def register_stats_tools(mcp: FastMCP) -> None:
         特定SIMの詳細情報を取得します
 
         Args:
-            imsi: SIMのIMSI
+            imsi: SIMのIMSI、またはSIMの名前（tags.name）
 
         Returns:
             SIM詳細情報
         """
         try:
+            imsi = resolve_imsi(imsi)
             response = soracom_client.get(f"/subscribers/{imsi}")
 
             if isinstance(response, dict):
@@ -114,9 +137,183 @@ def register_stats_tools(mcp: FastMCP) -> None:
 
             return {"data": response}
 
+        except SoracomApiError as e:
+            return {"error": handle_soracom_error(e)}
+        except SubscriberNameError as e:
+            return {"error": str(e)}
+
+    @mcp.tool()
+    def sync_subscriber_inventory(max_age_seconds: int = 0) -> dict[str, Any]:
+        """
+        SIM一覧を取得してローカルのSIMインベントリを更新します
+
+        前回から lastModifiedAt が変わっていないSIMは書き込みません。
+        一覧から消えたSIMはインベントリからも削除します
+
+        Args:
+            max_age_seconds: 前回の同期からこの秒数以内なら同期しない
+
+        Returns:
+            追加・更新・削除・変更なしのSIM数
+        """
+        try:
+            return subscriber_inventory.sync(max_age_seconds=max_age_seconds)
+        except SoracomApiError as e:
+            return {"error": handle_soracom_error(e)}
+
+    @mcp.tool()
+    def search_subscribers_local(
+        status: str | None = None,
+        group_id: str | None = None,
+        speed_class: str | None = None,
+        tags: dict[str, str] | None = None,
+        tag_value_match_mode: str = "exact",
+        limit: int = 100,
+    ) -> dict[str, Any]:
+        """
+        ローカルのSIMインベントリから条件をすべて満たすSIMを検索します
+
+        APIを呼ばずに検索します。インベントリが未作成の場合だけ先に同期します。
+        最新の状態が必要な場合は sync_subscriber_inventory を実行してください
+
+        Args:
+            status: ステータス（active, inactive等）
+            group_id: グループID
+            speed_class: 速度クラス
+            tags: タグ名 -> タグ値（複数指定時はすべてに一致するSIM）
+            tag_value_match_mode: タグ値の一致モード（exact, prefix）
+            limit: 返すSIMの最大数（最大1000）
+
+        Returns:
+            条件に合うSIM（IMSI順）と総数、インベントリの同期時刻
+        """
+        try:
+            if subscriber_inventory.synced_at is None:
+                subscriber_inventory.sync()
+        except SoracomApiError as e:
+            return {"error": handle_soracom_error(e)}
+
+        subscribers, total = subscriber_inventory.search(
+            status=status,
+            group_id=group_id,
+            speed_class=speed_class,
+            tags=tags,
+            tag_match_mode=tag_value_match_mode,
+            limit=max(1, min(limit, 1000)),
+        )
+        return {
+            "subscribers": subscribers,
+            "count": len(subscribers),
+            "total": total,
+            "synced_at": subscriber_inventory.synced_at,
+        }
+
+    @mcp.tool()
+    def get_subscriber_connectivity_changes(
+        group_id: str | None = None,
+        status_filter: str | None = None,
+    ) -> dict[str, Any]:
+        """
+        前回の確認以降にオンライン・オフラインが変わったSIMだけを返します
+
+        SIM一覧を全ページ取得して各SIMの sessionStatus を前回の一覧と比較します。
+        SIMごとの詳細取得は行いません。前回の一覧は条件ごとにローカルに保存され、
+        初回はすべてのSIMを追加されたSIMとして返します。各一覧は最大500件で、
+        件数は change_counts で確認できます
+
+        Args:
+            group_id: グループIDでSIMを絞り込み
+            status_filter: ステータスでSIMを絞り込み（active, inactive等）
+
+        Returns:
+            オンラインになったSIM、オフラインになったSIM、追加・削除されたSIM、
+            ステータスが変わったSIM
+        """
+        try:
+            subscribers = list_all_subscribers(
+                group_id=group_id, status_filter=status_filter
+            )
+        except SoracomApiError as e:
+            return {"error": handle_soracom_error(e)}
+
+        current = {
+            sub["imsi"]: {
+                "online": bool((sub.get("sessionStatus") or {}).get("online")),
+                "status": sub.get("status"),
+            }
+            for sub in subscribers
+        }
+        kind = f"subscriber_sessions:{group_id or ''}:{status_filter or ''}"
+        previous, previous_taken_at = snapshot_store.replace(kind, current)
+        diff = diff_snapshots(previous, current)
+
+        came_online: list[str] = []
+        went_offline: list[str] = []
+        status_changed: dict[str, list[Any]] = {}
+        for imsi, changes in diff["changed"].items():
+            if "online" in changes:
+                target = came_online if changes["online"][1] else went_offline
+                target.append(imsi)
+            if "status" in changes:
+                status_changed[imsi] = changes["status"]
+
+        online_count = sum(1 for sub in current.values() if sub["online"])
+        return {
+            "previous_taken_at": previous_taken_at,
+            "sim_count": len(current),
+            "online_count": online_count,
+            "offline_count": len(current) - online_count,
+            "came_online": came_online[:MAX_REPORTED_CHANGES],
+            "went_offline": went_offline[:MAX_REPORTED_CHANGES],
+            "added": diff["added"][:MAX_REPORTED_CHANGES],
+            "removed": diff["removed"][:MAX_REPORTED_CHANGES],
+            "status_changed": dict(
+                list(status_changed.items())[:MAX_REPORTED_CHANGES]
+            ),
+            "change_counts": {
+                "came_online": len(came_online),
+                "went_offline": len(went_offline),
+                "added": len(diff["added"]),
+                "removed": len(diff["removed"]),
+                "status_changed": len(status_changed),
+            },
+        }
+
+    @mcp.tool()
+    def resolve_subscribers(
+        query: str,
+        tag_name: str = "name",
+        match_mode: str = "exact",
+        limit: int = 10,
+    ) -> dict[str, Any]:
+        """
+        タグの値（SIMの名前など）からIMSIを検索します
+
+        ローカルのSIMインベントリから作った索引を使うため、APIを呼びません
+        （インベントリが未作成の場合だけ先に同期します）
+
+        Args:
+            query: 検索する値（大文字・小文字は区別しない）
+            tag_name: 検索するタグ名
+            match_mode: 一致モード（exact: 完全一致, prefix: 前方一致,
+                fuzzy: あいまい一致）
+            limit: 返す値の最大数（最大100）
+
+        Returns:
+            一致したタグの値とそのIMSI
+        """
+        if match_mode not in MATCH_MODES:
+            return {"error": f"match_mode は {', '.join(MATCH_MODES)} のいずれかです"}
+
+        try:
+            matches = subscriber_resolver.search(
+                query, tag_name, match_mode, max(1, min(limit, 100))
+            )
         except SoracomApiError as e:
             return {"error": handle_soracom_error(e)}
 
+        return {"matches": matches, "count": len(matches)}
+
     # ===================
     # Groups API
     # ===================
@@ -213,52 +410,242 @@ def register_stats_tools(mcp: FastMCP) -> None:
         from_time: int,
         to_time: int,
         period: str = "day",
+        rollup_hours: bool = False,
     ) -> dict[str, Any]:
         """
         SIMの通信統計（Air利用量）を取得します
 
+        period=minutes で1日を超える期間を指定した場合は、1日ごとに分割して
+        並列に取得し、結合して返します
+
         Args:
-            imsi: SIMのIMSI
+            imsi: SIMのIMSI、またはSIMの名前（tags.name）
             from_time: 取得開始時刻（UNIXタイムスタンプ・秒）
             to_time: 取得終了時刻（UNIXタイムスタンプ・秒）
             period: 集計期間（minutes, day, month）
+            rollup_hours: period=minutes の統計を1時間ごとに合計して返す
 
         Returns:
             通信統計データ
         """
         try:
-            params: dict[str, Any] = {
-                "from": from_time,
-                "to": to_time,
-                "period": period,
-            }
+            imsi = resolve_imsi(imsi)
+            stats = fetch_air_stats(imsi, from_time, to_time, period)
+        except SoracomApiError as e:
+            return {"error": handle_soracom_error(e)}
+        except SubscriberNameError as e:
+            return {"error": str(e)}
+
+        if rollup_hours and period == "minutes":
+            stats = rollup_to_hours(stats)
+        return {
+            "stats": stats,
+            "count": len(stats),
+            "imsi": imsi,
+            "period": "hour" if rollup_hours and period == "minutes" else period,
+        }
 
-            response = soracom_client.get(
-                f"/stats/air/subscribers/{imsi}", params=params
+    @mcp.tool()
+    def get_fleet_air_usage(
+        from_time: int,
+        to_time: int,
+        period: str = "day",
+        group_id: str | None = None,
+        status_filter: str | None = None,
+        tag_name: str | None = None,
+        tag_value: str | None = None,
+        tag_value_match_mode: str = "exact",
+        top_n: int = 10,
+    ) -> dict[str, Any]:
+        """
+        複数SIMの通信量（Air利用量）を集計し、合計・グループ別・上位SIMを返します
+
+        条件に合うSIMを全件取得し、各SIMの通信統計を並列に取得して集計します。
+        SIMごとの明細は返さず、集計結果だけを返します
+
+        Args:
+            from_time: 集計開始時刻（UNIXタイムスタンプ・秒）
+            to_time: 集計終了時刻（UNIXタイムスタンプ・秒）
+            period: 統計の取得単位（minutes, day, month）
+            group_id: グループIDでSIMを絞り込み
+            status_filter: ステータスでSIMを絞り込み（active, inactive等）
+            tag_name: タグ名でSIMを絞り込み
+            tag_value: タグ値でSIMを絞り込み
+            tag_value_match_mode: タグ値の一致モード（exact, prefix）
+            top_n: 返す通信量上位SIMの数（最大100）
+
+        Returns:
+            全体の合計、グループ別の合計、通信量上位のSIM、取得に失敗したSIM
+        """
+        try:
+            subscribers = list_all_subscribers(
+                group_id=group_id,
+                status_filter=status_filter,
+                tag_name=tag_name,
+                tag_value=tag_value,
+                tag_value_match_mode=tag_value_match_mode,
             )
+        except SoracomApiError as e:
+            return {"error": handle_soracom_error(e)}
 
-            if isinstance(response, list):
-                stats = []
-                for stat in response:
-                    stats.append({
-                        "date": stat.get("date"),
-                        "upload_bytes": stat.get("uploadByteSizeTotal"),
-                        "download_bytes": stat.get("downloadByteSizeTotal"),
-                        "upload_packets": stat.get("uploadPacketSizeTotal"),
-                        "download_packets": stat.get("downloadPacketSizeTotal"),
-                    })
-                return {
-                    "stats": stats,
-                    "count": len(stats),
-                    "imsi": imsi,
-                    "period": period,
-                }
+        results = run_concurrently(
+            lambda sub: fetch_air_stats(
+                sub["imsi"], from_time, to_time, period, concurrent=False
+            ),
+            subscribers,
+        )
+
+        totals = empty_usage()
+        groups: dict[str, dict[str, int]] = {}
+        usages: dict[str, dict[str, Any]] = {}
+        errors = []
+        for subscriber, stats in zip(subscribers, results, strict=True):
+            imsi = subscriber["imsi"]
+            if isinstance(stats, SoracomApiError):
+                errors.append({"imsi": imsi, "error": handle_soracom_error(stats)})
+                continue
+            usage = add_usage(empty_usage(), stats)
+            add_usage(totals, stats)
+            group = groups.setdefault(
+                subscriber.get("groupId") or "", {"sim_count": 0, **empty_usage()}
+            )
+            group["sim_count"] += 1
+            add_usage(group, stats)
+            usages[imsi] = {
+                "name": (subscriber.get("tags") or {}).get("name"),
+                "group_id": subscriber.get("groupId"),
+                **usage,
+            }
 
-            return response
+        return {
+            "from_time": from_time,
+            "to_time": to_time,
+            "sim_count": len(subscribers),
+            "totals": totals,
+            "groups": [
+                {"group_id": group_id or None, **group}
+                for group_id, group in sorted(
+                    groups.items(), key=lambda item: -item[1]["total_bytes"]
+                )
+            ],
+            "top_consumers": top_consumers(usages, max(1, min(top_n, MAX_TOP_N))),
+            "error_count": len(errors),
+            "errors": errors[:MAX_REPORTED_ERRORS],
+        }
 
+    @mcp.tool()
+    def get_group_usage_rollup(
+        from_time: int,
+        to_time: int,
+        period: str = "day",
+        group_id: str | None = None,
+        include_harvest: bool = True,
+    ) -> dict[str, Any]:
+        """
+        グループごとの通信量（Air）とHarvest利用量の合計、SIMごとの分布を返します
+
+        SIMの所属グループはローカルのSIMインベントリから引きます
+        （未作成の場合だけ先に同期します）。終了した期間の統計は保存済みの
+        ものを使い、APIを呼びません
+
+        Args:
+            from_time: 集計開始時刻（UNIXタイムスタンプ・秒）
+            to_time: 集計終了時刻（UNIXタイムスタンプ・秒）
+            period: Air統計の取得単位（minutes, day, month）
+            group_id: 集計するグループID（未指定時はすべてのグループ）
+            include_harvest: Harvest利用統計も集計する
+
+        Returns:
+            グループごとの合計とSIMごとの分布（最小・中央値・90パーセンタイル・
+            最大・平均）、取得に失敗したSIM
+        """
+        # Harvest利用統計は day と month のみ対応
+        harvest_period = period if period in ("day", "month") else "day"
+
+        def fetch_usage(imsi: str) -> tuple[dict[str, int], int]:
+            air, air_cached = stats_cache.fetch(
+                "air",
+                imsi,
+                from_time,
+                to_time,
+                period,
+                lambda: fetch_air_stats(
+                    imsi, from_time, to_time, period, concurrent=False
+                ),
+            )
+            usage = add_usage(empty_usage(), air)
+            cached = int(air_cached)
+            if include_harvest:
+                harvest, harvest_cached = stats_cache.fetch(
+                    "harvest",
+                    imsi,
+                    from_time,
+                    to_time,
+                    harvest_period,
+                    lambda: fetch_harvest_stats(
+                        imsi, from_time, to_time, harvest_period
+                    ),
+                )
+                usage |= add_harvest_usage(empty_harvest_usage(), harvest)
+                cached += int(harvest_cached)
+            return usage, cached
+
+        try:
+            if subscriber_inventory.synced_at is None:
+                subscriber_inventory.sync()
         except SoracomApiError as e:
             return {"error": handle_soracom_error(e)}
 
+        subscribers, _ = subscriber_inventory.search(group_id=group_id)
+        results = run_concurrently(
+            lambda sub: fetch_usage(sub["imsi"]), subscribers
+        )
+
+        groups: dict[str, dict[str, Any]] = {}
+        per_sim: dict[str, dict[str, list[float]]] = {}
+        cached_count = 0
+        errors = []
+        for subscriber, result in zip(subscribers, results, strict=True):
+            if isinstance(result, SoracomApiError):
+                errors.append({
+                    "imsi": subscriber["imsi"],
+                    "error": handle_soracom_error(result),
+                })
+                continue
+            usage, cached = result
+            cached_count += cached
+            key = subscriber.get("group_id") or ""
+            group = groups.setdefault(key, {"sim_count": 0})
+            group["sim_count"] += 1
+            values = per_sim.setdefault(key, {})
+            for name, value in usage.items():
+                group[name] = group.get(name, 0) + value
+                values.setdefault(name, []).append(value)
+
+        rollup = [
+            {
+                "group_id": key or None,
+                **group,
+                "per_sim": {
+                    name: distribution(per_sim[key][name])
+                    for name in ("total_bytes", "harvest_count")
+                    if name in per_sim[key]
+                },
+            }
+            for key, group in sorted(
+                groups.items(), key=lambda item: -item[1]["total_bytes"]
+            )
+        ]
+        return {
+            "from_time": from_time,
+            "to_time": to_time,
+            "sim_count": len(subscribers),
+            "groups": rollup,
+            "cached_stats": cached_count,
+            "error_count": len(errors),
+            "errors": errors[:MAX_REPORTED_ERRORS],
+        }
+
     @mcp.tool()
     def get_harvest_stats(
         imsi: str,
@@ -270,7 +657,7 @@ def register_stats_tools(mcp: FastMCP) -> None:
         SIMのHarvest利用統計を取得します
 
         Args:
-            imsi: SIMのIMSI
+            imsi: SIMのIMSI、またはSIMの名前（tags.name）
             from_time: 取得開始時刻（UNIXタイムスタンプ・秒）
             to_time: 取得終了時刻（UNIXタイムスタンプ・秒）
             period: 集計期間（day, month）
@@ -279,6 +666,7 @@ def register_stats_tools(mcp: FastMCP) -> None:
             Harvest利用統計データ
         """
         try:
+            imsi = resolve_imsi(imsi)
             params: dict[str, Any] = {
                 "from": from_time,
                 "to": to_time,
@@ -308,4 +696,6 @@ def register_stats_tools(mcp: FastMCP) -> None:
 
         except SoracomApiError as e:
             return {"error": handle_soracom_error(e)}
+        except SubscriberNameError as e:
+            return {"error": str(e)}
 
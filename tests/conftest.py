@@ -1,6 +1,7 @@
 """共有フィクスチャ"""
 
 from collections.abc import Generator
+from pathlib import Path
 from typing import Any
 from unittest.mock import MagicMock, patch
 
@@ -8,6 +9,97 @@ import pytest
 from fastmcp import FastMCP
 
 from soracom_data_mcp.client import SoracomClient
+from soracom_data_mcp.export_queue import SoracamExportQueue
+from soracom_data_mcp.inventory import SubscriberInventory
+from soracom_data_mcp.location_store import HarvestLocationStore
+from soracom_data_mcp.media_cache import SoracamMediaCache
+from soracom_data_mcp.recording_coverage import coverage_cache
+from soracom_data_mcp.resolver import SubscriberResolver
+from soracom_data_mcp.snapshots import SnapshotStore
+from soracom_data_mcp.stats_cache import StatsCache
+from soracom_data_mcp.tools.harvest import download_url_cache, latest_record_cache
+from soracom_data_mcp.tools.soracam import device_cache, stream_url_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_caches() -> Generator[None, None, None]:
+    """テスト間でインメモリキャッシュを共有しないようにする"""
+    yield
+    download_url_cache.clear()
+    latest_record_cache.clear()
+    coverage_cache.clear()
+    device_cache.clear()
+    stream_url_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def export_queue(tmp_path: Path) -> Generator[SoracamExportQueue, None, None]:
+    """ツールが記録するエクスポートジョブを一時ディレクトリに保存する"""
+    queue = SoracamExportQueue(tmp_path / "soracam_exports.sqlite3")
+    with patch("soracom_data_mcp.tools.soracam.soracam_export_queue", queue):
+        yield queue
+
+
+def _fake_download(url: str, destination: Path) -> int:
+    """URLを内容とするファイルを保存するダウンロードのモック"""
+    content = url.encode()
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    destination.write_bytes(content)
+    return len(content)
+
+
+@pytest.fixture(autouse=True)
+def media_cache(tmp_path: Path) -> Generator[SoracamMediaCache, None, None]:
+    """ツールが保存する画像・動画を一時ディレクトリに保存する（ダウンロードはモック）"""
+    cache = SoracamMediaCache(tmp_path / "media", max_bytes=1024 * 1024)
+    with (
+        patch("soracom_data_mcp.tools.soracam.soracam_media_cache", cache),
+        patch("soracom_data_mcp.media_cache.soracom_client") as mock_client,
+    ):
+        mock_client.download_file.side_effect = _fake_download
+        yield cache
+
+
+@pytest.fixture(autouse=True)
+def snapshots(tmp_path: Path) -> Generator[SnapshotStore, None, None]:
+    """ツールが保存する一覧のスナップショットを一時ディレクトリに保存する"""
+    store = SnapshotStore(tmp_path / "snapshots.sqlite3")
+    with (
+        patch("soracom_data_mcp.tools.soracam.snapshot_store", store),
+        patch("soracom_data_mcp.tools.stats.snapshot_store", store),
+    ):
+        yield store
+
+
+@pytest.fixture(autouse=True)
+def inventory(tmp_path: Path) -> Generator[SubscriberInventory, None, None]:
+    """ツールが使うSIMインベントリを一時ディレクトリに保存する（同期時のSIM一覧は空）"""
+    store = SubscriberInventory(tmp_path / "subscribers.sqlite3")
+    resolver = SubscriberResolver(store)
+    with (
+        patch("soracom_data_mcp.tools.stats.subscriber_inventory", store),
+        patch("soracom_data_mcp.tools.stats.subscriber_resolver", resolver),
+        patch("soracom_data_mcp.resolver.subscriber_resolver", resolver),
+        patch("soracom_data_mcp.inventory.soracom_client") as mock_client,
+    ):
+        mock_client.iter_pages.side_effect = lambda *args, **kwargs: iter([])
+        yield store
+
+
+@pytest.fixture(autouse=True)
+def closed_stats(tmp_path: Path) -> Generator[StatsCache, None, None]:
+    """ツールが保存する終了した期間の統計を一時ディレクトリに保存する"""
+    cache = StatsCache(tmp_path / "stats.sqlite3")
+    with patch("soracom_data_mcp.tools.stats.stats_cache", cache):
+        yield cache
+
+
+@pytest.fixture(autouse=True)
+def locations(tmp_path: Path) -> Generator[HarvestLocationStore, None, None]:
+    """ツールが保存する位置情報を一時ディレクトリに保存する"""
+    store = HarvestLocationStore(tmp_path / "locations.sqlite3")
+    with patch("soracom_data_mcp.tools.harvest.harvest_location_store", store):
+        yield store
 
 
 @pytest.fixture
@@ -119,4 +211,3 @@ def sample_air_stats_response() -> list[dict[str, Any]]:
             "downloadPacketSizeTotal": 20,
         }
     ]
-
@@ -0,0 +1,131 @@
+"""aggregate.pyのテスト"""
+
+import pytest
+
+from soracom_data_mcp.aggregate import (
+    GroupAggregator,
+    compile_filter,
+    compile_filters,
+    distribution,
+    get_field,
+    parse_metric,
+)
+
+
+class TestDistribution:
+    """distribution関数のテスト"""
+
+    def test_distribution(self) -> None:
+        """最小・中央値・90パーセンタイル・最大・平均を確認"""
+        result = distribution(range(10, 0, -1))
+        assert result == {"min": 1, "p50": 5, "p90": 9, "max": 10, "mean": 5.5}
+        assert distribution([])["p50"] is None
+
+
+class TestGetField:
+    """get_field関数のテスト"""
+
+    def test_nested_path(self) -> None:
+        """ネストしたフィールドの取得を確認"""
+        record = {"content": {"temp": 25.5, "tags": ["a", "b"]}}
+        assert get_field(record, "content.temp") == 25.5
+        assert get_field(record, "content.tags.1") == "b"
+
+    def test_missing_path(self) -> None:
+        """存在しないフィールドはNoneになることを確認"""
+        assert get_field({"content": 1}, "content.temp") is None
+
+
+class TestCompileFilter:
+    """compile_filter関数のテスト"""
+
+    def test_numeric_comparison(self) -> None:
+        """数値比較を確認（文字列の数値も数値として扱う）"""
+        predicate = compile_filter("content.temp > 30")
+        assert predicate({"content": {"temp": 31}})
+        assert predicate({"content": {"temp": "30.5"}})
+        assert not predicate({"content": {"temp": 30}})
+        assert not predicate({"content": {}})
+
+    def test_string_comparison(self) -> None:
+        """文字列比較を確認"""
+        predicate = compile_filter("status = 'ok'")
+        assert predicate({"status": "ok"})
+        assert not predicate({"status": "ng"})
+
+    def test_bool_comparison(self) -> None:
+        """真偽値の比較を確認"""
+        predicate = compile_filter("door==true")
+        assert predicate({"door": True})
+        assert not predicate({"door": False})
+
+    def test_invalid_expression(self) -> None:
+        """不正なフィルタ式でエラーになることを確認"""
+        with pytest.raises(ValueError):
+            compile_filter("temp")
+
+    def test_compile_filters_and(self) -> None:
+        """複数条件がAND結合されることを確認"""
+        predicate = compile_filters(["temp>=20", "temp<30"])
+        assert predicate({"temp": 25})
+        assert not predicate({"temp": 30})
+        assert compile_filters([])({})
+
+
+class TestGroupAggregator:
+    """GroupAggregatorクラスのテスト"""
+
+    def test_parse_metric(self) -> None:
+        """集計指定の解析を確認"""
+        assert parse_metric("count") == ("count", None)
+        assert parse_metric("avg:temp") == ("avg", "temp")
+        with pytest.raises(ValueError):
+            parse_metric("median:temp")
+        with pytest.raises(ValueError):
+            parse_metric("sum")
+
+    def test_group_by_aggregation(self) -> None:
+        """グループ集計を確認"""
+        aggregator = GroupAggregator(
+            ["device"], ["count", "sum:temp", "avg:temp", "min:temp", "max:temp"]
+        )
+        for device, temp in [("a", "10"), ("a", "20"), ("b", "5"), ("a", "x")]:
+            aggregator.add({"device": device, "temp": temp})
+
+        rows = aggregator.rows()
+        assert len(aggregator) == 2
+        assert rows[0] == {
+            "device": "a",
+            "count": 3,
+            "sum:temp": 30.0,
+            "avg:temp": 15.0,
+            "min:temp": 10.0,
+            "max:temp": 20.0,
+        }
+        assert rows[1]["device"] == "b"
+
+    def test_without_group_by(self) -> None:
+        """グループ指定なしで全体集計になることを確認"""
+        aggregator = GroupAggregator([], ["count", "count:temp"])
+        aggregator.add({"temp": 1})
+        aggregator.add({"temp": None})
+
+        assert aggregator.rows() == [{"count": 2, "count:temp": 1}]
+
+    def test_rows_limit(self) -> None:
+        """件数上限で多い順に切り詰められることを確認"""
+        aggregator = GroupAggregator(["k"], ["count"])
+        for key in ["a", "b", "b", "c", "c", "c"]:
+            aggregator.add({"k": key})
+
+        assert [row["k"] for row in aggregator.rows(limit=2)] == ["c", "b"]
+
+    def test_max_groups(self) -> None:
+        """グループ数の上限を超えた新しいグループの行は数えるだけにすることを確認"""
+        aggregator = GroupAggregator(["k"], ["count"], max_groups=2)
+        for key in ["a", "b", "c", "a", "d"]:
+            aggregator.add({"k": key})
+
+        assert len(aggregator) == 2
+        assert aggregator.overflow_rows == 2
+        assert aggregator.rows()[0] == {"k": "a", "count": 2}
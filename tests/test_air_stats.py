@@ -0,0 +1,147 @@
+"""air_stats.pyのテスト"""
+
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+
+from soracom_data_mcp.air_stats import (
+    MINUTES_CHUNK_SECONDS,
+    add_usage,
+    empty_usage,
+    fetch_air_stats,
+    merge_stats,
+    rollup_to_hours,
+    split_time_range,
+    top_consumers,
+)
+from soracom_data_mcp.client import SoracomApiError
+
+
+class TestAirStats:
+    """Air統計の取得と集計のテスト"""
+
+    def test_fetch_air_stats(self) -> None:
+        """レスポンスを共通形式に変換することを確認"""
+        with patch("soracom_data_mcp.air_stats.soracom_client") as mock_client:
+            mock_client.get.return_value = [
+                {"date": "2024-01-01", "uploadByteSizeTotal": 10}
+            ]
+            stats = fetch_air_stats("440000000000001", 0, 100, "day")
+
+        assert stats == [{
+            "date": "2024-01-01",
+            "upload_bytes": 10,
+            "download_bytes": None,
+            "upload_packets": None,
+            "download_packets": None,
+        }]
+        assert mock_client.get.call_args[1]["params"] == {
+            "from": 0,
+            "to": 100,
+            "period": "day",
+        }
+
+    def test_fetch_minutes_in_chunks(self) -> None:
+        """period=minutes の長い期間を分割して取得し、重複を除くことを確認"""
+
+        def get(path: str, params: dict[str, Any]) -> list[dict[str, Any]]:
+            # 区間の両端の時刻の統計を返す（境界の統計は2つの区間に含まれる）
+            return [
+                {"date": params["from"], "uploadByteSizeTotal": 1},
+                {"date": params["to"], "uploadByteSizeTotal": 1},
+            ]
+
+        with patch("soracom_data_mcp.air_stats.soracom_client") as mock_client:
+            mock_client.get.side_effect = get
+            stats = fetch_air_stats("1", 0, 2 * MINUTES_CHUNK_SECONDS + 10, "minutes")
+
+        assert mock_client.get.call_count == 3
+        assert [stat["date"] for stat in stats] == [
+            0,
+            MINUTES_CHUNK_SECONDS,
+            2 * MINUTES_CHUNK_SECONDS,
+            2 * MINUTES_CHUNK_SECONDS + 10,
+        ]
+
+    def test_fetch_chunks_sequentially(self) -> None:
+        """concurrent=False の場合は区間をスレッドを使わずに順に取得することを確認"""
+        with (
+            patch("soracom_data_mcp.air_stats.soracom_client") as mock_client,
+            patch("soracom_data_mcp.air_stats.run_concurrently") as mock_run,
+        ):
+            mock_client.get.side_effect = lambda path, params: [
+                {"date": params["from"], "uploadByteSizeTotal": 1}
+            ]
+            stats = fetch_air_stats(
+                "1", 0, 2 * MINUTES_CHUNK_SECONDS, "minutes", concurrent=False
+            )
+
+        mock_run.assert_not_called()
+        assert [stat["date"] for stat in stats] == [0, MINUTES_CHUNK_SECONDS]
+
+    def test_fetch_unexpected_response(self) -> None:
+        """配列でないレスポンスはエラーを送出することを確認"""
+        with patch("soracom_data_mcp.air_stats.soracom_client") as mock_client:
+            mock_client.get.return_value = {"message": "unexpected"}
+            with pytest.raises(SoracomApiError, match="unexpected"):
+                fetch_air_stats("1", 0, 100, "day")
+
+    def test_fetch_chunk_error(self) -> None:
+        """分割した区間の取得に失敗した場合はエラーを送出することを確認"""
+        with patch("soracom_data_mcp.air_stats.soracom_client") as mock_client:
+            mock_client.get.side_effect = SoracomApiError("Bad Request", 400)
+            with pytest.raises(SoracomApiError):
+                fetch_air_stats("1", 0, 2 * MINUTES_CHUNK_SECONDS, "minutes")
+
+    def test_split_time_range(self) -> None:
+        """期間を連続した区間に分割することを確認"""
+        assert split_time_range(0, 25, 10) == [(0, 10), (10, 20), (20, 25)]
+        assert split_time_range(0, 10, 10) == [(0, 10)]
+
+    def test_merge_stats(self) -> None:
+        """date の重複を除いて date 順に並べることを確認"""
+        merged = merge_stats([
+            [{"date": "202401010010"}, {"date": "202401010000"}],
+            [{"date": "202401010010"}],
+        ])
+        assert [stat["date"] for stat in merged] == ["202401010000", "202401010010"]
+
+    def test_rollup_to_hours(self) -> None:
+        """分単位の統計を時単位に合計することを確認"""
+        hours = rollup_to_hours([
+            {"date": "202401010005", "upload_bytes": 1, "download_bytes": 2},
+            {"date": "202401010055", "upload_bytes": 3, "download_bytes": None},
+            {"date": "202401010100", "upload_bytes": 5, "download_bytes": 0},
+        ])
+        assert [(hour["date"], hour["upload_bytes"]) for hour in hours] == [
+            ("2024010100", 4),
+            ("2024010101", 5),
+        ]
+        assert rollup_to_hours([{"date": 7300, "upload_bytes": 1}])[0]["date"] == 7200
+
+    def test_add_usage(self) -> None:
+        """通信量の加算と合計を確認"""
+        usage = add_usage(
+            empty_usage(),
+            [
+                {"upload_bytes": 10, "download_bytes": 20},
+                {"upload_bytes": 5, "download_bytes": None, "upload_packets": 3},
+            ],
+        )
+        assert usage["upload_bytes"] == 15
+        assert usage["download_bytes"] == 20
+        assert usage["upload_packets"] == 3
+        assert usage["total_bytes"] == 35
+
+    def test_top_consumers(self) -> None:
+        """通信量の多い順に上位N件を返すことを確認"""
+        usages = {
+            "a": {"total_bytes": 10},
+            "b": {"total_bytes": 30},
+            "c": {"total_bytes": 20},
+        }
+        assert top_consumers(usages, 2) == [
+            {"imsi": "b", "total_bytes": 30},
+            {"imsi": "c", "total_bytes": 20},
+        ]
@@ -0,0 +1,56 @@
+"""cache.pyのテスト"""
+
+import time
+from unittest.mock import patch
+
+from soracom_data_mcp.cache import TTLCache
+
+
+class TestTTLCache:
+    """TTLCacheクラスのテスト"""
+
+    def test_set_and_get(self) -> None:
+        """登録したエントリを取得できることを確認"""
+        cache: TTLCache[str, int] = TTLCache(ttl_seconds=60)
+        cache.set("a", 1)
+        assert cache.get("a") == 1
+        assert cache.get("missing") is None
+
+    def test_expired_entry(self) -> None:
+        """期限切れのエントリが破棄されることを確認"""
+        cache: TTLCache[str, int] = TTLCache(ttl_seconds=60)
+        cache.set("a", 1)
+        with patch("soracom_data_mcp.cache.time.time", return_value=time.time() + 61):
+            assert cache.get("a") is None
+        assert len(cache) == 0
+
+    def test_explicit_expires_at(self) -> None:
+        """有効期限の直接指定を確認"""
+        cache: TTLCache[str, int] = TTLCache(ttl_seconds=60)
+        cache.set("past", 1, expires_at=time.time() - 1)
+        cache.set("future", 2, expires_at=time.time() + 600)
+        assert cache.get("past") is None
+        entry = cache.get_entry("future")
+        assert entry is not None
+        assert entry[0] == 2
+
+    def test_lru_eviction(self) -> None:
+        """上限を超えると最も古く使われたエントリが削除されることを確認"""
+        cache: TTLCache[str, int] = TTLCache(ttl_seconds=60, max_size=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+
+    def test_pop_and_clear(self) -> None:
+        """削除操作を確認"""
+        cache: TTLCache[str, int] = TTLCache(ttl_seconds=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        assert cache.pop("a") == 1
+        assert cache.pop("a") is None
+        cache.clear()
+        assert len(cache) == 0
@@ -1,6 +1,7 @@
 """client.pyのテスト"""
 
 import time
+from pathlib import Path
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -252,3 +253,202 @@ class TestSoracomClient:
             )
             assert result == {"data": "test"}
 
+
+class TestFetchByteRange:
+    """fetch_byte_rangeメソッドのテスト"""
+
+    @staticmethod
+    def _client_with_stream(
+        status_code: int, headers: dict[str, str], chunks: list[bytes]
+    ) -> tuple[SoracomClient, MagicMock]:
+        client = SoracomClient()
+        mock_response = MagicMock()
+        mock_response.status_code = status_code
+        mock_response.headers = headers
+        mock_response.iter_bytes.return_value = iter(chunks)
+
+        mock_http_client = MagicMock()
+        mock_http_client.stream.return_value.__enter__.return_value = mock_response
+        client._client = mock_http_client
+        return client, mock_http_client
+
+    def test_head_range(self) -> None:
+        """先頭範囲の取得を確認"""
+        client, mock_http = self._client_with_stream(
+            206, {"Content-Range": "bytes 0-3/100"}, [b"abcd"]
+        )
+        data, total = client.fetch_byte_range("https://example.com/f", 0, 4)
+
+        assert data == b"abcd"
+        assert total == 100
+        mock_http.stream.assert_called_once_with(
+            "GET", "https://example.com/f", headers={"Range": "bytes=0-3"}
+        )
+
+    def test_tail_range(self) -> None:
+        """末尾範囲（suffix range）の取得を確認"""
+        client, mock_http = self._client_with_stream(
+            206, {"Content-Range": "bytes 96-99/100"}, [b"wx", b"yz"]
+        )
+        data, total = client.fetch_byte_range("https://example.com/f", None, 4)
+
+        assert data == b"wxyz"
+        assert total == 100
+        assert mock_http.stream.call_args[1]["headers"] == {"Range": "bytes=-4"}
+
+    def test_range_ignored_truncates_head(self) -> None:
+        """Rangeが無視された場合も先頭は必要分だけ読むことを確認"""
+        client, _ = self._client_with_stream(
+            200, {"Content-Length": "100"}, [b"abcdef", b"never-read"]
+        )
+        data, total = client.fetch_byte_range("https://example.com/f", 0, 4)
+
+        assert data == b"abcd"
+        assert total == 100
+
+    def test_range_ignored_tail_error(self) -> None:
+        """Rangeが無視された場合に末尾取得はエラーになることを確認"""
+        client, _ = self._client_with_stream(200, {}, [b"abcdef"])
+        with pytest.raises(SoracomApiError):
+            client.fetch_byte_range("https://example.com/f", None, 4)
+
+    def test_download_error(self) -> None:
+        """ダウンロード先のエラーを確認"""
+        client, _ = self._client_with_stream(403, {}, [])
+        with pytest.raises(SoracomApiError) as exc_info:
+            client.fetch_byte_range("https://example.com/f", 0, 4)
+        assert exc_info.value.status_code == 403
+
+
+class TestIterLines:
+    """iter_linesメソッドのテスト"""
+
+    def test_iter_lines_success(self) -> None:
+        """行単位のストリーミング取得を確認"""
+        client = SoracomClient()
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.iter_bytes.return_value = iter([b"\xef\xbb\xbfa,b\r\n1,", b"2"])
+
+        mock_http_client = MagicMock()
+        mock_http_client.stream.return_value.__enter__.return_value = mock_response
+        client._client = mock_http_client
+
+        assert list(client.iter_lines("https://example.com/f.csv")) == [
+            "a,b\r\n",
+            "1,2",
+        ]
+        mock_http_client.stream.assert_called_once_with(
+            "GET", "https://example.com/f.csv"
+        )
+
+    def test_iter_lines_error(self) -> None:
+        """ダウンロード先のエラーを確認"""
+        client = SoracomClient()
+        mock_response = MagicMock()
+        mock_response.status_code = 404
+
+        mock_http_client = MagicMock()
+        mock_http_client.stream.return_value.__enter__.return_value = mock_response
+        client._client = mock_http_client
+
+        with pytest.raises(SoracomApiError) as exc_info:
+            list(client.iter_lines("https://example.com/f.csv"))
+        assert exc_info.value.status_code == 404
+
+
+class TestPagination:
+    """get_page・iter_pagesメソッドのテスト"""
+
+    @staticmethod
+    def _response(items: list[dict[str, str]], next_key: str | None) -> MagicMock:
+        response = MagicMock()
+        response.status_code = 200
+        response.json.return_value = items
+        response.headers = {"x-soracom-next-key": next_key} if next_key else {}
+        return response
+
+    @staticmethod
+    def _authenticated_client() -> SoracomClient:
+        client = SoracomClient()
+        client._api_key = "test-api-key"
+        client._token = "test-token"
+        client._token_expires_at = time.time() + 600
+        return client
+
+    def test_get_page_returns_next_key(self) -> None:
+        """次ページのキーが返されることを確認"""
+        client = self._authenticated_client()
+        mock_http_client = MagicMock()
+        mock_http_client.request.return_value = self._response([{"id": "1"}], "k1")
+        client._client = mock_http_client
+
+        items, next_key = client.get_page("/test")
+
+        assert items == [{"id": "1"}]
+        assert next_key == "k1"
+
+    def test_iter_pages_follows_next_key(self) -> None:
+        """次ページのキーをたどって全ページ取得することを確認"""
+        client = self._authenticated_client()
+        mock_http_client = MagicMock()
+        mock_http_client.request.side_effect = [
+            self._response([{"id": "1"}], "k1"),
+            self._response([{"id": "2"}], None),
+        ]
+        client._client = mock_http_client
+
+        pages = list(client.iter_pages("/test", params={"limit": 1}))
+
+        assert pages == [[{"id": "1"}], [{"id": "2"}]]
+        second_params = mock_http_client.request.call_args_list[1][1]["params"]
+        assert second_params == {"limit": 1, "last_evaluated_key": "k1"}
+
+    def test_iter_pages_max_pages(self) -> None:
+        """取得ページ数の上限を確認"""
+        client = self._authenticated_client()
+        mock_http_client = MagicMock()
+        mock_http_client.request.return_value = self._response([{"id": "1"}], "k1")
+        client._client = mock_http_client
+
+        pages = list(client.iter_pages("/test", max_pages=2))
+
+        assert len(pages) == 2
+        assert mock_http_client.request.call_count == 2
+
+
+class TestDownloadFile:
+    """download_fileメソッドのテスト"""
+
+    def test_download_file(self, tmp_path: Path) -> None:
+        """ファイルへのストリーミング保存を確認"""
+        client = SoracomClient()
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.iter_bytes.return_value = iter([b"abc", b"def"])
+
+        mock_http_client = MagicMock()
+        mock_http_client.stream.return_value.__enter__.return_value = mock_response
+        client._client = mock_http_client
+
+        destination = tmp_path / "sub" / "frame.jpg"
+        size = client.download_file("https://example.com/f.jpg", destination)
+
+        assert size == 6
+        assert destination.read_bytes() == b"abcdef"
+        assert not (tmp_path / "sub" / "frame.jpg.part").exists()
+
+    def test_download_file_error(self, tmp_path: Path) -> None:
+        """ダウンロード先のエラーでファイルが作成されないことを確認"""
+        client = SoracomClient()
+        mock_response = MagicMock()
+        mock_response.status_code = 403
+
+        mock_http_client = MagicMock()
+        mock_http_client.stream.return_value.__enter__.return_value = mock_response
+        client._client = mock_http_client
+
+        destination = tmp_path / "frame.jpg"
+        with pytest.raises(SoracomApiError):
+            client.download_file("https://example.com/f.jpg", destination)
+        assert not destination.exists()
@@ -67,3 +67,19 @@ class TestApiEndpoint:
             settings = Settings()
             assert settings.api_endpoint == expected
 
+
+class TestCacheDir:
+    """cache_dirプロパティのテスト"""
+
+    def test_default_cache_dir(self) -> None:
+        """デフォルトのキャッシュディレクトリを確認"""
+        with patch.dict("os.environ", {}, clear=True):
+            settings = Settings()
+            assert settings.cache_dir.parts[-2:] == (".cache", "soracom-data-mcp")
+
+    def test_custom_cache_dir(self) -> None:
+        """環境変数でキャッシュディレクトリを指定できることを確認"""
+        env = {"SORACOM_CACHE_DIR": "/tmp/soracom-cache"}
+        with patch.dict("os.environ", env, clear=True):
+            settings = Settings()
+            assert str(settings.cache_dir) == "/tmp/soracom-cache"
@@ -0,0 +1,82 @@
+"""correlate.pyのテスト"""
+
+from collections import deque
+from collections.abc import Iterator
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+
+from soracom_data_mcp.correlate import asof_join
+
+LEFT = [(100, "a"), (200, "b"), (300, "c")]
+RIGHT = [(90, "x"), (195, "y"), (215, "z"), (500, "w")]
+
+
+class TestAsofJoin:
+    """asof_join関数のテスト"""
+
+    def test_nearest(self) -> None:
+        """前後で最も近い要素を対応させることを確認"""
+        assert list(asof_join(LEFT, RIGHT, 20)) == [
+            ("a", "x", -10),
+            ("b", "y", -5),
+        ]
+
+    def test_backward(self) -> None:
+        """左の時刻以前で最も新しい要素を対応させることを確認"""
+        assert list(asof_join(LEFT, RIGHT, 20, "backward")) == [
+            ("a", "x", -10),
+            ("b", "y", -5),
+        ]
+        assert list(asof_join([(220, "b")], RIGHT, 30, "backward")) == [
+            ("b", "z", -5)
+        ]
+
+    def test_forward(self) -> None:
+        """左の時刻以降で最も古い要素を対応させることを確認"""
+        assert list(asof_join(LEFT, RIGHT, 20, "forward")) == [("b", "z", 15)]
+
+    def test_right_reused(self) -> None:
+        """右の同じ要素が複数の左の要素に対応できることを確認"""
+        left = [(100, "a"), (105, "b")]
+        assert list(asof_join(left, [(102, "x")], 5)) == [
+            ("a", "x", 2),
+            ("b", "x", -3),
+        ]
+
+    def test_streams_lazily(self) -> None:
+        """右の系列を必要な分だけ読み進めることを確認"""
+        consumed: list[int] = []
+
+        def right() -> Iterator[tuple[int, str]]:
+            for item in RIGHT:
+                consumed.append(item[0])
+                yield item
+
+        list(asof_join([(100, "a")], right(), 20))
+        assert consumed == [90, 195]
+
+    def test_window_bounded_by_tolerance(self) -> None:
+        """左の要素の間隔が長くても、許容範囲内の要素だけを保持することを確認"""
+        peak = 0
+
+        class TrackedDeque(deque[Any]):
+            def append(self, item: Any) -> None:
+                nonlocal peak
+                super().append(item)
+                peak = max(peak, len(self))
+
+        left = [(0, "a"), (100_000, "b")]
+        right = ((t, t) for t in range(100_001))
+
+        with patch("soracom_data_mcp.correlate.deque", TrackedDeque):
+            result = list(asof_join(left, right, 10))
+
+        assert result == [("a", 0, 0), ("b", 100_000, 0)]
+        assert peak <= 2 * 10 + 2
+
+    def test_invalid_direction(self) -> None:
+        """不正な方向のエラーを確認"""
+        with pytest.raises(ValueError):
+            list(asof_join(LEFT, RIGHT, 20, "sideways"))
@@ -0,0 +1,139 @@
+"""event_store.pyのテスト"""
+
+from pathlib import Path
+from typing import Any
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from soracom_data_mcp.event_store import SoracamEventStore
+
+HOUR = 3_600_000
+
+
+def _event(time: int, event_type: str = "motion") -> dict[str, Any]:
+    return {
+        "eventId": f"ev-{time}",
+        "deviceId": "CAM1",
+        "eventType": event_type,
+        "time": time,
+    }
+
+
+@pytest.fixture
+def store(tmp_path: Path) -> SoracamEventStore:
+    """一時ディレクトリのイベントストア"""
+    return SoracamEventStore(tmp_path / "soracam_events.sqlite3")
+
+
+class TestSoracamEventStore:
+    """SoracamEventStoreクラスのテスト"""
+
+    def test_initial_sync(self, store: SoracamEventStore) -> None:
+        """初回同期で指定期間を全ページ取得することを確認"""
+        with patch("soracom_data_mcp.soracam_events.soracom_client") as mock_client:
+            mock_client.get_page.side_effect = [
+                ([_event(100), _event(200)], "next"),
+                ([_event(300)], None),
+            ]
+            result = store.sync("CAM1", since=0, now=1000)
+
+        assert result["new_events"] == 3
+        assert result["synced_from"] == 0
+        assert result["synced_to"] == 1000
+        params = mock_client.get_page.call_args_list[1][1]["params"]
+        assert params["sort"] == "asc"
+        assert params["last_evaluated_key"] == "next"
+
+    def test_incremental_sync_from_newest_event(
+        self, store: SoracamEventStore
+    ) -> None:
+        """2回目以降は保存済みの最新イベント以降だけを取得することを確認"""
+        with patch("soracom_data_mcp.soracam_events.soracom_client") as mock_client:
+            mock_client.get_page.return_value = ([_event(100), _event(200)], None)
+            store.sync("CAM1", since=0, now=1000)
+
+            mock_client.get_page.return_value = ([_event(200), _event(1500)], None)
+            result = store.sync("CAM1", since=0, now=2000)
+
+        params = mock_client.get_page.call_args[1]["params"]
+        assert params["from"] == 200
+        assert params["to"] == 2000
+        assert result["new_events"] == 1
+        assert len(store.query()) == 3
+
+    def test_backfill_older_range(self, store: SoracamEventStore) -> None:
+        """同期済み期間より前を要求した場合に遡って取得することを確認"""
+        with patch("soracom_data_mcp.soracam_events.soracom_client") as mock_client:
+            mock_client.get_page.return_value = ([], None)
+            store.sync("CAM1", since=1000, now=2000)
+            mock_client.get_page.reset_mock()
+
+            store.sync("CAM1", since=0, now=3000)
+
+        ranges = [
+            (call[1]["params"]["from"], call[1]["params"]["to"])
+            for call in mock_client.get_page.call_args_list
+        ]
+        assert ranges == [(0, 1000), (2000, 3000)]
+        assert store.sync_states()["CAM1"] == {"synced_from": 0, "synced_to": 3000}
+
+    def test_query_filters(self, store: SoracamEventStore) -> None:
+        """ローカル検索のフィルタを確認"""
+        with patch("soracom_data_mcp.soracam_events.soracom_client") as mock_client:
+            mock_client.get_page = MagicMock(
+                return_value=(
+                    [_event(100), _event(200, "person"), _event(300)],
+                    None,
+                )
+            )
+            store.sync("CAM1", since=0, now=1000)
+
+        assert [e["timestamp"] for e in store.query(event_type="motion")] == [
+            300,
+            100,
+        ]
+        assert [e["timestamp"] for e in store.query(from_time=150, sort="asc")] == [
+            200,
+            300,
+        ]
+        assert store.query(device_ids=["OTHER"]) == []
+
+    def test_heatmap(self, store: SoracamEventStore) -> None:
+        """時間帯ごとの集計と空き時間帯の0埋めを確認"""
+        with patch("soracom_data_mcp.soracam_events.soracom_client") as mock_client:
+            mock_client.get_page.return_value = (
+                [_event(10), _event(20), _event(2 * HOUR + 5)],
+                None,
+            )
+            store.sync("CAM1", since=0, now=3 * HOUR)
+
+        heatmap = store.heatmap(bucket="hour")
+
+        assert heatmap["bucket_starts"] == [0, HOUR, 2 * HOUR]
+        assert heatmap["counts"] == {"CAM1": [2, 0, 1]}
+
+    def test_heatmap_max_buckets(self, store: SoracamEventStore) -> None:
+        """0埋めした時間帯の数が上限を超える場合はエラーにすることを確認"""
+        with patch("soracom_data_mcp.soracam_events.soracom_client") as mock_client:
+            mock_client.get_page.return_value = ([_event(10), _event(5 * HOUR)], None)
+            store.sync("CAM1", since=0, now=6 * HOUR)
+
+        with pytest.raises(ValueError, match="上限"):
+            store.heatmap(bucket="hour", max_buckets=5)
+        assert len(store.heatmap(bucket="hour", max_buckets=6)["bucket_starts"]) == 6
+
+    def test_heatmap_day_with_offset(self, store: SoracamEventStore) -> None:
+        """タイムゾーンを考慮した日単位の集計を確認"""
+        with patch("soracom_data_mcp.soracam_events.soracom_client") as mock_client:
+            # UTC 14:00 と 16:00 は JST では別の日になる
+            mock_client.get_page.return_value = (
+                [_event(14 * HOUR), _event(16 * HOUR)],
+                None,
+            )
+            store.sync("CAM1", since=0, now=24 * HOUR)
+
+        heatmap = store.heatmap(bucket="day", utc_offset_minutes=9 * 60)
+
+        assert heatmap["bucket_starts"] == [-9 * HOUR, 15 * HOUR]
+        assert heatmap["counts"] == {"CAM1": [1, 1]}
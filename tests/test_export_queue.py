@@ -0,0 +1,173 @@
+"""export_queue.pyのテスト"""
+
+import time
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+
+from soracom_data_mcp.client import SoracomApiError
+from soracom_data_mcp.export_queue import MAX_JOB_AGE_SECONDS, SoracamExportQueue
+
+
+@pytest.fixture
+def queue(tmp_path: Path) -> SoracamExportQueue:
+    """一時ディレクトリのエクスポートキュー"""
+    return SoracamExportQueue(tmp_path / "queue.sqlite3")
+
+
+def _processing(export_id: str = "ex1") -> dict[str, str]:
+    return {"export_id": export_id, "status": "processing"}
+
+
+class TestSoracamExportQueue:
+    """SoracamExportQueueクラスのテスト"""
+
+    def test_record_and_find_pending(self, queue: SoracamExportQueue) -> None:
+        """未完了ジョブを同じ範囲で検索できることを確認"""
+        job = queue.record("CAM1", 0, 1000, _processing())
+
+        assert job is not None
+        assert job["finished"] is False
+        assert queue.find_pending("CAM1", 0, 1000) == job
+        assert queue.find_pending("CAM1", 0, 2000) is None
+
+    def test_record_without_export_id(self, queue: SoracamExportQueue) -> None:
+        """export_id がないレスポンスは記録しないことを確認"""
+        assert queue.record("CAM1", 0, 1000, {"status": "failed"}) is None
+        assert queue.jobs() == []
+
+    def test_completed_job_not_pending(self, queue: SoracamExportQueue) -> None:
+        """完了したジョブは重複排除の対象外になることを確認"""
+        queue.record("CAM1", 0, 1000, _processing())
+        queue.update({"export_id": "ex1", "status": "completed", "url": "https://x"})
+
+        assert queue.find_pending("CAM1", 0, 1000) is None
+        job = queue.get("ex1")
+        assert job is not None
+        assert job["url"] == "https://x"
+        assert job["finished"] is True
+
+    def test_poll_due(self, queue: SoracamExportQueue) -> None:
+        """未完了ジョブをポーリングして更新することを確認"""
+        queue.record("CAM1", 0, 1000, _processing("ex1"))
+        queue.record("CAM2", 0, 1000, _processing("ex2"))
+
+        with patch("soracom_data_mcp.soracam_exports.soracom_client") as mock_client:
+            mock_client.get.return_value = {"exportId": "ex1", "status": "completed"}
+            assert queue.poll_due() == 0
+            assert queue.poll_due(force=True) == 2
+
+        assert queue.jobs(pending_only=True) == []
+        assert queue.seconds_until_next_poll() is None
+
+    def test_poll_backoff_and_not_found(self, queue: SoracamExportQueue) -> None:
+        """ポーリング間隔が伸び、存在しないジョブは打ち切ることを確認"""
+        queue.record("CAM1", 0, 1000, _processing("ex1"))
+        queue.record("CAM2", 0, 1000, _processing("ex2"))
+
+        def get(path: str) -> dict[str, str]:
+            if "CAM2" in path:
+                raise SoracomApiError("Not found", 404)
+            return {"exportId": "ex1", "status": "processing"}
+
+        with patch("soracom_data_mcp.soracam_exports.soracom_client") as mock_client:
+            mock_client.get.side_effect = get
+            queue.poll_due(force=True)
+
+        wait = queue.seconds_until_next_poll()
+        assert wait is not None
+        assert 1.0 < wait <= 1.5
+        missing = queue.get("ex2")
+        assert missing is not None
+        assert missing["status"] == "failed"
+        assert "404" in missing["error"]
+        assert [job["export_id"] for job in queue.jobs(pending_only=True)] == ["ex1"]
+
+    def test_jobs_filters(self, queue: SoracamExportQueue) -> None:
+        """ジョブ一覧のフィルタを確認"""
+        queue.record("CAM1", 0, 1000, _processing("ex1"))
+        queue.record("CAM2", 0, 1000, {"export_id": "ex2", "status": "failed"})
+
+        assert [job["export_id"] for job in queue.jobs(device_id="CAM2")] == ["ex2"]
+        assert [job["export_id"] for job in queue.jobs(status="processing")] == [
+            "ex1"
+        ]
+
+    def test_survives_reopen(self, tmp_path: Path) -> None:
+        """再起動後も未完了ジョブが残ることを確認"""
+        path = tmp_path / "queue.sqlite3"
+        SoracamExportQueue(path).record("CAM1", 0, 1000, _processing())
+
+        assert SoracamExportQueue(path).find_pending("CAM1", 0, 1000) is not None
+
+    async def test_run_worker(self, queue: SoracamExportQueue) -> None:
+        """ワーカーが未完了ジョブをポーリングし続けることを確認"""
+        queue.record("CAM1", 0, 1000, _processing())
+        sleep = AsyncMock(side_effect=[None, RuntimeError("stop")])
+        now = time.time()
+
+        with (
+            patch("soracom_data_mcp.soracam_exports.soracom_client") as mock_client,
+            patch("soracom_data_mcp.export_queue.asyncio.sleep", sleep),
+            patch("soracom_data_mcp.export_queue.time.time") as mock_time,
+        ):
+            mock_time.return_value = now + 60
+            mock_client.get.return_value = {"exportId": "ex1", "status": "completed"}
+            with pytest.raises(RuntimeError):
+                await queue.run_worker()
+
+        assert mock_client.get.call_count == 1
+        assert queue.jobs(pending_only=True) == []
+
+    def test_poll_transport_error(self, queue: SoracamExportQueue) -> None:
+        """通信エラーのジョブは記録して未完了のまま残すことを確認"""
+        queue.record("CAM1", 0, 1000, _processing("ex1"))
+        queue.record("CAM2", 0, 1000, _processing("ex2"))
+
+        def get(path: str) -> dict[str, str]:
+            if "CAM1" in path:
+                raise httpx.ConnectError("connection refused")
+            return {"exportId": "ex2", "status": "completed"}
+
+        with patch("soracom_data_mcp.soracam_exports.soracom_client") as mock_client:
+            mock_client.get.side_effect = get
+            assert queue.poll_due(force=True) == 2
+
+        job = queue.get("ex1")
+        assert job is not None
+        assert job["finished"] is False
+        assert "connection refused" in job["error"]
+        assert [job["export_id"] for job in queue.jobs(pending_only=True)] == ["ex1"]
+
+    def test_expire_stale(self, queue: SoracamExportQueue) -> None:
+        """終了しないまま古くなったジョブを失敗にすることを確認"""
+        queue.record("CAM1", 0, 1000, _processing())
+        now = time.time()
+
+        with (
+            patch("soracom_data_mcp.soracam_exports.soracom_client") as mock_client,
+            patch("soracom_data_mcp.export_queue.time.time") as mock_time,
+        ):
+            mock_time.return_value = now + MAX_JOB_AGE_SECONDS + 1
+            assert queue.poll_due(force=True) == 0
+
+        mock_client.get.assert_not_called()
+        job = queue.get("ex1")
+        assert job is not None
+        assert job["status"] == "failed"
+        assert job["finished"] is True
+
+    async def test_run_worker_survives_errors(self, queue: SoracamExportQueue) -> None:
+        """ポーリング中の予期しないエラーでワーカーが止まらないことを確認"""
+        sleep = AsyncMock(side_effect=[None, RuntimeError("stop")])
+
+        with (
+            patch.object(queue, "poll_due", side_effect=[KeyError("x"), 0]) as poll,
+            patch("soracom_data_mcp.export_queue.asyncio.sleep", sleep),
+            pytest.raises(RuntimeError),
+        ):
+            await queue.run_worker()
+
+        assert poll.call_count == 2
@@ -0,0 +1,117 @@
+"""file_index.pyのテスト"""
+
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from soracom_data_mcp.client import SoracomApiError
+from soracom_data_mcp.file_index import (
+    HarvestFileIndex,
+    normalize_directory,
+    top_prefixes,
+)
+
+
+def _file(path: str, size: int) -> dict[str, Any]:
+    return {"filePath": path, "isDirectory": False, "contentLength": size}
+
+
+def _dir(path: str) -> dict[str, Any]:
+    return {"filePath": path, "isDirectory": True}
+
+
+def _fake_tree(tree: dict[str, list[dict[str, Any]]]) -> MagicMock:
+    """ディレクトリ構造を返すiter_pagesのモック"""
+
+    def iter_pages(path: str, params: Any = None) -> Iterator[list[Any]]:
+        directory = path.split("/", 3)[3] if path.count("/") >= 3 else ""
+        yield tree[directory]
+
+    return MagicMock(side_effect=iter_pages)
+
+
+TREE = {
+    "": [_dir("/dev-a"), _dir("/dev-b"), _file("/root.txt", 5)],
+    "dev-a/": [_file("/dev-a/1.jpg", 100), _dir("/dev-a/2024")],
+    "dev-a/2024/": [_file("/dev-a/2024/x.jpg", 300)],
+    "dev-b/": [_file("/dev-b/1.jpg", 50)],
+}
+
+
+@pytest.fixture
+def index(tmp_path: Path) -> HarvestFileIndex:
+    """一時ディレクトリのインデックス"""
+    return HarvestFileIndex(tmp_path / "harvest_files.sqlite3")
+
+
+class TestHarvestFileIndex:
+    """HarvestFileIndexクラスのテスト"""
+
+    def test_normalize_directory(self) -> None:
+        """ディレクトリパスの正規化を確認"""
+        assert normalize_directory("/") == ""
+        assert normalize_directory("/a/b") == "a/b/"
+        assert normalize_directory("a/") == "a/"
+
+    def test_walk_and_usage(self, index: HarvestFileIndex) -> None:
+        """走査とプレフィックス別集計を確認"""
+        with patch("soracom_data_mcp.file_index.soracom_client") as mock_client:
+            mock_client.iter_pages = _fake_tree(TREE)
+            stats = index.walk("private", "/")
+
+        assert stats == {"listed": 4, "cached": 0}
+        mock_client.iter_pages.assert_any_call(
+            "/files/private/dev-a/", params={"limit": 100}
+        )
+
+        totals, prefixes = index.usage("private", "/", depth=1)
+        assert totals == {"size": 455, "file_count": 4}
+        assert prefixes == {"": [5, 1], "dev-a/": [400, 2], "dev-b/": [50, 1]}
+
+        _, deeper = index.usage("private", "/dev-a", depth=1)
+        assert deeper == {"dev-a/": [100, 1], "dev-a/2024/": [300, 1]}
+
+    def test_walk_reuses_fresh_listings(self, index: HarvestFileIndex) -> None:
+        """鮮度が十分なディレクトリはAPIを呼ばないことを確認"""
+        with patch("soracom_data_mcp.file_index.soracom_client") as mock_client:
+            mock_client.iter_pages = _fake_tree(TREE)
+            index.walk("private", "/")
+            mock_client.iter_pages.reset_mock()
+
+            stats = index.walk("private", "/", max_age_seconds=3600)
+
+        assert stats == {"listed": 0, "cached": 4}
+        mock_client.iter_pages.assert_not_called()
+
+    def test_walk_removes_deleted_directories(self, index: HarvestFileIndex) -> None:
+        """消えたディレクトリの配下がインデックスから削除されることを確認"""
+        with patch("soracom_data_mcp.file_index.soracom_client") as mock_client:
+            mock_client.iter_pages = _fake_tree(TREE)
+            index.walk("private", "/")
+
+            updated = dict(TREE)
+            updated[""] = [_dir("/dev-b"), _file("/root.txt", 5)]
+            mock_client.iter_pages = _fake_tree(updated)
+            index.walk("private", "/", max_age_seconds=0)
+
+        totals, prefixes = index.usage("private", "/")
+        assert totals == {"size": 55, "file_count": 2}
+        assert "dev-a/" not in prefixes
+
+    def test_walk_error(self, index: HarvestFileIndex) -> None:
+        """APIエラーが呼び出し元に伝わることを確認"""
+        with patch("soracom_data_mcp.file_index.soracom_client") as mock_client:
+            mock_client.iter_pages.side_effect = SoracomApiError("Forbidden", 403)
+            with pytest.raises(SoracomApiError):
+                index.walk("private", "/")
+
+    def test_top_prefixes(self) -> None:
+        """使用量上位の抽出を確認"""
+        result = top_prefixes({"a/": [10, 1], "b/": [30, 2], "": [20, 1]}, 2)
+        assert result == [
+            {"prefix": "/b/", "size": 30, "file_count": 2},
+            {"prefix": "/", "size": 20, "file_count": 1},
+        ]
@@ -0,0 +1,151 @@
+"""harvest_data.pyのテスト"""
+
+from unittest.mock import patch
+
+from soracom_data_mcp.aggregate import compile_filter
+from soracom_data_mcp.harvest_data import (
+    fetch_latest_record,
+    filter_harvest_data,
+    iter_harvest_data,
+    record_content,
+)
+
+
+class TestRecordContent:
+    """record_content関数のテスト"""
+
+    def test_json_string(self) -> None:
+        """JSON文字列のcontentをパースすることを確認"""
+        assert record_content({"content": '{"temp": 25}'}) == {"temp": 25}
+
+    def test_plain_values(self) -> None:
+        """パースできない文字列や辞書はそのまま返すことを確認"""
+        assert record_content({"content": "hello"}) == "hello"
+        assert record_content({"content": {"temp": 25}}) == {"temp": 25}
+
+
+class TestIterHarvestData:
+    """iter_harvest_data関数のテスト"""
+
+    def test_iterates_pages(self) -> None:
+        """全ページのレコードを順に返すことを確認"""
+        with patch("soracom_data_mcp.harvest_data.soracom_client") as mock_client:
+            mock_client.iter_pages.return_value = iter([
+                [{"time": 1, "content": {}}, {"content": {}}],
+                [{"time": 2, "content": {}}],
+            ])
+            records = list(iter_harvest_data("440000000000001", 0, 10))
+
+        assert [record["time"] for record in records] == [1, 2]
+        args, kwargs = mock_client.iter_pages.call_args
+        assert args[0] == "/data/subscribers/440000000000001"
+        assert kwargs["params"] == {"sort": "asc", "limit": 1000, "from": 0, "to": 10}
+
+
+class TestFetchLatestRecord:
+    """fetch_latest_record関数のテスト"""
+
+    def test_latest(self) -> None:
+        """新しい順に1件だけ取得することを確認"""
+        with patch("soracom_data_mcp.harvest_data.soracom_client") as mock_client:
+            mock_client.get.return_value = [{"time": 5, "content": {}}]
+            record = fetch_latest_record("440000000000001")
+
+        assert record == {"time": 5, "content": {}}
+        assert mock_client.get.call_args[1]["params"] == {"sort": "desc", "limit": 1}
+
+    def test_no_data(self) -> None:
+        """データがない場合はNoneを返すことを確認"""
+        with patch("soracom_data_mcp.harvest_data.soracom_client") as mock_client:
+            mock_client.get.return_value = []
+            assert fetch_latest_record("440000000000001") is None
+
+
+# 新しい順の2ページ分のレコード
+FILTER_PAGES = [
+    [
+        {"time": 50, "content": '{"temp": 35}'},
+        {"time": 40, "content": {"temp": 20}},
+    ],
+    [
+        {"time": 30, "content": {"temp": 31}},
+        {"time": 20, "content": {"temp": 32}},
+    ],
+]
+
+
+class TestFilterHarvestData:
+    """filter_harvest_data関数のテスト"""
+
+    def test_stops_at_limit(self) -> None:
+        """limit 件集まった時点で取得をやめ、続きの時刻を返すことを確認"""
+        with patch("soracom_data_mcp.harvest_data.soracom_client") as mock_client:
+            mock_client.iter_pages.return_value = iter(FILTER_PAGES)
+            result = filter_harvest_data(
+                "1", None, None, compile_filter("content.temp > 30"), limit=2
+            )
+
+        assert [record["time"] for record in result["data"]] == [50, 30]
+        assert result["data"][0]["content"] == '{"temp": 35}'
+        assert result["scanned"] == 3
+        assert result["truncated"] is True
+        assert result["next"] == {"to_time": 29}
+
+    def test_scan_limit(self) -> None:
+        """max_scanned 件を調べた時点で取得をやめることを確認"""
+        with patch("soracom_data_mcp.harvest_data.soracom_client") as mock_client:
+            mock_client.iter_pages.return_value = iter(FILTER_PAGES)
+            result = filter_harvest_data(
+                "1",
+                None,
+                None,
+                compile_filter("content.temp > 100"),
+                sort="asc",
+                max_scanned=2,
+            )
+
+        assert result["data"] == []
+        assert result["next"] == {"from_time": 41}
+
+    def test_all_pages(self) -> None:
+        """最後まで調べた場合は続きを返さないことを確認"""
+        with patch("soracom_data_mcp.harvest_data.soracom_client") as mock_client:
+            mock_client.iter_pages.return_value = iter(FILTER_PAGES)
+            result = filter_harvest_data(
+                "1", None, None, compile_filter("content.temp < 25")
+            )
+
+        assert [record["time"] for record in result["data"]] == [40]
+        assert result["truncated"] is False
+        assert result["next"] is None
+
+    def test_same_time_records_not_skipped(self) -> None:
+        """上限に達した時刻と同じ時刻のレコードも調べてから止めることを確認"""
+        pages = [
+            [
+                {"time": 50, "content": {"temp": 35}},
+                {"time": 50, "content": {"temp": 36}},
+            ],
+            [{"time": 40, "content": {"temp": 37}}],
+        ]
+        with patch("soracom_data_mcp.harvest_data.soracom_client") as mock_client:
+            mock_client.iter_pages.return_value = iter(pages)
+            result = filter_harvest_data(
+                "1", None, None, compile_filter("content.temp > 30"), limit=1
+            )
+
+        assert [record["content"]["temp"] for record in result["data"]] == [35, 36]
+        assert result["scanned"] == 2
+        assert result["next"] == {"to_time": 49}
+
+    def test_limit_on_last_record(self) -> None:
+        """最後のレコードで limit に達した場合は続きを返さないことを確認"""
+        with patch("soracom_data_mcp.harvest_data.soracom_client") as mock_client:
+            mock_client.iter_pages.return_value = iter(FILTER_PAGES)
+            result = filter_harvest_data(
+                "1", None, None, compile_filter("content.temp > 30"), limit=3
+            )
+
+        assert [record["time"] for record in result["data"]] == [50, 30, 20]
+        assert result["truncated"] is False
+        assert result["next"] is None
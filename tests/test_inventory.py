@@ -0,0 +1,100 @@
+"""inventory.pyのテスト"""
+
+from pathlib import Path
+from typing import Any
+from unittest.mock import MagicMock, patch
+
+from soracom_data_mcp.inventory import SubscriberInventory
+
+
+def _subscriber(imsi: str, modified: int = 1, **fields: Any) -> dict[str, Any]:
+    """テスト用のSIM"""
+    return {
+        "imsi": imsi,
+        "status": "active",
+        "groupId": "g1",
+        "speedClass": "s1.standard",
+        "lastModifiedAt": modified,
+        "tags": {},
+        **fields,
+    }
+
+
+def _sync(
+    inventory: SubscriberInventory, subscribers: list[dict[str, Any]]
+) -> tuple[dict[str, Any], MagicMock]:
+    """1ページのSIM一覧で同期"""
+    with patch("soracom_data_mcp.inventory.soracom_client") as mock_client:
+        mock_client.iter_pages.return_value = iter([subscribers])
+        result = inventory.sync()
+    return result, mock_client
+
+
+class TestSubscriberInventory:
+    """SubscriberInventoryクラスのテスト"""
+
+    def test_incremental_sync(self, tmp_path: Path) -> None:
+        """lastModifiedAt が変わったSIMだけ書き込み、消えたSIMを削除することを確認"""
+        inventory = SubscriberInventory(tmp_path / "subscribers.sqlite3")
+        result, mock_client = _sync(
+            inventory,
+            [_subscriber("1", tags={"name": "a"}), _subscriber("2"), _subscriber("3")],
+        )
+        assert result["added"] == 3
+        assert mock_client.iter_pages.call_args[1]["params"] == {"limit": 100}
+
+        result, _ = _sync(
+            inventory,
+            [
+                _subscriber("1", modified=2, status="inactive", tags={"name": "b"}),
+                _subscriber("2"),
+                _subscriber("4"),
+            ],
+        )
+        assert result["added"] == 1
+        assert result["updated"] == 1
+        assert result["unchanged"] == 1
+        assert result["removed"] == 1
+        assert result["total"] == 3
+
+        subscribers, total = inventory.search(status="inactive")
+        assert total == 1
+        assert subscribers[0]["tags"] == {"name": "b"}
+        assert inventory.search(tags={"name": "a"})[1] == 0
+        assert inventory.search()[1] == 3
+
+    def test_skip_recent_sync(self, tmp_path: Path) -> None:
+        """前回の同期から max_age_seconds 以内なら同期しないことを確認"""
+        inventory = SubscriberInventory(tmp_path / "subscribers.sqlite3")
+        _sync(inventory, [])
+
+        with patch("soracom_data_mcp.inventory.soracom_client") as mock_client:
+            result = inventory.sync(max_age_seconds=3600)
+
+        assert result["skipped"] is True
+        mock_client.iter_pages.assert_not_called()
+
+    def test_search_multiple_attributes(self, tmp_path: Path) -> None:
+        """複数の条件をすべて満たすSIMを返すことを確認"""
+        inventory = SubscriberInventory(tmp_path / "subscribers.sqlite3")
+        _sync(
+            inventory,
+            [
+                _subscriber("1", tags={"area": "tokyo-1", "env": "prod"}),
+                _subscriber("2", tags={"area": "tokyo-2", "env": "dev"}),
+                _subscriber("3", groupId="g2", tags={"area": "tokyo-3", "env": "prod"}),
+                _subscriber("4", tags={"area": "osaka", "env": "prod"}),
+            ],
+        )
+
+        subscribers, total = inventory.search(
+            group_id="g1",
+            tags={"area": "tokyo", "env": "prod"},
+            tag_match_mode="prefix",
+        )
+        assert total == 1
+        assert subscribers[0]["imsi"] == "1"
+
+        subscribers, total = inventory.search(tags={"env": "prod"}, limit=2)
+        assert total == 3
+        assert [sub["imsi"] for sub in subscribers] == ["1", "3"]
@@ -0,0 +1,98 @@
+"""location_store.pyのテスト"""
+
+from pathlib import Path
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+
+from soracom_data_mcp.location_store import (
+    HarvestLocationStore,
+    extract_location,
+    grid_cell,
+    haversine_meters,
+    radius_bbox,
+)
+
+# 東京駅・渋谷駅・大阪駅付近
+TOKYO = (35.6812, 139.7671)
+SHIBUYA = (35.6580, 139.7016)
+OSAKA = (34.7025, 135.4959)
+
+
+def _records(*points: tuple[int, tuple[float, float]]) -> list[dict[str, Any]]:
+    return [
+        {"time": t, "content": {"lat": lat, "lon": lon}} for t, (lat, lon) in points
+    ]
+
+
+class TestGeometry:
+    """位置計算関数のテスト"""
+
+    def test_grid_cell(self) -> None:
+        """近い点は同じ区画、同じ行の隣の区画は連続する番号になることを確認"""
+        assert grid_cell(35.6812, 139.7671) == grid_cell(35.6815, 139.7679)
+        assert grid_cell(35.6812, 139.7771) == grid_cell(35.6812, 139.7671) + 1
+
+    def test_haversine(self) -> None:
+        """東京駅と大阪駅の距離が約400kmであることを確認"""
+        assert 395_000 < haversine_meters(*TOKYO, *OSAKA) < 410_000
+
+    def test_radius_bbox(self) -> None:
+        """円を囲む範囲に中心から半径の距離の点が含まれることを確認"""
+        min_lat, min_lon, max_lat, max_lon = radius_bbox(*TOKYO, 1000)
+        distance = haversine_meters(*TOKYO, max_lat, TOKYO[1])
+        assert distance == pytest.approx(1000, abs=1)
+        assert min_lat < TOKYO[0] < max_lat
+        assert min_lon < TOKYO[1] < max_lon
+
+    def test_extract_location(self) -> None:
+        """content内の緯度経度を取り出し、範囲外や数値以外は無視することを確認"""
+        record = {"content": '{"gps": {"lat": "35.1", "lon": 139.2}}'}
+        assert extract_location(record, "gps.lat", "gps.lon") == (35.1, 139.2)
+        assert extract_location({"content": {"lat": 91, "lon": 0}}, "lat", "lon") is None
+        assert extract_location({"content": {"lat": 1}}, "lat", "lon") is None
+
+
+class TestHarvestLocationStore:
+    """HarvestLocationStoreクラスのテスト"""
+
+    def test_sync_and_query(self, tmp_path: Path) -> None:
+        """位置情報を差分同期し、矩形・半径で検索できることを確認"""
+        store = HarvestLocationStore(tmp_path / "locations.sqlite3")
+        with patch("soracom_data_mcp.harvest_data.soracom_client") as mock_client:
+            mock_client.iter_pages.return_value = iter([
+                _records((10, TOKYO), (20, OSAKA)) + [{"time": 30, "content": {}}]
+            ])
+            result = store.sync("1", since=0, now=100)
+            assert result["new_locations"] == 2
+
+            mock_client.iter_pages.return_value = iter([_records((150, SHIBUYA))])
+            result = store.sync("1", since=0, now=200)
+            assert result["new_locations"] == 1
+            assert mock_client.iter_pages.call_args[1]["params"]["from"] == 100
+
+        kanto = store.query_bbox(35.0, 139.0, 36.0, 140.0)
+        assert [location["time"] for location in kanto] == [10, 150]
+        assert store.query_bbox(35.0, 139.0, 36.0, 140.0, from_time=100) == [
+            {"imsi": "1", "time": 150, "lat": SHIBUYA[0], "lon": SHIBUYA[1]}
+        ]
+        assert store.query_bbox(35.0, 139.0, 36.0, 140.0, imsis=["2"]) == []
+
+        near_tokyo = store.query_radius(*TOKYO, 7000)
+        assert [location["time"] for location in near_tokyo] == [10, 150]
+        assert near_tokyo[0]["distance_meters"] == 0
+        assert [loc["time"] for loc in store.query_radius(*TOKYO, 1000)] == [10]
+        assert store.sync_states()["1"] == {"synced_from": 0, "synced_to": 200}
+
+    def test_large_bbox(self, tmp_path: Path) -> None:
+        """区画の行数が多い範囲でも緯度経度で絞り込めることを確認"""
+        store = HarvestLocationStore(tmp_path / "locations.sqlite3")
+        with patch("soracom_data_mcp.harvest_data.soracom_client") as mock_client:
+            mock_client.iter_pages.return_value = iter([
+                _records((10, TOKYO), (20, OSAKA))
+            ])
+            store.sync("1", since=0, now=100)
+
+        japan = store.query_bbox(30.0, 130.0, 40.0, 140.0)
+        assert [location["time"] for location in japan] == [10, 20]
@@ -0,0 +1,54 @@
+"""media_cache.pyのテスト"""
+
+import os
+from pathlib import Path
+
+from soracom_data_mcp.media_cache import SoracamMediaCache
+
+
+class TestSoracamMediaCache:
+    """SoracamMediaCacheクラスのテスト（ダウンロードはconftestでモック）"""
+
+    def test_store_and_lookup(self, tmp_path: Path) -> None:
+        """保存したファイルを時間範囲で検索できることを確認"""
+        cache = SoracamMediaCache(tmp_path)
+        stored = cache.store("CAM1", "image", 100, 100, "https://x/a.jpg")
+
+        assert stored["path"].endswith(".jpg")
+        assert Path(stored["path"]).read_bytes() == b"https://x/a.jpg"
+        assert cache.lookup("CAM1", "image", 100, 100) == stored
+        assert cache.lookup("CAM1", "video", 100, 100) is None
+        assert not list((tmp_path / "staging").iterdir())
+
+    def test_same_content_shared(self, tmp_path: Path) -> None:
+        """同じ内容のファイルは1つだけ保存することを確認"""
+        cache = SoracamMediaCache(tmp_path)
+        first = cache.store("CAM1", "image", 100, 100, "https://x/a.jpg")
+        second = cache.store("CAM1", "image", 200, 200, "https://x/a.jpg")
+
+        assert first["path"] == second["path"]
+        assert cache.usage()["file_count"] == 1
+
+    def test_lru_eviction(self, tmp_path: Path) -> None:
+        """上限を超えた場合に参照の古いファイルから削除することを確認"""
+        cache = SoracamMediaCache(tmp_path, max_bytes=40)
+        a = cache.store("CAM1", "image", 1, 1, "https://x/a.jpg")
+        cache.store("CAM1", "image", 2, 2, "https://x/b.jpg")
+        # a を参照して b を最も古い参照にする
+        cache.conn.execute("UPDATE objects SET last_accessed = 0")
+        assert cache.lookup("CAM1", "image", 1, 1) is not None
+        cache.store("CAM1", "image", 3, 3, "https://x/c.jpg")
+
+        assert cache.lookup("CAM1", "image", 2, 2) is None
+        assert cache.lookup("CAM1", "image", 1, 1) == a
+        assert cache.lookup("CAM1", "image", 3, 3) is not None
+        assert cache.usage()["size"] <= 40
+
+    def test_missing_file_dropped(self, tmp_path: Path) -> None:
+        """外部で削除されたファイルはキャッシュから外れることを確認"""
+        cache = SoracamMediaCache(tmp_path)
+        stored = cache.store("CAM1", "video", 0, 1000, "https://x/v.mp4")
+        os.remove(stored["path"])
+
+        assert cache.lookup("CAM1", "video", 0, 1000) is None
+        assert cache.usage()["file_count"] == 0
@@ -0,0 +1,30 @@
+"""parallel.pyのテスト"""
+
+from soracom_data_mcp.client import SoracomApiError
+from soracom_data_mcp.parallel import run_concurrently
+
+
+class TestRunConcurrently:
+    """run_concurrently関数のテスト"""
+
+    def test_results_in_input_order(self) -> None:
+        """入力順に結果が返ることを確認"""
+        assert run_concurrently(lambda x: x * 2, [3, 1, 2], max_workers=3) == [6, 2, 4]
+
+    def test_api_errors_are_returned(self) -> None:
+        """APIエラーが要素ごとの結果として返ることを確認"""
+
+        def fetch(x: int) -> int:
+            if x == 2:
+                raise SoracomApiError("Not found", 404)
+            return x
+
+        results = run_concurrently(fetch, [1, 2, 3])
+
+        assert results[0] == 1
+        assert isinstance(results[1], SoracomApiError)
+        assert results[2] == 3
+
+    def test_empty_input(self) -> None:
+        """空の入力を確認"""
+        assert run_concurrently(lambda x: x, []) == []
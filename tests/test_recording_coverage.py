@@ -0,0 +1,97 @@
+"""recording_coverage.pyのテスト"""
+
+from unittest.mock import patch
+
+from soracom_data_mcp.recording_coverage import (
+    RecordingCoverage,
+    fetch_recording_coverage,
+    get_recording_coverage,
+    merge_intervals,
+)
+
+
+class TestMergeIntervals:
+    """merge_intervals関数のテスト"""
+
+    def test_merges_overlapping_and_adjacent(self) -> None:
+        """重なる区間と隣接する区間を結合することを確認"""
+        assert merge_intervals([(50, 60), (0, 10), (10, 20), (15, 30)]) == [
+            (0, 30),
+            (50, 60),
+        ]
+
+    def test_drops_empty_intervals(self) -> None:
+        """長さ0以下の区間を除外することを確認"""
+        assert merge_intervals([(10, 10), (20, 5)]) == []
+
+
+class TestRecordingCoverage:
+    """RecordingCoverageクラスのテスト"""
+
+    def setup_method(self) -> None:
+        self.coverage = RecordingCoverage(
+            "CAM1", [(100, 200), (300, 400), (150, 250)], from_time=0, to_time=1000
+        )
+
+    def test_interval_at(self) -> None:
+        """時刻を含む録画区間の判定を確認"""
+        assert self.coverage.interval_at(100) == (100, 250)
+        assert self.coverage.interval_at(249) == (100, 250)
+        assert self.coverage.interval_at(250) is None
+        assert self.coverage.interval_at(50) is None
+        assert self.coverage.interval_at(999) is None
+
+    def test_covered_milliseconds(self) -> None:
+        """期間内の録画時間の集計を確認"""
+        assert self.coverage.covered_milliseconds(0, 1000) == 250
+        assert self.coverage.covered_milliseconds(200, 350) == 100
+        assert self.coverage.covered_milliseconds(260, 290) == 0
+        assert self.coverage.covered_milliseconds(500, 100) == 0
+
+    def test_gaps(self) -> None:
+        """録画されていない区間の一覧を確認"""
+        assert self.coverage.gaps(0, 1000) == [(0, 100), (250, 300), (400, 1000)]
+        assert self.coverage.gaps(120, 350) == [(250, 300)]
+        assert self.coverage.gaps(110, 240) == []
+
+    def test_clamps_to_fetched_range(self) -> None:
+        """取得範囲外の録画は切り詰めることを確認"""
+        coverage = RecordingCoverage("CAM1", [(0, 500)], from_time=100, to_time=200)
+        assert coverage.covered_milliseconds(0, 1000) == 100
+
+
+class TestFetchRecordingCoverage:
+    """録画期間の取得とキャッシュのテスト"""
+
+    def test_fetch_recording_coverage(self) -> None:
+        """両方のレスポンス形式と録画中の区間を扱えることを確認"""
+        with patch(
+            "soracom_data_mcp.recording_coverage.soracom_client"
+        ) as mock_client:
+            mock_client.get.return_value = {
+                "recordings": [{"from": 100, "to": 200}],
+                "records": [
+                    {"type": "recording", "startTime": 300},
+                    {"type": "event", "startTime": 150, "endTime": 160},
+                ],
+            }
+            coverage = fetch_recording_coverage("CAM1", 0, 1000)
+
+        assert coverage.gaps(0, 1000) == [(0, 100), (200, 300)]
+        assert not coverage.live
+
+    def test_cache_reused_within_range(self) -> None:
+        """キャッシュ済みの範囲内ではAPIを呼ばないことを確認"""
+        with patch(
+            "soracom_data_mcp.recording_coverage.soracom_client"
+        ) as mock_client:
+            mock_client.get.return_value = {"recordings": []}
+            get_recording_coverage("CAM1", 0, 1000)
+            get_recording_coverage("CAM1", 100, 500)
+            assert mock_client.get.call_count == 1
+
+            get_recording_coverage("CAM1", 0, 2000)
+            assert mock_client.get.call_count == 2
+
+            get_recording_coverage("CAM1", 0, 2000, refresh=True)
+            assert mock_client.get.call_count == 3
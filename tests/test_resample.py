@@ -0,0 +1,40 @@
+"""resample.pyのテスト"""
+
+from soracom_data_mcp.resample import Resampler, align_series, grid_size
+
+
+class TestResampler:
+    """Resamplerクラスのテスト"""
+
+    def test_mean(self) -> None:
+        """区間ごとの平均を返し、値のない区間はNoneにすることを確認"""
+        resampler = Resampler(0, 40, 10)
+        for timestamp, value in [(0, 1.0), (5, 3.0), (25, 4.0), (40, 9.0), (-1, 9.0)]:
+            resampler.add(timestamp, value)
+
+        assert resampler.values("mean") == [2.0, None, 4.0, None]
+
+    def test_ffill(self) -> None:
+        """区間内の最後の値を使い、値のない区間は直前の値を引き継ぐことを確認"""
+        resampler = Resampler(0, 40, 10)
+        for timestamp, value in [(15, 2.0), (11, 1.0), (35, 3.0)]:
+            resampler.add(timestamp, value)
+
+        assert resampler.values("ffill") == [None, 2.0, 2.0, 3.0]
+
+
+class TestGrid:
+    """グリッド関数のテスト"""
+
+    def test_grid_size(self) -> None:
+        """終了時刻を含まない区間数を確認"""
+        assert grid_size(0, 40, 10) == 4
+        assert grid_size(0, 41, 10) == 5
+        assert grid_size(10, 0, 10) == 0
+
+    def test_align_series(self) -> None:
+        """1行が1時刻の行列に並べ替えることを確認"""
+        assert align_series([[1.0, 2.0], [None, 3.0]], [0, 10]) == [
+            [0, 1.0, None],
+            [10, 2.0, 3.0],
+        ]
@@ -0,0 +1,128 @@
+"""resolver.pyのテスト"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+
+from soracom_data_mcp.inventory import SubscriberInventory
+from soracom_data_mcp.resolver import (
+    RESYNC_AFTER_SECONDS,
+    SubscriberNameError,
+    SubscriberResolver,
+    TagIndex,
+)
+
+
+class TestTagIndex:
+    """TagIndexクラスのテスト"""
+
+    index = TagIndex([
+        ("Tokyo-01", "1"),
+        ("tokyo-02", "2"),
+        ("osaka-01", "3"),
+        ("tokyo-01", "4"),
+    ])
+
+    def test_exact(self) -> None:
+        """大文字・小文字を区別せずに完全一致することを確認"""
+        assert self.index.search("TOKYO-01") == [
+            {"value": "Tokyo-01", "imsis": ["1", "4"]}
+        ]
+        assert self.index.search("tokyo") == []
+
+    def test_prefix(self) -> None:
+        """前方一致を値の順に返すことを確認"""
+        matches = self.index.search("tokyo", "prefix")
+        assert [match["value"] for match in matches] == ["Tokyo-01", "tokyo-02"]
+        assert len(self.index.search("tokyo", "prefix", limit=1)) == 1
+
+    def test_fuzzy(self) -> None:
+        """似ている値を返すことを確認"""
+        matches = self.index.search("osaka-1", "fuzzy")
+        assert matches[0]["value"] == "osaka-01"
+
+
+class TestSubscriberResolver:
+    """SubscriberResolverクラスのテスト"""
+
+    @staticmethod
+    def _inventory(
+        tmp_path: Path, subscribers: list[dict[str, Any]]
+    ) -> SubscriberInventory:
+        inventory = SubscriberInventory(tmp_path / "subscribers.sqlite3")
+        with patch("soracom_data_mcp.inventory.soracom_client") as mock_client:
+            mock_client.iter_pages.return_value = iter([subscribers])
+            inventory.sync()
+        return inventory
+
+    def test_resolve_imsi(self, tmp_path: Path) -> None:
+        """名前をIMSIに変換し、IMSIはそのまま返し、不明な名前はエラーにすることを確認"""
+        inventory = self._inventory(
+            tmp_path,
+            [
+                {"imsi": "440000000000001", "tags": {"name": "door"}},
+                {"imsi": "440000000000002", "tags": {"name": "dup"}},
+                {"imsi": "440000000000003", "tags": {"name": "dup"}},
+            ],
+        )
+        resolver = SubscriberResolver(inventory)
+
+        assert resolver.resolve_imsi("door") == "440000000000001"
+        assert resolver.resolve_imsi("440000000000009") == "440000000000009"
+        with pytest.raises(SubscriberNameError, match="見つかりません"):
+            resolver.resolve_imsi("unknown")
+        with pytest.raises(SubscriberNameError, match="440000000000003"):
+            resolver.resolve_imsi("dup")
+
+    def test_index_rebuilt_after_sync(self, tmp_path: Path) -> None:
+        """インベントリの同期後に索引を作り直すことを確認"""
+        inventory = self._inventory(tmp_path, [{"imsi": "1", "tags": {"name": "a"}}])
+        resolver = SubscriberResolver(inventory)
+        assert resolver.search("a")[0]["imsis"] == ["1"]
+
+        with patch("soracom_data_mcp.inventory.soracom_client") as mock_client:
+            mock_client.iter_pages.return_value = iter([
+                [{"imsi": "1", "lastModifiedAt": 2, "tags": {"name": "b"}}]
+            ])
+            inventory.sync()
+
+        assert resolver.search("a") == []
+        assert resolver.search("b")[0]["imsis"] == ["1"]
+
+    def test_resync_on_miss(self, tmp_path: Path) -> None:
+        """名前が見つからず、インベントリが古い場合だけ同期し直すことを確認"""
+        inventory = self._inventory(tmp_path, [{"imsi": "1", "tags": {"name": "a"}}])
+        resolver = SubscriberResolver(inventory)
+        later = time.time() + RESYNC_AFTER_SECONDS + 1
+
+        with patch("soracom_data_mcp.inventory.soracom_client") as mock_client:
+            mock_client.iter_pages.return_value = iter([
+                [{"imsi": "2", "tags": {"name": "new"}}]
+            ])
+            with pytest.raises(SubscriberNameError):
+                resolver.resolve_imsi("new")
+            mock_client.iter_pages.assert_not_called()
+
+            with patch("soracom_data_mcp.inventory.time.time", return_value=later):
+                assert resolver.resolve_imsi("new") == "2"
+
+    def test_cold_sync_once(self, tmp_path: Path) -> None:
+        """未作成のインベントリを並行して引いても同期は1回だけであることを確認"""
+        inventory = SubscriberInventory(tmp_path / "subscribers.sqlite3")
+        resolver = SubscriberResolver(inventory)
+
+        def pages(*args: Any, **kwargs: Any) -> Any:
+            time.sleep(0.05)
+            return iter([[{"imsi": "1", "tags": {"name": "a"}}]])
+
+        with patch("soracom_data_mcp.inventory.soracom_client") as mock_client:
+            mock_client.iter_pages.side_effect = pages
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                results = list(executor.map(resolver.resolve_imsi, ["a"] * 4))
+
+        assert results == ["1"] * 4
+        assert mock_client.iter_pages.call_count == 1
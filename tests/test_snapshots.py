@@ -0,0 +1,45 @@
+"""snapshots.pyのテスト"""
+
+from pathlib import Path
+
+from soracom_data_mcp.snapshots import SnapshotStore, diff_snapshots
+
+
+class TestDiffSnapshots:
+    """diff_snapshots関数のテスト"""
+
+    def test_diff(self) -> None:
+        """追加・削除・変更を検出することを確認"""
+        previous = {"a": {"x": 1, "y": 2}, "b": {"x": 1}, "c": {"x": 1}}
+        current = {"a": {"x": 1, "y": 3}, "c": {"x": 1}, "d": {"x": 2}}
+
+        assert diff_snapshots(previous, current) == {
+            "added": ["d"],
+            "removed": ["b"],
+            "changed": {"a": {"y": [2, 3]}},
+        }
+
+
+class TestSnapshotStore:
+    """SnapshotStoreクラスのテスト"""
+
+    def test_replace_returns_previous(self, tmp_path: Path) -> None:
+        """保存時に前回のスナップショットを返すことを確認"""
+        store = SnapshotStore(tmp_path / "snapshots.sqlite3")
+
+        previous, taken_at = store.replace("devices", {"a": {"connected": True}})
+        assert previous == {}
+        assert taken_at is None
+
+        previous, taken_at = store.replace("devices", {"b": {"connected": False}})
+        assert previous == {"a": {"connected": True}}
+        assert taken_at is not None
+
+    def test_kinds_are_independent(self, tmp_path: Path) -> None:
+        """種類ごとに別々に保存されることを確認"""
+        path = tmp_path / "snapshots.sqlite3"
+        SnapshotStore(path).replace("devices", {"a": {"v": 1}})
+
+        store = SnapshotStore(path)
+        assert store.replace("subscribers", {})[0] == {}
+        assert store.replace("devices", {})[0] == {"a": {"v": 1}}
@@ -0,0 +1,71 @@
+"""soracam_clips.pyのテスト"""
+
+from soracom_data_mcp.recording_coverage import RecordingCoverage
+from soracom_data_mcp.soracam_clips import (
+    merge_event_windows,
+    plan_clips,
+    split_interval,
+)
+
+
+class TestMergeEventWindows:
+    """merge_event_windows関数のテスト"""
+
+    def test_merges_overlapping_windows(self) -> None:
+        """前後を広げて重なるイベントが1つの区間になることを確認"""
+        windows = merge_event_windows([1000, 100, 150, 400], 50, 100)
+        assert windows == [(50, 250), (350, 500), (950, 1100)]
+
+    def test_merge_gap(self) -> None:
+        """merge_gap 以内の隙間も結合することを確認"""
+        windows = merge_event_windows([100, 400], 50, 100, merge_gap=150)
+        assert windows == [(50, 500)]
+
+
+class TestSplitInterval:
+    """split_interval関数のテスト"""
+
+    def test_split_evenly(self) -> None:
+        """最大長以下の等しい長さに分割することを確認"""
+        assert split_interval((0, 250), 100) == [(0, 83), (83, 166), (166, 250)]
+
+    def test_short_interval_unchanged(self) -> None:
+        """最大長以下の区間は分割しないことを確認"""
+        assert split_interval((10, 60), 100) == [(10, 60)]
+
+    def test_empty_interval(self) -> None:
+        """長さ0の区間はクリップにしないことを確認"""
+        assert split_interval((10, 10), 100) == []
+        assert plan_clips([100], 0, 0)["clips"] == []
+
+
+class TestPlanClips:
+    """plan_clips関数のテスト"""
+
+    def test_without_coverage(self) -> None:
+        """録画カバレッジなしの計画を確認"""
+        result = plan_clips([100, 150, 1000], 50, 100)
+        assert result["clips"] == [
+            {"from": 50, "to": 250, "event_count": 2},
+            {"from": 950, "to": 1100, "event_count": 1},
+        ]
+        assert result["uncovered_events"] == 0
+
+    def test_clamps_to_coverage(self) -> None:
+        """録画されている範囲に切り詰め、録画外のイベントを数えることを確認"""
+        coverage = RecordingCoverage("CAM1", [(0, 200)], from_time=0, to_time=2000)
+        result = plan_clips([100, 150, 1000], 50, 100, coverage=coverage)
+        assert result["clips"] == [{"from": 50, "to": 200, "event_count": 2}]
+        assert result["uncovered_events"] == 1
+
+    def test_split_long_window(self) -> None:
+        """最大長を超える区間を分割し、イベントを重複して数えないことを確認"""
+        result = plan_clips(
+            [0, 100, 200, 300], 0, 100, max_duration=150
+        )
+        assert [(c["from"], c["to"]) for c in result["clips"]] == [
+            (0, 133),
+            (133, 266),
+            (266, 400),
+        ]
+        assert sum(c["event_count"] for c in result["clips"]) == 4
@@ -0,0 +1,109 @@
+"""soracam_events.pyのテスト"""
+
+from typing import Any
+from unittest.mock import MagicMock, patch
+
+from soracom_data_mcp.client import SoracomApiError
+from soracom_data_mcp.soracam_events import list_devices, merge_device_events
+
+
+def _event(device_id: str, time: int) -> dict[str, Any]:
+    return {
+        "eventId": f"{device_id}-{time}",
+        "deviceId": device_id,
+        "eventType": "motion" if time % 2 else "person",
+        "time": time,
+    }
+
+
+def _fake_pages(pages: dict[str, list[list[int]]]) -> MagicMock:
+    """デバイスごとのページ（時刻のリスト）を返すget_pageのモック"""
+
+    def get_page(path: str, params: dict[str, Any]) -> tuple[list[Any], str | None]:
+        device_id = path.split("/")[3]
+        if device_id not in pages:
+            raise SoracomApiError("Not found", 404)
+        index = int(params.get("last_evaluated_key", 0))
+        device_pages = pages[device_id]
+        next_key = str(index + 1) if index + 1 < len(device_pages) else None
+        return [_event(device_id, t) for t in device_pages[index]], next_key
+
+    return MagicMock(side_effect=get_page)
+
+
+class TestMergeDeviceEvents:
+    """merge_device_events関数のテスト"""
+
+    def test_merge_descending(self) -> None:
+        """複数デバイスのイベントが新しい順にマージされることを確認"""
+        with patch("soracom_data_mcp.soracam_events.soracom_client") as mock_client:
+            mock_client.get_page = _fake_pages({
+                "A": [[90, 70], [50, 10]],
+                "B": [[80, 60], [40, 20]],
+            })
+            result = merge_device_events(["A", "B"], None, None, limit=10)
+
+        times = [event["timestamp"] for event in result["events"]]
+        assert times == [90, 80, 70, 60, 50, 40, 20, 10]
+        assert result["next"] is None
+        assert result["errors"] == []
+
+    def test_fetches_next_pages_lazily(self) -> None:
+        """limitに達したら不要な次ページを取得しないことを確認"""
+        with patch("soracom_data_mcp.soracam_events.soracom_client") as mock_client:
+            mock_client.get_page = _fake_pages({
+                "A": [[90, 70], [50, 10]],
+                "B": [[80, 60], [40, 20]],
+            })
+            result = merge_device_events(["A", "B"], None, None, limit=3)
+
+        assert [e["timestamp"] for e in result["events"]] == [90, 80, 70]
+        assert result["next"] == {"to_time": 69}
+        # 先頭ページ2回 + Aの2ページ目のみ
+        assert mock_client.get_page.call_count == 3
+
+    def test_keeps_same_timestamp_events(self) -> None:
+        """同時刻のイベントがlimitで分断されないことを確認"""
+        with patch("soracom_data_mcp.soracam_events.soracom_client") as mock_client:
+            mock_client.get_page = _fake_pages({"A": [[50, 30]], "B": [[50, 10]]})
+            result = merge_device_events(
+                ["A", "B"], None, None, sort="desc", limit=1
+            )
+
+        assert [e["timestamp"] for e in result["events"]] == [50, 50]
+        assert result["next"] == {"to_time": 49}
+
+    def test_ascending_with_event_type(self) -> None:
+        """古い順・イベント種別フィルタを確認"""
+        with patch("soracom_data_mcp.soracam_events.soracom_client") as mock_client:
+            mock_client.get_page = _fake_pages({"A": [[1, 2, 3]], "B": [[4, 5]]})
+            result = merge_device_events(
+                ["A", "B"], 0, 10, sort="asc", event_type="motion"
+            )
+
+        assert [e["timestamp"] for e in result["events"]] == [1, 3, 5]
+        params = mock_client.get_page.call_args[1]["params"]
+        assert params["from"] == 0
+        assert params["to"] == 10
+        assert params["sort"] == "asc"
+
+    def test_device_errors_are_reported(self) -> None:
+        """取得に失敗したデバイスがエラーとして報告されることを確認"""
+        with patch("soracom_data_mcp.soracam_events.soracom_client") as mock_client:
+            mock_client.get_page = _fake_pages({"A": [[3, 1]]})
+            result = merge_device_events(["A", "MISSING"], None, None)
+
+        assert len(result["events"]) == 2
+        assert result["errors"][0]["device_id"] == "MISSING"
+        assert "404" in result["errors"][0]["error"]
+
+    def test_list_devices(self) -> None:
+        """デバイス一覧の全ページ取得を確認"""
+        with patch("soracom_data_mcp.soracam_events.soracom_client") as mock_client:
+            mock_client.iter_pages.return_value = iter([
+                [{"deviceId": "A"}],
+                [{"deviceId": "B"}],
+            ])
+            devices = list_devices()
+
+        assert [device["deviceId"] for device in devices] == ["A", "B"]
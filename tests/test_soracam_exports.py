@@ -0,0 +1,212 @@
+"""soracam_exports.pyのテスト"""
+
+import threading
+import time
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from soracom_data_mcp.client import SoracomApiError
+from soracom_data_mcp.soracam_exports import (
+    PER_DEVICE_EXPORT_CONCURRENCY,
+    POLL_MAX_INTERVAL,
+    export_summary,
+    export_with_retry,
+    is_finished,
+    run_export_jobs,
+    wait_for_export,
+)
+
+
+def _export(status: str, url: str | None = None) -> dict[str, Any]:
+    return {"exportId": "exp-1", "status": status, "url": url}
+
+
+class TestExportSummary:
+    """export_summary・is_finished関数のテスト"""
+
+    def test_export_summary(self) -> None:
+        """レスポンスの共通形式への変換を確認"""
+        summary = export_summary(_export("processing"))
+        assert summary["export_id"] == "exp-1"
+        assert summary["status"] == "processing"
+        assert summary["url"] is None
+
+    def test_is_finished(self) -> None:
+        """終了状態の判定を確認"""
+        assert is_finished({"status": "completed"})
+        assert is_finished({"status": "limitExceeded"})
+        assert not is_finished({"status": "processing"})
+        assert is_finished({"status": None, "url": "https://example.com/img.jpg"})
+
+
+class TestWaitForExport:
+    """wait_for_export関数のテスト"""
+
+    async def test_polls_until_completed(self) -> None:
+        """完了までポーリングし、間隔が伸びることを確認"""
+        with (
+            patch("soracom_data_mcp.soracam_exports.soracom_client") as mock_client,
+            patch(
+                "soracom_data_mcp.soracam_exports.asyncio.sleep", new=AsyncMock()
+            ) as mock_sleep,
+        ):
+            mock_client.get.side_effect = [
+                _export("processing"),
+                _export("processing"),
+                _export("completed", "https://example.com/v.mp4"),
+            ]
+            progress = AsyncMock()
+
+            result = await wait_for_export(
+                "DEV1", export_summary(_export("initializing")), 60, progress
+            )
+
+        assert result["status"] == "completed"
+        assert result["url"] == "https://example.com/v.mp4"
+        assert result["timed_out"] is False
+        assert result["polls"] == 3
+        assert progress.await_count == 3
+        mock_client.get.assert_called_with(
+            "/sora_cam/devices/DEV1/videos/exports/exp-1"
+        )
+        intervals = [call.args[0] for call in mock_sleep.await_args_list]
+        assert intervals == sorted(intervals)
+        assert intervals[0] < intervals[-1] <= POLL_MAX_INTERVAL
+
+    async def test_already_finished(self) -> None:
+        """開始時点で完了していればポーリングしないことを確認"""
+        with patch("soracom_data_mcp.soracam_exports.soracom_client") as mock_client:
+            result = await wait_for_export(
+                "DEV1", export_summary(_export("completed", "https://x/y.jpg")), 60
+            )
+
+        assert result["polls"] == 0
+        mock_client.get.assert_not_called()
+
+    async def test_timeout(self) -> None:
+        """タイムアウト時に timed_out が立つことを確認"""
+        with patch("soracom_data_mcp.soracam_exports.soracom_client") as mock_client:
+            result = await wait_for_export(
+                "DEV1", export_summary(_export("processing")), 0
+            )
+
+        assert result["timed_out"] is True
+        assert result["status"] == "processing"
+        mock_client.get.assert_not_called()
+
+    async def test_missing_export_id(self) -> None:
+        """エクスポートIDがない場合はエラーになることを確認"""
+        with pytest.raises(SoracomApiError):
+            await wait_for_export("DEV1", export_summary({"status": "processing"}), 60)
+
+
+class TestRunExportJobs:
+    """export_with_retry・run_export_jobs関数のテスト"""
+
+    async def test_retries_when_limit_exceeded(self) -> None:
+        """上限超過時に再試行することを確認"""
+        start = MagicMock(
+            side_effect=[
+                SoracomApiError("Too many exports", 429),
+                export_summary(_export("completed", "https://x/1.jpg")),
+            ]
+        )
+        with patch("soracom_data_mcp.soracam_exports.asyncio.sleep", new=AsyncMock()):
+            result = await export_with_retry("DEV1", start, time.monotonic() + 60)
+
+        assert result["url"] == "https://x/1.jpg"
+        assert start.call_count == 2
+
+    async def test_non_limit_error_is_raised(self) -> None:
+        """上限超過以外のエラーは再試行しないことを確認"""
+        start = MagicMock(side_effect=SoracomApiError("Not found", 404))
+        with pytest.raises(SoracomApiError):
+            await export_with_retry("DEV1", start, time.monotonic() + 60)
+        assert start.call_count == 1
+
+    async def test_skips_start_after_deadline(self) -> None:
+        """期限切れの場合はエクスポートを開始しないことを確認"""
+        start = MagicMock()
+
+        result = await export_with_retry("DEV1", start, time.monotonic() - 1)
+
+        assert result["timed_out"] is True
+        assert result["skipped"] is True
+        start.assert_not_called()
+
+    async def test_concurrency_limits(self) -> None:
+        """全体の同時実行数と同一デバイスの同時実行数の上限を確認"""
+        running: list[str] = []
+        peak = {"total": 0, "per_device": 0}
+        lock = threading.Lock()
+
+        def make_start(device_id: str) -> Any:
+            def start() -> dict[str, Any]:
+                with lock:
+                    running.append(device_id)
+                    peak["total"] = max(peak["total"], len(running))
+                    peak["per_device"] = max(
+                        peak["per_device"], running.count(device_id)
+                    )
+                time.sleep(0.01)
+                with lock:
+                    running.remove(device_id)
+                return export_summary(_export("completed", f"https://x/{device_id}"))
+
+            return start
+
+        jobs = {
+            (device_id, i): (device_id, make_start(device_id))
+            for device_id in ["A", "B", "C"]
+            for i in range(3)
+        }
+        finished: list[Any] = []
+
+        async def on_result(key: Any, result: dict[str, Any]) -> None:
+            finished.append(key)
+
+        results = await run_export_jobs(
+            jobs, timeout_seconds=60, max_concurrency=4, on_result=on_result
+        )
+
+        assert len(results) == 9
+        assert results[("B", 1)]["url"] == "https://x/B"
+        assert len(finished) == 9
+        assert peak["total"] <= 4
+        assert peak["per_device"] <= PER_DEVICE_EXPORT_CONCURRENCY
+
+    async def test_per_device_limit(self) -> None:
+        """同一デバイスでも PER_DEVICE_EXPORT_CONCURRENCY 件まで同時に実行することを確認"""
+        running = 0
+        peak = 0
+        lock = threading.Lock()
+
+        def start() -> dict[str, Any]:
+            nonlocal running, peak
+            with lock:
+                running += 1
+                peak = max(peak, running)
+            time.sleep(0.02)
+            with lock:
+                running -= 1
+            return export_summary(_export("completed", "https://x/a"))
+
+        jobs = {i: ("A", start) for i in range(6)}
+
+        await run_export_jobs(jobs, timeout_seconds=60, max_concurrency=6)
+
+        assert peak == PER_DEVICE_EXPORT_CONCURRENCY
+
+    async def test_job_errors_are_collected(self) -> None:
+        """ジョブのエラーが結果に含まれることを確認"""
+        jobs = {
+            "ok": ("A", lambda: export_summary(_export("completed", "https://x/a"))),
+            "ng": ("B", MagicMock(side_effect=SoracomApiError("Not found", 404))),
+        }
+
+        results = await run_export_jobs(jobs, timeout_seconds=60)
+
+        assert results["ok"]["url"] == "https://x/a"
+        assert "404" in results["ng"]["error"]
@@ -0,0 +1,39 @@
+"""stats_cache.pyのテスト"""
+
+import time
+from pathlib import Path
+from unittest.mock import MagicMock
+
+from soracom_data_mcp.stats_cache import STATS_SETTLE_SECONDS, StatsCache
+
+
+class TestStatsCache:
+    """StatsCacheクラスのテスト"""
+
+    def test_closed_period_cached(self, tmp_path: Path) -> None:
+        """終了した期間の統計は保存し、再取得しないことを確認"""
+        cache = StatsCache(tmp_path / "stats.sqlite3")
+        fetch = MagicMock(return_value=[{"date": "20240101", "count": 1}])
+
+        assert cache.fetch("harvest", "1", 0, 100, "day", fetch) == (
+            [{"date": "20240101", "count": 1}],
+            False,
+        )
+        stats, cached = StatsCache(tmp_path / "stats.sqlite3").fetch(
+            "harvest", "1", 0, 100, "day", fetch
+        )
+
+        assert cached is True
+        assert stats == [{"date": "20240101", "count": 1}]
+        assert fetch.call_count == 1
+
+    def test_open_period_not_cached(self, tmp_path: Path) -> None:
+        """確定していない期間の統計は保存しないことを確認"""
+        cache = StatsCache(tmp_path / "stats.sqlite3")
+        fetch = MagicMock(return_value=[])
+        to_time = int(time.time()) - STATS_SETTLE_SECONDS + 3600
+
+        cache.fetch("air", "1", 0, to_time, "day", fetch)
+        cache.fetch("air", "1", 0, to_time, "day", fetch)
+
+        assert fetch.call_count == 2
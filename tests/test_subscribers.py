@@ -0,0 +1,33 @@
+"""subscribers.pyのテスト"""
+
+from unittest.mock import patch
+
+from soracom_data_mcp.subscribers import list_all_subscribers
+
+
+class TestListAllSubscribers:
+    """list_all_subscribers関数のテスト"""
+
+    def test_all_pages(self) -> None:
+        """全ページのSIMを返すことを確認"""
+        with patch("soracom_data_mcp.subscribers.soracom_client") as mock_client:
+            mock_client.iter_pages.return_value = iter([
+                [{"imsi": "1"}, {"imsi": "2"}],
+                [{"imsi": "3"}, {}],
+            ])
+            subscribers = list_all_subscribers(status_filter="active")
+
+        assert [sub["imsi"] for sub in subscribers] == ["1", "2", "3"]
+        args, kwargs = mock_client.iter_pages.call_args
+        assert args[0] == "/subscribers"
+        assert kwargs["params"] == {"limit": 100, "status_filter": "active"}
+
+    def test_group(self) -> None:
+        """グループ指定時はグループ内のSIM一覧を使うことを確認"""
+        with patch("soracom_data_mcp.subscribers.soracom_client") as mock_client:
+            mock_client.iter_pages.return_value = iter([])
+            list_all_subscribers(group_id="g1", tag_name="area", tag_value="tokyo")
+
+        args, kwargs = mock_client.iter_pages.call_args
+        assert args[0] == "/groups/g1/subscribers"
+        assert kwargs["params"]["tag_value_match_mode"] == "exact"
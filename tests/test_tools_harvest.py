@@ -1,5 +1,6 @@
 """tools/harvest.pyのテスト"""
 
+import csv
 from typing import Any
 from unittest.mock import patch
 
@@ -91,7 +92,7 @@ class TestHarvestDataTools:
             register_harvest_tools(mcp)
 
             tool = mcp._tool_manager._tools["get_harvest_data"]
-            result = tool.fn(imsi="invalid")
+            result = tool.fn(imsi="440000000000999")
 
             assert "error" in result
             assert "404" in result["error"]
@@ -206,3 +207,606 @@ class TestHarvestFilesTools:
                 "/files/private/test.json", params={"redirect": "false"}
             )
 
+
+class TestHarvestFilePreviewTools:
+    """Harvest Filesプレビューツールのテスト"""
+
+    def test_preview_head_text(self) -> None:
+        """先頭をテキストで取得するケース"""
+        with patch(
+            "soracom_data_mcp.tools.harvest.soracom_client"
+        ) as mock_client:
+            mock_client.get.return_value = {"url": "https://s3.example.com/log"}
+            mock_client.fetch_byte_range.return_value = (b"line1\nline2\n", 2048)
+            mcp = FastMCP("test")
+            register_harvest_tools(mcp)
+
+            tool = mcp._tool_manager._tools["preview_harvest_file"]
+            result = tool.fn(scope="private", path="/logs/app.log", length=12)
+
+            assert result["content"] == "line1\nline2\n"
+            assert result["offset"] == 0
+            assert result["total_size"] == 2048
+            mock_client.get.assert_called_with(
+                "/files/private/logs/app.log", params={"redirect": "false"}
+            )
+            mock_client.fetch_byte_range.assert_called_with(
+                "https://s3.example.com/log", 0, 12
+            )
+
+    def test_preview_tail_hex(self) -> None:
+        """末尾を16進数で取得するケース"""
+        with patch(
+            "soracom_data_mcp.tools.harvest.soracom_client"
+        ) as mock_client:
+            mock_client.get.return_value = {"url": "https://s3.example.com/bin"}
+            mock_client.fetch_byte_range.return_value = (b"\x00\xff", 10)
+            mcp = FastMCP("test")
+            register_harvest_tools(mcp)
+
+            tool = mcp._tool_manager._tools["preview_harvest_file"]
+            result = tool.fn(
+                scope="private", path="bin", position="tail", length=2, encoding="hex"
+            )
+
+            assert result["content"] == "00ff"
+            assert result["offset"] == 8
+            mock_client.fetch_byte_range.assert_called_with(
+                "https://s3.example.com/bin", None, 2
+            )
+
+    def test_preview_drops_split_multibyte_chars(self) -> None:
+        """範囲境界で分断されたマルチバイト文字が除外されるケース"""
+        with patch(
+            "soracom_data_mcp.tools.harvest.soracom_client"
+        ) as mock_client:
+            encoded = "あいう".encode()
+            mock_client.get.return_value = {"url": "https://s3.example.com/t"}
+            mock_client.fetch_byte_range.return_value = (encoded[1:8], 9)
+            mcp = FastMCP("test")
+            register_harvest_tools(mcp)
+
+            tool = mcp._tool_manager._tools["preview_harvest_file"]
+            result = tool.fn(scope="private", path="t", position="tail", length=7)
+
+            assert result["content"] == "い"
+
+    def test_preview_length_capped(self) -> None:
+        """取得バイト数の上限確認"""
+        with patch(
+            "soracom_data_mcp.tools.harvest.soracom_client"
+        ) as mock_client:
+            mock_client.get.return_value = {"url": "https://s3.example.com/log"}
+            mock_client.fetch_byte_range.return_value = (b"", 0)
+            mcp = FastMCP("test")
+            register_harvest_tools(mcp)
+
+            tool = mcp._tool_manager._tools["preview_harvest_file"]
+            tool.fn(scope="private", path="log", length=10**9)
+
+            assert mock_client.fetch_byte_range.call_args[0][2] == 65536
+
+    def test_preview_invalid_position(self) -> None:
+        """不正なpositionのケース"""
+        with patch("soracom_data_mcp.tools.harvest.soracom_client"):
+            mcp = FastMCP("test")
+            register_harvest_tools(mcp)
+
+            tool = mcp._tool_manager._tools["preview_harvest_file"]
+            result = tool.fn(scope="private", path="log", position="middle")
+
+            assert "error" in result
+
+    def test_preview_error(self) -> None:
+        """ダウンロードURL解決失敗のケース"""
+        with patch(
+            "soracom_data_mcp.tools.harvest.soracom_client"
+        ) as mock_client:
+            mock_client.get.side_effect = SoracomApiError("Not found", 404)
+            mcp = FastMCP("test")
+            register_harvest_tools(mcp)
+
+            tool = mcp._tool_manager._tools["preview_harvest_file"]
+            result = tool.fn(scope="private", path="missing.log")
+
+            assert "404" in result["error"]
+
+
+class TestHarvestFileAggregateTools:
+    """Harvest Files集計ツールのテスト"""
+
+    def test_aggregate_csv(self) -> None:
+        """CSVのグループ集計ケース"""
+        with patch(
+            "soracom_data_mcp.tools.harvest.soracom_client"
+        ) as mock_client:
+            mock_client.get.return_value = {"url": "https://s3.example.com/d.csv"}
+            mock_client.iter_lines.return_value = iter([
+                "device,temp,status",
+                "a,10,ok",
+                "a,30,ok",
+                "b,50,ng",
+                "b,70,ok",
+            ])
+            mcp = FastMCP("test")
+            register_harvest_tools(mcp)
+
+            tool = mcp._tool_manager._tools["aggregate_harvest_file"]
+            result = tool.fn(
+                scope="private",
+                path="/batch/d.csv",
+                group_by=["device"],
+                metrics=["count", "avg:temp"],
+                filters=["status=ok"],
+            )
+
+            assert result["file_format"] == "csv"
+            assert result["rows_scanned"] == 4
+            assert result["rows_matched"] == 3
+            assert result["groups"] == [
+                {"device": "a", "count": 2, "avg:temp": 20.0},
+                {"device": "b", "count": 1, "avg:temp": 70.0},
+            ]
+            assert result["truncated"] is False
+
+    def test_aggregate_jsonl(self) -> None:
+        """JSON Linesのネストしたフィールド集計ケース"""
+        with patch(
+            "soracom_data_mcp.tools.harvest.soracom_client"
+        ) as mock_client:
+            mock_client.get.return_value = {"url": "https://s3.example.com/d.jsonl"}
+            mock_client.iter_lines.return_value = iter([
+                '{"imsi": "1", "content": {"temp": 25}}',
+                "",
+                "not-json",
+                '{"imsi": "1", "content": {"temp": 35}}',
+            ])
+            mcp = FastMCP("test")
+            register_harvest_tools(mcp)
+
+            tool = mcp._tool_manager._tools["aggregate_harvest_file"]
+            result = tool.fn(
+                scope="private",
+                path="d.jsonl",
+                group_by=["imsi"],
+                metrics=["max:content.temp"],
+            )
+
+            assert result["file_format"] == "jsonl"
+            assert result["parse_errors"] == 1
+            assert result["groups"] == [{"imsi": "1", "max:content.temp": 35.0}]
+
+    def test_aggregate_csv_quoted_newline(self) -> None:
+        """引用符で囲まれたフィールド内の改行を1行として扱うケース"""
+        with patch(
+            "soracom_data_mcp.tools.harvest.soracom_client"
+        ) as mock_client:
+            mock_client.get.return_value = {"url": "https://s3.example.com/d.csv"}
+            mock_client.iter_lines.return_value = iter([
+                "device,note\n",
+                'a,"line1\n',
+                'line2"\n',
+                "b,ok\n",
+            ])
+            mcp = FastMCP("test")
+            register_harvest_tools(mcp)
+
+            tool = mcp._tool_manager._tools["aggregate_harvest_file"]
+            result = tool.fn(scope="private", path="d.csv", group_by=["note"])
+
+            assert result["rows_scanned"] == 2
+            assert {row["note"] for row in result["groups"]} == {"line1\nline2", "ok"}
+
+    def test_aggregate_csv_error_counted(self) -> None:
+        """CSVとして解釈できない行を parse_errors に数えて続行するケース"""
+        with patch(
+            "soracom_data_mcp.tools.harvest.soracom_client"
+        ) as mock_client:
+            mock_client.get.return_value = {"url": "https://s3.example.com/d.csv"}
+            mock_client.iter_lines.return_value = iter([
+                "device,temp\n",
+                "a,10\n",
+                "b," + "x" * (csv.field_size_limit() + 1) + "\n",
+                "a,30\n",
+            ])
+            mcp = FastMCP("test")
+            register_harvest_tools(mcp)
+
+            tool = mcp._tool_manager._tools["aggregate_harvest_file"]
+            result = tool.fn(scope="private", path="d.csv", group_by=["device"])
+
+            assert result["parse_errors"] == 1
+            assert result["rows_scanned"] == 2
+            assert result["groups"] == [{"device": "a", "count": 2}]
+
+    def test_aggregate_invalid_delimiter(self) -> None:
+        """区切り文字が1文字でない場合はエラーを返すケース"""
+        with patch(
+            "soracom_data_mcp.tools.harvest.soracom_client"
+        ) as mock_client:
+            mcp = FastMCP("test")
+            register_harvest_tools(mcp)
+
+            tool = mcp._tool_manager._tools["aggregate_harvest_file"]
+            result = tool.fn(scope="private", path="d.csv", delimiter=";;")
+
+            assert "delimiter" in result["error"]
+            mock_client.iter_lines.assert_not_called()
+
+    def test_aggregate_json_array_rejected(self) -> None:
+        """JSON配列のファイルはエラーを返すケース"""
+        with patch(
+            "soracom_data_mcp.tools.harvest.soracom_client"
+        ) as mock_client:
+            mcp = FastMCP("test")
+            register_harvest_tools(mcp)
+
+            tool = mcp._tool_manager._tools["aggregate_harvest_file"]
+            result = tool.fn(scope="private", path="d.json")
+
+            assert "jsonl" in result["error"]
+            mock_client.iter_lines.assert_not_called()
+
+    def test_aggregate_max_groups(self) -> None:
+        """グループ数上限のケース"""
+        with patch(
+            "soracom_data_mcp.tools.harvest.soracom_client"
+        ) as mock_client:
+            mock_client.get.return_value = {"url": "https://s3.example.com/d.csv"}
+            mock_client.iter_lines.return_value = iter(["k", "a", "b", "c"])
+            mcp = FastMCP("test")
+            register_harvest_tools(mcp)
+
+            tool = mcp._tool_manager._tools["aggregate_harvest_file"]
+            result = tool.fn(
+                scope="private", path="d.csv", group_by=["k"], max_groups=2
+            )
+
+            assert result["group_count"] == 3
+            assert len(result["groups"]) == 2
+            assert result["truncated"] is True
+            assert result["overflow_rows"] == 0
+
+    def test_aggregate_invalid_metric(self) -> None:
+        """不正な集計指定のケース"""
+        with patch("soracom_data_mcp.tools.harvest.soracom_client"):
+            mcp = FastMCP("test")
+            register_harvest_tools(mcp)
+
+            tool = mcp._tool_manager._tools["aggregate_harvest_file"]
+            result = tool.fn(scope="private", path="d.csv", metrics=["median:temp"])
+
+            assert "error" in result
+
+    def test_aggregate_download_error(self) -> None:
+        """ダウンロードエラーのケース"""
+        with patch(
+            "soracom_data_mcp.tools.harvest.soracom_client"
+        ) as mock_client:
+            mock_client.get.return_value = {"url": "https://s3.example.com/d.csv"}
+            mock_client.iter_lines.side_effect = SoracomApiError("Forbidden", 403)
+            mcp = FastMCP("test")
+            register_harvest_tools(mcp)
+
+            tool = mcp._tool_manager._tools["aggregate_harvest_file"]
+            result = tool.fn(scope="private", path="d.csv")
+
+            assert "403" in result["error"]
+
+
+class TestHarvestFileUsageTools:
+    """Harvest Files使用量ツールのテスト"""
+
+    def test_get_harvest_file_usage(self) -> None:
+        """プレフィックス別使用量のケース"""
+        with patch(
+            "soracom_data_mcp.tools.harvest.harvest_file_index"
+        ) as mock_index:
+            mock_index.walk.return_value = {"listed": 3, "cached": 1}
+            mock_index.usage.return_value = (
+                {"size": 60, "file_count": 3},
+                {"a/": [50, 2], "b/": [10, 1]},
+            )
+            mcp = FastMCP("test")
+            register_harvest_tools(mcp)
+
+            tool = mcp._tool_manager._tools["get_harvest_file_usage"]
+            result = tool.fn(scope="private", path="/", top_n=1)
+
+            assert result["total_size"] == 60
+            assert result["prefix_count"] == 2
+            assert result["top_prefixes"] == [
+                {"prefix": "/a/", "size": 50, "file_count": 2}
+            ]
+            assert result["directories_cached"] == 1
+            mock_index.walk.assert_called_once_with(
+                "private", "/", max_age_seconds=3600
+            )
+
+    def test_get_harvest_file_usage_refresh(self) -> None:
+        """キャッシュを使わない再取得のケース"""
+        with patch(
+            "soracom_data_mcp.tools.harvest.harvest_file_index"
+        ) as mock_index:
+            mock_index.walk.return_value = {"listed": 1, "cached": 0}
+            mock_index.usage.return_value = ({"size": 0, "file_count": 0}, {})
+            mcp = FastMCP("test")
+            register_harvest_tools(mcp)
+
+            tool = mcp._tool_manager._tools["get_harvest_file_usage"]
+            tool.fn(scope="private", refresh=True)
+
+            assert mock_index.walk.call_args[1]["max_age_seconds"] == 0
+
+    def test_get_harvest_file_usage_error(self) -> None:
+        """走査中のAPIエラーのケース"""
+        with patch(
+            "soracom_data_mcp.tools.harvest.harvest_file_index"
+        ) as mock_index:
+            mock_index.walk.side_effect = SoracomApiError("Forbidden", 403)
+            mcp = FastMCP("test")
+            register_harvest_tools(mcp)
+
+            tool = mcp._tool_manager._tools["get_harvest_file_usage"]
+            result = tool.fn()
+
+            assert "403" in result["error"]
+
+
+class TestHarvestFileDownloadUrlCache:
+    """ダウンロードURLキャッシュのテスト"""
+
+    SIGNED_URL = (
+        "https://s3.example.com/f?X-Amz-Date=20300101T000000Z&X-Amz-Expires=3600"
+    )
+
+    def test_download_url_is_cached(self) -> None:
+        """有効期限内のURLがキャッシュから返されるケース"""
+        with patch(
+            "soracom_data_mcp.tools.harvest.soracom_client"
+        ) as mock_client:
+            mock_client.get.return_value = {
+                "url": self.SIGNED_URL,
+                "contentType": "application/json",
+            }
+            mcp = FastMCP("test")
+            register_harvest_tools(mcp)
+
+            tool = mcp._tool_manager._tools["get_harvest_file_download_url"]
+            first = tool.fn(scope="private", path="/a.json")
+            second = tool.fn(scope="private", path="a.json")
+
+            assert first["cached"] is False
+            assert second["cached"] is True
+            assert second["url"] == self.SIGNED_URL
+            assert second["contentType"] == "application/json"
+            assert second["expires_at"] == 1893459600.0
+            mock_client.get.assert_called_once()
+
+    def test_expired_url_is_not_cached(self) -> None:
+        """有効期限切れ間近のURLはキャッシュしないケース"""
+        with patch(
+            "soracom_data_mcp.tools.harvest.soracom_client"
+        ) as mock_client:
+            mock_client.get.return_value = {
+                "url": "https://s3.example.com/f?Expires=1000"
+            }
+            mcp = FastMCP("test")
+            register_harvest_tools(mcp)
+
+            tool = mcp._tool_manager._tools["get_harvest_file_download_url"]
+            tool.fn(scope="private", path="a.json")
+            result = tool.fn(scope="private", path="a.json")
+
+            assert result["cached"] is False
+            assert result["expires_at"] == 1000.0
+            assert mock_client.get.call_count == 2
+
+    def test_batch_download_urls(self) -> None:
+        """複数パスの一括取得ケース（重複除去・エラー混在）"""
+
+        def get(endpoint: str, params: Any = None) -> dict[str, Any]:
+            if endpoint.endswith("missing.json"):
+                raise SoracomApiError("Not found", 404)
+            return {"url": f"https://s3.example.com{endpoint}"}
+
+        with patch(
+            "soracom_data_mcp.tools.harvest.soracom_client"
+        ) as mock_client:
+            mock_client.get.side_effect = get
+            mcp = FastMCP("test")
+            register_harvest_tools(mcp)
+
+            tool = mcp._tool_manager._tools["get_harvest_file_download_urls"]
+            result = tool.fn(
+                scope="private", paths=["a.json", "missing.json", "a.json"]
+            )
+
+            assert result["count"] == 2
+            assert result["error_count"] == 1
+            assert result["urls"][0]["url"].endswith("/files/private/a.json")
+            assert "404" in result["urls"][1]["error"]
+
+            again = tool.fn(scope="private", paths=["a.json"])
+            assert again["cached_count"] == 1
+
+    def test_batch_download_urls_truncated(self) -> None:
+        """上限を超えたパスの件数を返すケース"""
+        with (
+            patch("soracom_data_mcp.tools.harvest.soracom_client") as mock_client,
+            patch("soracom_data_mcp.tools.harvest.MAX_BATCH_PATHS", 2),
+        ):
+            mock_client.get.return_value = {"url": "https://s3.example.com/f"}
+            mcp = FastMCP("test")
+            register_harvest_tools(mcp)
+
+            tool = mcp._tool_manager._tools["get_harvest_file_download_urls"]
+            result = tool.fn(scope="private", paths=["a", "b", "c", "d", "a"])
+
+            assert result["count"] == 2
+            assert result["truncated"] is True
+            assert result["dropped_count"] == 2
+
+
+class TestLatestHarvestData:
+    """get_latest_harvest_dataツールのテスト"""
+
+    def test_latest_table(self) -> None:
+        """SIMごとの最新値を表で返し、2回目はキャッシュを使うことを確認"""
+
+        def get(path: str, params: dict[str, Any]) -> list[dict[str, Any]]:
+            imsi = path.rsplit("/", 1)[1]
+            if imsi == "440000000000003":
+                raise SoracomApiError("Not found", 404)
+            if imsi == "440000000000002":
+                return []
+            return [{"time": 10, "content": '{"temp": 25, "hum": 60}'}]
+
+        with patch("soracom_data_mcp.harvest_data.soracom_client") as mock_client:
+            mock_client.get.side_effect = get
+            mcp = FastMCP("test")
+            register_harvest_tools(mcp)
+
+            tool = mcp._tool_manager._tools["get_latest_harvest_data"]
+            imsis = ["440000000000001", "440000000000002", "440000000000003"]
+            result = tool.fn(imsis=imsis, fields=["temp"])
+            again = tool.fn(imsis=imsis[:2])
+
+        assert result["columns"] == ["imsi", "time", "temp"]
+        assert result["rows"] == [["440000000000001", 10, 25]]
+        assert result["no_data"] == ["440000000000002"]
+        assert result["errors"][0]["imsi"] == "440000000000003"
+        assert again["cached_count"] == 2
+        assert again["rows"] == [["440000000000001", 10, {"temp": 25, "hum": 60}]]
+        assert mock_client.get.call_count == 3
+
+
+class TestAlignedHarvestSeries:
+    """get_aligned_harvest_seriesツールのテスト"""
+
+    def test_aligned_matrix(self) -> None:
+        """複数SIMの値を共通の時間グリッドの行列で返すことを確認"""
+        data = {
+            "440000000000001": [
+                {"time": 0, "content": {"temp": 10}},
+                {"time": 30_000, "content": {"temp": 20}},
+                {"time": 60_000, "content": {"temp": 30}},
+            ],
+            "440000000000002": [
+                {"time": 90_000, "content": '{"temp": 5}'},
+                {"time": 95_000, "content": {"temp": "n/a"}},
+            ],
+        }
+
+        def iter_pages(path: str, params: dict[str, Any]) -> Any:
+            return iter([data[path.rsplit("/", 1)[1]]])
+
+        with patch("soracom_data_mcp.harvest_data.soracom_client") as mock_client:
+            mock_client.iter_pages.side_effect = iter_pages
+            mcp = FastMCP("test")
+            register_harvest_tools(mcp)
+
+            tool = mcp._tool_manager._tools["get_aligned_harvest_series"]
+            result = tool.fn(
+                imsis=list(data),
+                field="temp",
+                from_time=0,
+                to_time=120_000,
+                step_seconds=60,
+            )
+
+        assert result["columns"] == ["time", *data]
+        assert result["rows"] == [[0, 15.0, None], [60_000, 30.0, 5.0]]
+        assert result["point_counts"] == {"440000000000001": 3, "440000000000002": 1}
+
+    def test_too_many_points(self) -> None:
+        """区間数が上限を超える場合はエラーを返すことを確認"""
+        mcp = FastMCP("test")
+        register_harvest_tools(mcp)
+
+        tool = mcp._tool_manager._tools["get_aligned_harvest_series"]
+        result = tool.fn(
+            imsis=["440000000000001"],
+            field="temp",
+            from_time=0,
+            to_time=86_400_000,
+            step_seconds=1,
+        )
+
+        assert "error" in result
+
+
+class TestHarvestLocationTools:
+    """位置情報ツールのテスト"""
+
+    def test_sync_and_find(self) -> None:
+        """同期した位置情報を半径で検索し、SIMごとの件数を返すことを確認"""
+        pages = {
+            "440000000000001": [
+                {"time": 10, "content": {"lat": 35.6812, "lon": 139.7671}},
+                {"time": 20, "content": {"lat": 35.6813, "lon": 139.7672}},
+            ],
+            "440000000000002": [
+                {"time": 15, "content": {"lat": 34.7025, "lon": 135.4959}},
+            ],
+        }
+
+        def iter_pages(path: str, params: dict[str, Any]) -> Any:
+            return iter([pages[path.rsplit("/", 1)[1]]])
+
+        with patch("soracom_data_mcp.harvest_data.soracom_client") as mock_client:
+            mock_client.iter_pages.side_effect = iter_pages
+            mcp = FastMCP("test")
+            register_harvest_tools(mcp)
+
+            sync = mcp._tool_manager._tools["sync_harvest_locations"]
+            synced = sync.fn(imsis=list(pages))
+
+        assert synced["new_locations"] == 3
+
+        find = mcp._tool_manager._tools["find_harvest_locations_local"]
+        result = find.fn(center_lat=35.68, center_lon=139.767, radius_meters=1000)
+        assert result["count"] == 2
+        assert result["sims"] == {
+            "440000000000001": {"count": 2, "first_time": 10, "last_time": 20}
+        }
+        assert find.fn(bbox=[34.0, 135.0, 35.0, 136.0], limit=1)["count"] == 1
+        assert "error" in find.fn(bbox=[35.0, 135.0, 34.0, 136.0])
+        assert "error" in find.fn(center_lat=35.0)
+
+
+class TestHarvestDataFilters:
+    """get_harvest_dataのフィルタのテスト"""
+
+    def test_filters(self) -> None:
+        """条件に合うレコードだけを返すことを確認"""
+        with patch("soracom_data_mcp.harvest_data.soracom_client") as mock_client:
+            mock_client.iter_pages.return_value = iter([[
+                {"time": 2, "content": {"temp": 31, "door": "open"}},
+                {"time": 1, "content": {"temp": 31, "door": "closed"}},
+            ]])
+            mcp = FastMCP("test")
+            register_harvest_tools(mcp)
+
+            tool = mcp._tool_manager._tools["get_harvest_data"]
+            result = tool.fn(
+                imsi="440000000000001",
+                from_time=0,
+                filters=["content.temp > 30", "content.door = open"],
+            )
+
+        assert result["count"] == 1
+        assert result["data"][0]["time"] == 2
+        assert result["scanned"] == 2
+        params = mock_client.iter_pages.call_args[1]["params"]
+        assert params == {"sort": "desc", "limit": 1000, "from": 0}
+
+    def test_invalid_filter(self) -> None:
+        """解釈できないフィルタ式はエラーを返すことを確認"""
+        mcp = FastMCP("test")
+        register_harvest_tools(mcp)
+
+        tool = mcp._tool_manager._tools["get_harvest_data"]
+        result = tool.fn(imsi="440000000000001", filters=["content.temp"])
+
+        assert "error" in result
@@ -1,7 +1,9 @@
 """tools/soracam.pyのテスト"""
 
+import time
+from pathlib import Path
 from typing import Any
-from unittest.mock import patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 from fastmcp import FastMCP
 
@@ -282,3 +284,1051 @@ class TestSoracamRecordingTools:
             assert result["url"] == "https://stream.example.com/live"
             assert result["expires_at"] == 1609462800000
 
+
+class TestSoracamExportWaitTools:
+    """エクスポート完了待ちツールのテスト"""
+
+    async def test_export_video_and_wait(self) -> None:
+        """動画エクスポートの完了待ちケース"""
+        with (
+            patch("soracom_data_mcp.soracam_exports.soracom_client") as mock_client,
+            patch("soracom_data_mcp.soracam_exports.asyncio.sleep", new=AsyncMock()),
+        ):
+            mock_client.post.return_value = {
+                "exportId": "exp-1",
+                "status": "initializing",
+            }
+            mock_client.get.return_value = {
+                "exportId": "exp-1",
+                "status": "completed",
+                "url": "https://example.com/v.mp4",
+            }
+            mcp = FastMCP("test")
+            register_soracam_tools(mcp)
+
+            tool = mcp._tool_manager._tools["export_soracam_and_wait"]
+            result = await tool.fn(device_id="DEV1", from_time=1000, to_time=61000)
+
+            assert result["url"] == "https://example.com/v.mp4"
+            assert result["timed_out"] is False
+            mock_client.post.assert_called_once_with(
+                "/sora_cam/devices/DEV1/videos/exports",
+                json={"from": 1000, "to": 61000},
+            )
+
+    async def test_export_image_and_wait_reports_progress(self) -> None:
+        """静止画エクスポートで進捗通知が送られるケース"""
+        with (
+            patch("soracom_data_mcp.soracam_exports.soracom_client") as mock_client,
+            patch("soracom_data_mcp.soracam_exports.asyncio.sleep", new=AsyncMock()),
+        ):
+            mock_client.post.return_value = {
+                "exportId": "img-1",
+                "status": "processing",
+            }
+            mock_client.get.return_value = {
+                "exportId": "img-1",
+                "status": "completed",
+                "url": "https://example.com/i.jpg",
+            }
+            ctx = MagicMock()
+            ctx.report_progress = AsyncMock()
+            mcp = FastMCP("test")
+            register_soracam_tools(mcp)
+
+            tool = mcp._tool_manager._tools["export_soracam_and_wait"]
+            result = await tool.fn(
+                device_id="DEV1", export_type="image", timestamp=1000, ctx=ctx
+            )
+
+            assert result["status"] == "completed"
+            ctx.report_progress.assert_awaited()
+            mock_client.post.assert_called_once_with(
+                "/sora_cam/devices/DEV1/videos/images", json={"time": 1000}
+            )
+
+    async def test_export_and_wait_missing_params(self) -> None:
+        """必須パラメータ不足のケース"""
+        mcp = FastMCP("test")
+        register_soracam_tools(mcp)
+
+        tool = mcp._tool_manager._tools["export_soracam_and_wait"]
+        result = await tool.fn(device_id="DEV1", export_type="image")
+
+        assert "error" in result
+
+    async def test_export_and_wait_error(self) -> None:
+        """エクスポート開始エラーのケース"""
+        with patch("soracom_data_mcp.soracam_exports.soracom_client") as mock_client:
+            mock_client.post.side_effect = SoracomApiError("Limit exceeded", 429)
+            mcp = FastMCP("test")
+            register_soracam_tools(mcp)
+
+            tool = mcp._tool_manager._tools["export_soracam_and_wait"]
+            result = await tool.fn(device_id="DEV1", from_time=0, to_time=1000)
+
+            assert "429" in result["error"]
+
+
+class TestSoracamBatchImageTools:
+    """静止画一括エクスポートツールのテスト"""
+
+    async def test_batch_image_export_grid(self) -> None:
+        """デバイス×時刻の表が返り、重複が除去されるケース"""
+
+        def post(path: str, json: dict[str, Any]) -> dict[str, Any]:
+            device_id = path.split("/")[3]
+            if device_id == "BAD":
+                raise SoracomApiError("Not found", 404)
+            return {
+                "exportId": f"{device_id}-{json['time']}",
+                "status": "completed",
+                "url": f"https://example.com/{device_id}/{json['time']}.jpg",
+            }
+
+        with patch("soracom_data_mcp.soracam_exports.soracom_client") as mock_client:
+            mock_client.post.side_effect = post
+            ctx = MagicMock()
+            ctx.report_progress = AsyncMock()
+            mcp = FastMCP("test")
+            register_soracam_tools(mcp)
+
+            tool = mcp._tool_manager._tools["export_soracam_images_batch"]
+            result = await tool.fn(
+                device_ids=["CAM1", "CAM1", "BAD"],
+                timestamps=[1000, 2000, 1000],
+                ctx=ctx,
+            )
+
+            assert result["requested"] == 9
+            assert mock_client.post.call_count == 4
+            assert result["grid"]["CAM1"] == {
+                "1000": "https://example.com/CAM1/1000.jpg",
+                "2000": "https://example.com/CAM1/2000.jpg",
+            }
+            assert result["grid"]["BAD"] == {"1000": None, "2000": None}
+            assert result["exported"] == 2
+            assert len(result["failures"]) == 2
+            assert "404" in result["failures"][0]["error"]
+            assert ctx.report_progress.await_count == 4
+
+    async def test_batch_image_export_too_many(self) -> None:
+        """静止画数の上限を超えるケース"""
+        mcp = FastMCP("test")
+        register_soracam_tools(mcp)
+
+        tool = mcp._tool_manager._tools["export_soracam_images_batch"]
+        result = await tool.fn(
+            device_ids=[f"CAM{i}" for i in range(50)],
+            timestamps=list(range(50)),
+        )
+
+        assert "error" in result
+
+
+class TestSoracamTimelapseTools:
+    """タイムラプスツールのテスト"""
+
+    async def test_create_timelapse(self, tmp_path: Path) -> None:
+        """一定間隔の静止画が時刻順に保存されるケース"""
+
+        def post(path: str, json: dict[str, Any]) -> dict[str, Any]:
+            if json["time"] == 120_000:
+                return {"exportId": "e", "status": "failed"}
+            return {
+                "exportId": f"e-{json['time']}",
+                "status": "completed",
+                "url": f"https://example.com/{json['time']}.jpg?sig=1",
+            }
+
+        with (
+            patch("soracom_data_mcp.soracam_exports.soracom_client") as export_client,
+            patch("soracom_data_mcp.tools.soracam.soracom_client") as tool_client,
+        ):
+            export_client.post.side_effect = post
+            tool_client.download_file.return_value = 10
+            mcp = FastMCP("test")
+            register_soracam_tools(mcp)
+
+            tool = mcp._tool_manager._tools["create_soracam_timelapse"]
+            result = await tool.fn(
+                device_id="CAM1",
+                from_time=0,
+                to_time=180_000,
+                interval_minutes=1,
+                output_dir=str(tmp_path),
+            )
+
+            assert export_client.post.call_count == 4
+            assert result["frame_count"] == 3
+            assert [frame["timestamp"] for frame in result["frames"]] == [
+                0,
+                60_000,
+                180_000,
+            ]
+            assert result["frames"][1]["path"] == str(
+                tmp_path / "frame_00001_60000.jpg"
+            )
+            assert result["failures"] == [
+                {
+                    "timestamp": 120_000,
+                    "status": "failed",
+                    "timed_out": False,
+                    "skipped": False,
+                    "error": None,
+                }
+            ]
+
+    async def test_create_timelapse_download_error(self, tmp_path: Path) -> None:
+        """ダウンロードに失敗したフレームだけを失敗として返すケース"""
+
+        def download(url: str, destination: Path) -> int:
+            if "60000" in url:
+                raise OSError("disk full")
+            return 10
+
+        with (
+            patch("soracom_data_mcp.soracam_exports.soracom_client") as export_client,
+            patch("soracom_data_mcp.tools.soracam.soracom_client") as tool_client,
+        ):
+            export_client.post.side_effect = lambda path, json: {
+                "exportId": f"e-{json['time']}",
+                "status": "completed",
+                "url": f"https://example.com/{json['time']}.jpg",
+            }
+            tool_client.download_file.side_effect = download
+            mcp = FastMCP("test")
+            register_soracam_tools(mcp)
+
+            tool = mcp._tool_manager._tools["create_soracam_timelapse"]
+            result = await tool.fn(
+                device_id="CAM1",
+                from_time=0,
+                to_time=120_000,
+                interval_minutes=1,
+                output_dir=str(tmp_path),
+            )
+
+            assert result["frame_count"] == 2
+            assert result["failures"] == [{"timestamp": 60_000, "error": "disk full"}]
+
+    async def test_create_timelapse_too_many_frames(self) -> None:
+        """フレーム数の上限を超えるケース"""
+        mcp = FastMCP("test")
+        register_soracam_tools(mcp)
+
+        tool = mcp._tool_manager._tools["create_soracam_timelapse"]
+        result = await tool.fn(
+            device_id="CAM1", from_time=0, to_time=86_400_000, interval_minutes=0.1
+        )
+
+        assert "error" in result
+
+    async def test_create_timelapse_invalid_interval(self) -> None:
+        """不正な間隔のケース"""
+        mcp = FastMCP("test")
+        register_soracam_tools(mcp)
+
+        tool = mcp._tool_manager._tools["create_soracam_timelapse"]
+        result = await tool.fn(
+            device_id="CAM1", from_time=0, to_time=1000, interval_minutes=0
+        )
+
+        assert "error" in result
+
+
+class TestSoracamFleetEventTools:
+    """全カメライベント一覧ツールのテスト"""
+
+    def test_fleet_events_enumerates_devices(self) -> None:
+        """デバイス未指定時に全カメラを対象にするケース"""
+        with patch("soracom_data_mcp.soracam_events.soracom_client") as mock_client:
+            mock_client.iter_pages.return_value = iter([
+                [{"deviceId": "A"}, {"deviceId": "B"}],
+            ])
+            mock_client.get_page.side_effect = lambda path, params: (
+                [
+                    {
+                        "eventId": path,
+                        "deviceId": path.split("/")[3],
+                        "eventType": "motion",
+                        "time": 100 if "/A/" in path else 200,
+                    }
+                ],
+                None,
+            )
+            mcp = FastMCP("test")
+            register_soracam_tools(mcp)
+
+            tool = mcp._tool_manager._tools["list_soracam_fleet_events"]
+            result = tool.fn(from_time=0, to_time=1000)
+
+            assert result["device_count"] == 2
+            assert result["count"] == 2
+            assert [e["device_id"] for e in result["events"]] == ["B", "A"]
+
+    def test_fleet_events_device_list_error(self) -> None:
+        """デバイス一覧の取得に失敗するケース"""
+        with patch("soracom_data_mcp.soracam_events.soracom_client") as mock_client:
+            mock_client.iter_pages.side_effect = SoracomApiError("Forbidden", 403)
+            mcp = FastMCP("test")
+            register_soracam_tools(mcp)
+
+            tool = mcp._tool_manager._tools["list_soracam_fleet_events"]
+            result = tool.fn()
+
+            assert "403" in result["error"]
+
+
+class TestSoracamEventStoreTools:
+    """イベントのローカル同期・検索ツールのテスト"""
+
+    def test_sync_soracam_events(self) -> None:
+        """複数デバイスの同期ケース（エラー混在）"""
+
+        def sync(device_id: str, since: int, now: int) -> dict[str, Any]:
+            if device_id == "BAD":
+                raise SoracomApiError("Not found", 404)
+            return {"device_id": device_id, "new_events": 5}
+
+        with patch(
+            "soracom_data_mcp.tools.soracam.soracam_event_store"
+        ) as mock_store:
+            mock_store.sync.side_effect = sync
+            mcp = FastMCP("test")
+            register_soracam_tools(mcp)
+
+            tool = mcp._tool_manager._tools["sync_soracam_events"]
+            result = tool.fn(device_ids=["CAM1", "BAD"], since_hours=24)
+
+            assert result["new_events"] == 5
+            assert "404" in result["devices"][1]["error"]
+            since, now = mock_store.sync.call_args[0][1:]
+            assert now - since == 24 * 3_600_000
+
+    def test_query_soracam_events_local(self) -> None:
+        """ローカル検索ケース"""
+        with patch(
+            "soracom_data_mcp.tools.soracam.soracam_event_store"
+        ) as mock_store:
+            mock_store.query.return_value = [{"event_id": "e1"}]
+            mock_store.sync_states.return_value = {
+                "CAM1": {"synced_from": 0, "synced_to": 10},
+                "CAM2": {"synced_from": 0, "synced_to": 10},
+            }
+            mcp = FastMCP("test")
+            register_soracam_tools(mcp)
+
+            tool = mcp._tool_manager._tools["query_soracam_events_local"]
+            result = tool.fn(device_ids=["CAM1"], event_type="motion", limit=5000)
+
+            assert result["count"] == 1
+            assert list(result["synced"]) == ["CAM1"]
+            mock_store.query.assert_called_once_with(
+                ["CAM1"], None, None, "motion", "desc", 1000
+            )
+
+    def test_get_soracam_event_heatmap(self) -> None:
+        """ヒートマップケース"""
+        with patch(
+            "soracom_data_mcp.tools.soracam.soracam_event_store"
+        ) as mock_store:
+            mock_store.heatmap.return_value = {
+                "bucket_starts": [0],
+                "counts": {"CAM1": [3]},
+            }
+            mcp = FastMCP("test")
+            register_soracam_tools(mcp)
+
+            tool = mcp._tool_manager._tools["get_soracam_event_heatmap"]
+            result = tool.fn(bucket="day")
+
+            assert result["bucket"] == "day"
+            assert result["counts"] == {"CAM1": [3]}
+            assert mock_store.heatmap.call_args[1]["utc_offset_minutes"] == 540
+
+    def test_get_soracam_event_heatmap_too_many_buckets(self) -> None:
+        """時間帯の数が上限を超える場合はエラーを返すケース"""
+        with patch(
+            "soracom_data_mcp.tools.soracam.soracam_event_store"
+        ) as mock_store:
+            mock_store.heatmap.side_effect = ValueError("時間帯の数が上限を超えています")
+            mcp = FastMCP("test")
+            register_soracam_tools(mcp)
+
+            tool = mcp._tool_manager._tools["get_soracam_event_heatmap"]
+            result = tool.fn()
+
+            assert "上限" in result["error"]
+            assert mock_store.heatmap.call_args[1]["max_buckets"] == 2000
+
+    def test_get_soracam_event_heatmap_invalid_bucket(self) -> None:
+        """不正な集計単位のケース"""
+        mcp = FastMCP("test")
+        register_soracam_tools(mcp)
+
+        tool = mcp._tool_manager._tools["get_soracam_event_heatmap"]
+        result = tool.fn(bucket="week")
+
+        assert "error" in result
+
+
+class TestSoracamRecordingCoverageTools:
+    """録画カバレッジツールのテスト"""
+
+    def test_check_soracam_recording(self) -> None:
+        """録画判定ケース"""
+        with patch(
+            "soracom_data_mcp.recording_coverage.soracom_client"
+        ) as mock_client:
+            mock_client.get.return_value = {
+                "recordings": [{"from": 1609459200000, "to": 1609462800000}]
+            }
+            mcp = FastMCP("test")
+            register_soracam_tools(mcp)
+
+            tool = mcp._tool_manager._tools["check_soracam_recording"]
+            recorded = tool.fn(device_id="CAM1", timestamp=1609460000000)
+            missing = tool.fn(device_id="CAM1", timestamp=1609463000000)
+
+            assert recorded["recorded"] is True
+            assert recorded["recording"]["to"] == 1609462800000
+            assert missing["recorded"] is False
+            assert mock_client.get.call_count == 1
+
+    def test_get_soracam_recording_coverage(self) -> None:
+        """録画率と欠落区間のケース"""
+        with patch(
+            "soracom_data_mcp.recording_coverage.soracom_client"
+        ) as mock_client:
+            mock_client.get.return_value = {
+                "recordings": [
+                    {"from": 0, "to": 600_000},
+                    {"from": 660_000, "to": 1_000_000},
+                ]
+            }
+            mcp = FastMCP("test")
+            register_soracam_tools(mcp)
+
+            tool = mcp._tool_manager._tools["get_soracam_recording_coverage"]
+            result = tool.fn(device_id="CAM1", from_time=0, to_time=1_200_000)
+            filtered = tool.fn(
+                device_id="CAM1", from_time=0, to_time=1_200_000, min_gap_seconds=120
+            )
+
+            assert result["coverage_percent"] == 78.33
+            assert [(g["from"], g["to"]) for g in result["gaps"]] == [
+                (600_000, 660_000),
+                (1_000_000, 1_200_000),
+            ]
+            assert filtered["gap_count"] == 1
+
+    def test_get_soracam_recording_coverage_error(self) -> None:
+        """APIエラーケース"""
+        with patch(
+            "soracom_data_mcp.recording_coverage.soracom_client"
+        ) as mock_client:
+            mock_client.get.side_effect = SoracomApiError("Not found", 404)
+            mcp = FastMCP("test")
+            register_soracam_tools(mcp)
+
+            tool = mcp._tool_manager._tools["get_soracam_recording_coverage"]
+            result = tool.fn(device_id="CAM1", from_time=0, to_time=1000)
+
+            assert "error" in result
+
+
+class TestExportSoracamEventClips:
+    """export_soracam_event_clipsツールのテスト"""
+
+    def _events(self, *times: int) -> list[dict[str, Any]]:
+        return [
+            {"eventId": f"e{t}", "eventType": "motion", "time": t} for t in times
+        ]
+
+    async def test_merges_events_into_clips(self) -> None:
+        """近接したイベントを1つのエクスポートにまとめるケース"""
+        with (
+            patch("soracom_data_mcp.soracam_events.soracom_client") as events_client,
+            patch(
+                "soracom_data_mcp.recording_coverage.soracom_client"
+            ) as coverage_client,
+            patch("soracom_data_mcp.soracam_exports.soracom_client") as export_client,
+        ):
+            events_client.get_page.return_value = (
+                self._events(100_000, 110_000, 500_000),
+                None,
+            )
+            coverage_client.get.return_value = {
+                "recordings": [{"from": 0, "to": 1_000_000}]
+            }
+            export_client.post.return_value = {
+                "exportId": "ex1",
+                "status": "completed",
+                "url": "https://example.com/clip.mp4",
+            }
+            mcp = FastMCP("test")
+            register_soracam_tools(mcp)
+
+            tool = mcp._tool_manager._tools["export_soracam_event_clips"]
+            result = await tool.fn(
+                device_ids=["CAM1"], from_time=0, to_time=1_000_000
+            )
+
+        clips = result["devices"]["CAM1"]["clips"]
+        assert result["event_count"] == 3
+        assert result["clip_count"] == 2
+        assert result["exports_saved"] == 1
+        assert (clips[0]["from"], clips[0]["to"]) == (95_000, 125_000)
+        assert clips[0]["event_count"] == 2
+        assert clips[0]["url"] == "https://example.com/clip.mp4"
+        assert export_client.post.call_count == 2
+        assert export_client.post.call_args_list[0][1]["json"] == {
+            "from": 95_000,
+            "to": 125_000,
+        }
+
+    async def test_failed_exports_not_counted_as_saved(self) -> None:
+        """失敗したクリップは削減件数に含めないケース"""
+        with (
+            patch("soracom_data_mcp.soracam_events.soracom_client") as events_client,
+            patch(
+                "soracom_data_mcp.recording_coverage.soracom_client"
+            ) as coverage_client,
+            patch("soracom_data_mcp.soracam_exports.soracom_client") as export_client,
+        ):
+            events_client.get_page.return_value = (
+                self._events(100_000, 110_000),
+                None,
+            )
+            coverage_client.get.return_value = {
+                "recordings": [{"from": 0, "to": 1_000_000}]
+            }
+            export_client.post.return_value = {"exportId": "ex1", "status": "failed"}
+            mcp = FastMCP("test")
+            register_soracam_tools(mcp)
+
+            tool = mcp._tool_manager._tools["export_soracam_event_clips"]
+            result = await tool.fn(
+                device_ids=["CAM1"], from_time=0, to_time=1_000_000
+            )
+
+        assert result["clip_count"] == 1
+        assert result["exports_saved"] == 0
+
+    async def test_zero_padding_rejected(self) -> None:
+        """前後の秒数がどちらも0の場合はエラーを返すケース"""
+        mcp = FastMCP("test")
+        register_soracam_tools(mcp)
+
+        tool = mcp._tool_manager._tools["export_soracam_event_clips"]
+        result = await tool.fn(
+            device_ids=["CAM1"],
+            from_time=0,
+            to_time=1_000_000,
+            pad_before_seconds=0,
+            pad_after_seconds=0,
+            dry_run=True,
+        )
+
+        assert "error" in result
+
+    async def test_too_many_events_truncated(self) -> None:
+        """上限を超えたイベントの件数を返すケース"""
+        with (
+            patch("soracom_data_mcp.soracam_events.soracom_client") as events_client,
+            patch(
+                "soracom_data_mcp.recording_coverage.soracom_client"
+            ) as coverage_client,
+            patch("soracom_data_mcp.tools.soracam.MAX_CLIP_EVENTS", 2),
+        ):
+            events_client.get_page.return_value = (
+                self._events(100_000, 200_000, 300_000, 400_000),
+                None,
+            )
+            coverage_client.get.return_value = {
+                "recordings": [{"from": 0, "to": 1_000_000}]
+            }
+            mcp = FastMCP("test")
+            register_soracam_tools(mcp)
+
+            tool = mcp._tool_manager._tools["export_soracam_event_clips"]
+            result = await tool.fn(
+                device_ids=["CAM1"], from_time=0, to_time=1_000_000, dry_run=True
+            )
+
+        device_plan = result["devices"]["CAM1"]
+        assert device_plan["event_count"] == 2
+        assert device_plan["truncated"] is True
+        assert device_plan["dropped_events"] == 2
+
+    async def test_dry_run(self) -> None:
+        """dry_runではエクスポートしないケース（エラーのデバイスを含む）"""
+
+        def get_page(path: str, params: dict[str, Any]) -> Any:
+            if "BAD" in path:
+                raise SoracomApiError("Not found", 404)
+            return self._events(100_000), None
+
+        with (
+            patch("soracom_data_mcp.soracam_events.soracom_client") as events_client,
+            patch(
+                "soracom_data_mcp.recording_coverage.soracom_client"
+            ) as coverage_client,
+            patch("soracom_data_mcp.soracam_exports.soracom_client") as export_client,
+        ):
+            events_client.get_page.side_effect = get_page
+            coverage_client.get.return_value = {"recordings": []}
+            mcp = FastMCP("test")
+            register_soracam_tools(mcp)
+
+            tool = mcp._tool_manager._tools["export_soracam_event_clips"]
+            result = await tool.fn(
+                device_ids=["CAM1", "BAD"],
+                from_time=0,
+                to_time=1_000_000,
+                dry_run=True,
+            )
+
+        assert result["devices"]["CAM1"]["clips"] == []
+        assert result["devices"]["CAM1"]["uncovered_events"] == 1
+        assert result["errors"][0]["device_id"] == "BAD"
+        export_client.post.assert_not_called()
+
+
+class TestSoracamExportQueueTools:
+    """エクスポートジョブの記録と一覧ツールのテスト"""
+
+    def test_export_soracam_video_deduplicated(self) -> None:
+        """同じ範囲の未完了エクスポートを再利用するケース"""
+        with patch(
+            "soracom_data_mcp.tools.soracam.soracom_client"
+        ) as mock_client:
+            mock_client.post.return_value = {
+                "exportId": "export-456",
+                "status": "processing",
+            }
+            mcp = FastMCP("test")
+            register_soracam_tools(mcp)
+
+            tool = mcp._tool_manager._tools["export_soracam_video"]
+            first = tool.fn(device_id="CAM1", from_time=0, to_time=1000)
+            second = tool.fn(device_id="CAM1", from_time=0, to_time=1000)
+
+            assert first["deduplicated"] is False
+            assert second["deduplicated"] is True
+            assert second["export_id"] == "export-456"
+            assert second.keys() == first.keys()
+            assert mock_client.post.call_count == 1
+
+    def test_export_status_updates_job(self) -> None:
+        """状況取得でジョブが完了済みに更新されるケース"""
+        with patch(
+            "soracom_data_mcp.tools.soracam.soracom_client"
+        ) as mock_client:
+            mock_client.post.return_value = {
+                "exportId": "export-456",
+                "status": "processing",
+            }
+            mock_client.get.return_value = {
+                "exportId": "export-456",
+                "status": "completed",
+                "url": "https://download.example.com/video.mp4",
+            }
+            mcp = FastMCP("test")
+            register_soracam_tools(mcp)
+            tools = mcp._tool_manager._tools
+
+            tools["export_soracam_video"].fn(
+                device_id="CAM1", from_time=0, to_time=1000
+            )
+            tools["get_soracam_video_export_status"].fn(
+                device_id="CAM1", export_id="export-456"
+            )
+            result = tools["list_soracam_export_jobs"].fn()
+
+            assert result["count"] == 1
+            assert result["jobs"][0]["status"] == "completed"
+            assert result["jobs"][0]["url"] == "https://download.example.com/video.mp4"
+            assert tools["list_soracam_export_jobs"].fn(pending_only=True)["jobs"] == []
+
+    def test_list_soracam_export_jobs_refresh(self) -> None:
+        """refresh指定で未完了ジョブをポーリングするケース"""
+        with (
+            patch("soracom_data_mcp.tools.soracam.soracom_client") as mock_client,
+            patch(
+                "soracom_data_mcp.soracam_exports.soracom_client"
+            ) as status_client,
+        ):
+            mock_client.post.return_value = {
+                "exportId": "export-456",
+                "status": "processing",
+            }
+            status_client.get.return_value = {
+                "exportId": "export-456",
+                "status": "completed",
+            }
+            mcp = FastMCP("test")
+            register_soracam_tools(mcp)
+            tools = mcp._tool_manager._tools
+
+            tools["export_soracam_video"].fn(
+                device_id="CAM1", from_time=0, to_time=1000
+            )
+            result = tools["list_soracam_export_jobs"].fn(refresh=True)
+
+            assert result["polled"] == 1
+            assert result["jobs"][0]["status"] == "completed"
+
+
+class TestSoracamMediaCacheTools:
+    """エクスポートしたメディアのローカル保存のテスト"""
+
+    def test_export_soracam_image_cached(self) -> None:
+        """2回目は保存済みの静止画を返すケース"""
+        with patch(
+            "soracom_data_mcp.tools.soracam.soracom_client"
+        ) as mock_client:
+            mock_client.post.return_value = {
+                "exportId": "export-123",
+                "status": "completed",
+                "url": "https://download.example.com/image.jpg",
+            }
+            mcp = FastMCP("test")
+            register_soracam_tools(mcp)
+
+            tool = mcp._tool_manager._tools["export_soracam_image"]
+            first = tool.fn(device_id="CAM1", timestamp=1000)
+            second = tool.fn(device_id="CAM1", timestamp=1000)
+            uncached = tool.fn(device_id="CAM1", timestamp=1000, use_cache=False)
+
+            assert first["cached"] is False
+            assert Path(first["path"]).exists()
+            assert second["cached"] is True
+            assert second["path"] == first["path"]
+            assert "cached" not in uncached
+            assert mock_client.post.call_count == 2
+
+    def test_export_soracam_image_processing_not_stored(self) -> None:
+        """URLがまだない静止画は保存しないケース"""
+        with patch(
+            "soracom_data_mcp.tools.soracam.soracom_client"
+        ) as mock_client:
+            mock_client.post.return_value = {
+                "exportId": "export-123",
+                "status": "processing",
+            }
+            mcp = FastMCP("test")
+            register_soracam_tools(mcp)
+
+            tool = mcp._tool_manager._tools["export_soracam_image"]
+            result = tool.fn(device_id="CAM1", timestamp=1000)
+
+            assert "path" not in result
+
+    def test_export_soracam_video_cached_after_completion(self) -> None:
+        """完了した動画を保存し、同じ範囲の再エクスポートを省略するケース"""
+        with patch(
+            "soracom_data_mcp.tools.soracam.soracom_client"
+        ) as mock_client:
+            mock_client.post.return_value = {
+                "exportId": "export-456",
+                "status": "processing",
+            }
+            mock_client.get.return_value = {
+                "exportId": "export-456",
+                "status": "completed",
+                "url": "https://download.example.com/video.mp4",
+            }
+            mcp = FastMCP("test")
+            register_soracam_tools(mcp)
+            tools = mcp._tool_manager._tools
+
+            tools["export_soracam_video"].fn(
+                device_id="CAM1", from_time=0, to_time=1000
+            )
+            status = tools["get_soracam_video_export_status"].fn(
+                device_id="CAM1", export_id="export-456"
+            )
+            again = tools["export_soracam_video"].fn(
+                device_id="CAM1", from_time=0, to_time=1000
+            )
+
+            assert status["path"].endswith(".mp4")
+            assert again["cached"] is True
+            assert again["path"] == status["path"]
+            assert mock_client.post.call_count == 1
+
+    def test_export_status_does_not_download_twice(self) -> None:
+        """完了済みの状況を何度取得しても動画は1回だけダウンロードするケース"""
+
+        def download(url: str, destination: Path) -> int:
+            destination.parent.mkdir(parents=True, exist_ok=True)
+            return destination.write_bytes(b"video")
+
+        with (
+            patch("soracom_data_mcp.tools.soracam.soracom_client") as mock_client,
+            patch("soracom_data_mcp.media_cache.soracom_client") as download_client,
+        ):
+            download_client.download_file.side_effect = download
+            mock_client.post.return_value = {
+                "exportId": "export-456",
+                "status": "processing",
+            }
+            mock_client.get.return_value = {
+                "exportId": "export-456",
+                "status": "completed",
+                "url": "https://download.example.com/video.mp4",
+            }
+            mcp = FastMCP("test")
+            register_soracam_tools(mcp)
+            tools = mcp._tool_manager._tools
+
+            tools["export_soracam_video"].fn(
+                device_id="CAM1", from_time=0, to_time=1000
+            )
+            first = tools["get_soracam_video_export_status"].fn(
+                device_id="CAM1", export_id="export-456"
+            )
+            second = tools["get_soracam_video_export_status"].fn(
+                device_id="CAM1", export_id="export-456"
+            )
+
+            assert first["cached"] is False
+            assert second["cached"] is True
+            assert second["path"] == first["path"]
+            assert download_client.download_file.call_count == 1
+
+    def test_store_failure_reported(self) -> None:
+        """ダウンロードに失敗してもエクスポート結果は返すケース"""
+        with (
+            patch("soracom_data_mcp.tools.soracam.soracom_client") as mock_client,
+            patch(
+                "soracom_data_mcp.media_cache.soracom_client"
+            ) as download_client,
+        ):
+            mock_client.post.return_value = {
+                "exportId": "export-123",
+                "status": "completed",
+                "url": "https://download.example.com/image.jpg",
+            }
+            download_client.download_file.side_effect = SoracomApiError(
+                "ダウンロードエラー", 403
+            )
+            mcp = FastMCP("test")
+            register_soracam_tools(mcp)
+
+            tool = mcp._tool_manager._tools["export_soracam_image"]
+            result = tool.fn(device_id="CAM1", timestamp=1000)
+
+            assert result["url"] == "https://download.example.com/image.jpg"
+            assert "403" in result["cache_error"]
+
+
+class TestSoracamSnapshotTools:
+    """ストリーミングURL・カメラ情報のキャッシュと状態変化のテスト"""
+
+    def test_get_soracam_stream_url_cached(self) -> None:
+        """有効期限前のストリーミングURLを再利用するケース"""
+        with patch(
+            "soracom_data_mcp.tools.soracam.soracom_client"
+        ) as mock_client:
+            expires_at = int((time.time() + 600) * 1000)
+            mock_client.get.return_value = {
+                "url": "https://stream.example.com/live",
+                "expiresAt": expires_at,
+            }
+            mcp = FastMCP("test")
+            register_soracam_tools(mcp)
+
+            tool = mcp._tool_manager._tools["get_soracam_stream_url"]
+            first = tool.fn(device_id="CAM1")
+            second = tool.fn(device_id="CAM1")
+            tool.fn(device_id="CAM1", refresh=True)
+
+            assert first["cached"] is False
+            assert second["cached"] is True
+            assert second["url"] == "https://stream.example.com/live"
+            assert mock_client.get.call_count == 2
+
+    def test_get_soracam_stream_url_near_expiry_not_cached(self) -> None:
+        """有効期限間近のストリーミングURLはキャッシュしないケース"""
+        with patch(
+            "soracom_data_mcp.tools.soracam.soracom_client"
+        ) as mock_client:
+            mock_client.get.return_value = {
+                "url": "https://stream.example.com/live",
+                "expiresAt": int((time.time() + 10) * 1000),
+            }
+            mcp = FastMCP("test")
+            register_soracam_tools(mcp)
+
+            tool = mcp._tool_manager._tools["get_soracam_stream_url"]
+            tool.fn(device_id="CAM1")
+            tool.fn(device_id="CAM1")
+
+            assert mock_client.get.call_count == 2
+
+    def test_get_soracam_device_cached(self) -> None:
+        """カメラ詳細情報を短時間キャッシュするケース"""
+        with patch(
+            "soracom_data_mcp.tools.soracam.soracom_client"
+        ) as mock_client:
+            mock_client.get.return_value = {"deviceId": "CAM1", "connected": True}
+            mcp = FastMCP("test")
+            register_soracam_tools(mcp)
+
+            tool = mcp._tool_manager._tools["get_soracam_device"]
+            tool.fn(device_id="CAM1")
+            result = tool.fn(device_id="CAM1")
+
+            assert result["cached"] is True
+            assert result["connected"] is True
+            assert mock_client.get.call_count == 1
+
+    def test_get_soracam_fleet_status_changes(self) -> None:
+        """前回からの接続状態の変化だけを返すケース"""
+        with patch("soracom_data_mcp.soracam_events.soracom_client") as mock_client:
+            mock_client.iter_pages.return_value = [[
+                {"deviceId": "CAM1", "connected": True, "status": "active"},
+                {"deviceId": "CAM2", "connected": True, "status": "active"},
+                {"deviceId": "CAM3", "connected": False, "status": "active"},
+            ]]
+            mcp = FastMCP("test")
+            register_soracam_tools(mcp)
+
+            tool = mcp._tool_manager._tools["get_soracam_fleet_status_changes"]
+            first = tool.fn()
+
+            mock_client.iter_pages.return_value = [[
+                {"deviceId": "CAM1", "connected": False, "status": "active"},
+                {"deviceId": "CAM3", "connected": True, "status": "active"},
+                {"deviceId": "CAM4", "connected": True, "status": "active"},
+            ]]
+            second = tool.fn()
+
+            assert first["previous_taken_at"] is None
+            assert len(first["devices"]) == 3
+            assert second["previous_taken_at"] is not None
+            assert "devices" not in second
+            assert second["connected"] == ["CAM3"]
+            assert second["disconnected"] == ["CAM1"]
+            assert second["added"] == ["CAM4"]
+            assert second["removed"] == ["CAM2"]
+            assert second["connected_count"] == 2
+
+
+class TestCorrelateSoracamEventsWithHarvest:
+    """correlate_soracam_events_with_harvestツールのテスト"""
+
+    def test_returns_matched_pairs(self) -> None:
+        """許容範囲内の組だけを返すケース"""
+        with (
+            patch("soracom_data_mcp.soracam_events.soracom_client") as events_client,
+            patch("soracom_data_mcp.harvest_data.soracom_client") as harvest_client,
+        ):
+            events_client.get_page.return_value = (
+                [
+                    {"eventId": "e1", "eventType": "motion", "time": 10_000},
+                    {"eventId": "e2", "eventType": "motion", "time": 100_000},
+                ],
+                None,
+            )
+            harvest_client.iter_pages.return_value = iter([[
+                {"time": 12_000, "content": '{"door": "open", "battery": 90}'},
+                {"time": 300_000, "content": '{"door": "closed"}'},
+            ]])
+            mcp = FastMCP("test")
+            register_soracam_tools(mcp)
+
+            tool = mcp._tool_manager._tools["correlate_soracam_events_with_harvest"]
+            result = tool.fn(
+                device_id="CAM1",
+                imsi="440000000000001",
+                from_time=0,
+                to_time=400_000,
+                tolerance_seconds=5,
+                fields=["door"],
+            )
+
+        assert result["matched"] == 1
+        assert result["events_scanned"] == 2
+        pair = result["pairs"][0]
+        assert pair["event"]["event_id"] == "e1"
+        assert pair["harvest"] == {"time": 12_000, "content": {"door": "open"}}
+        assert pair["offset_ms"] == 2000
+        params = harvest_client.iter_pages.call_args[1]["params"]
+        assert (params["from"], params["to"]) == (-5000, 405_000)
+
+    def test_limit_truncates(self) -> None:
+        """上限に達した場合に続きの開始時刻を返すケース"""
+        with (
+            patch("soracom_data_mcp.soracam_events.soracom_client") as events_client,
+            patch("soracom_data_mcp.harvest_data.soracom_client") as harvest_client,
+        ):
+            events_client.get_page.return_value = (
+                [{"eventId": f"e{t}", "time": t} for t in (1000, 2000, 3000)],
+                None,
+            )
+            harvest_client.iter_pages.return_value = iter([[
+                {"time": t, "content": "{}"} for t in (1000, 2000, 3000)
+            ]])
+            mcp = FastMCP("test")
+            register_soracam_tools(mcp)
+
+            tool = mcp._tool_manager._tools["correlate_soracam_events_with_harvest"]
+            result = tool.fn(
+                device_id="CAM1",
+                imsi="440000000000001",
+                from_time=0,
+                to_time=5000,
+                limit=2,
+            )
+
+        assert result["matched"] == 2
+        assert result["truncated"] is True
+        assert result["next"] == {"from_time": 2001}
+
+    def test_limit_keeps_same_timestamp(self) -> None:
+        """上限に達しても同じ時刻のイベントは続けて返すケース"""
+        with (
+            patch("soracom_data_mcp.soracam_events.soracom_client") as events_client,
+            patch("soracom_data_mcp.harvest_data.soracom_client") as harvest_client,
+        ):
+            events_client.get_page.return_value = (
+                [
+                    {"eventId": f"e{i}", "time": t}
+                    for i, t in enumerate((1000, 2000, 2000, 3000))
+                ],
+                None,
+            )
+            harvest_client.iter_pages.return_value = iter([[
+                {"time": t, "content": "{}"} for t in (1000, 2000, 3000)
+            ]])
+            mcp = FastMCP("test")
+            register_soracam_tools(mcp)
+
+            tool = mcp._tool_manager._tools["correlate_soracam_events_with_harvest"]
+            result = tool.fn(
+                device_id="CAM1",
+                imsi="440000000000001",
+                from_time=0,
+                to_time=5000,
+                limit=2,
+            )
+
+        assert [p["event"]["event_id"] for p in result["pairs"]] == ["e0", "e1", "e2"]
+        assert result["truncated"] is True
+        assert result["next"] == {"from_time": 2001}
+
+    def test_invalid_direction(self) -> None:
+        """不正な方向のケース"""
+        mcp = FastMCP("test")
+        register_soracam_tools(mcp)
+
+        tool = mcp._tool_manager._tools["correlate_soracam_events_with_harvest"]
+        result = tool.fn(
+            device_id="CAM1", imsi="1", from_time=0, to_time=1, direction="up"
+        )
+
+        assert "error" in result
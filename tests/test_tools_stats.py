@@ -6,6 +6,7 @@ from unittest.mock import patch
 from fastmcp import FastMCP
 
 from soracom_data_mcp.client import SoracomApiError
+from soracom_data_mcp.inventory import SubscriberInventory
 from soracom_data_mcp.tools.stats import register_stats_tools
 
 
@@ -190,7 +191,7 @@ class TestStatsTools:
     ) -> None:
         """get_air_stats成功ケース"""
         with patch(
-            "soracom_data_mcp.tools.stats.soracom_client"
+            "soracom_data_mcp.air_stats.soracom_client"
         ) as mock_client:
             mock_client.get.return_value = sample_air_stats_response
             mcp = FastMCP("test")
@@ -213,7 +214,7 @@ class TestStatsTools:
     def test_get_air_stats_with_period(self) -> None:
         """get_air_stats期間指定ケース"""
         with patch(
-            "soracom_data_mcp.tools.stats.soracom_client"
+            "soracom_data_mcp.air_stats.soracom_client"
         ) as mock_client:
             mock_client.get.return_value = []
             mcp = FastMCP("test")
@@ -234,7 +235,7 @@ class TestStatsTools:
     def test_get_air_stats_error(self) -> None:
         """get_air_statsエラーケース"""
         with patch(
-            "soracom_data_mcp.tools.stats.soracom_client"
+            "soracom_data_mcp.air_stats.soracom_client"
         ) as mock_client:
             mock_client.get.side_effect = SoracomApiError("Not found", 404)
             mcp = FastMCP("test")
@@ -242,7 +243,7 @@ class TestStatsTools:
 
             tool = mcp._tool_manager._tools["get_air_stats"]
             result = tool.fn(
-                imsi="invalid",
+                imsi="440000000000999",
                 from_time=1609459200,
                 to_time=1609545600,
             )
@@ -302,3 +303,268 @@ class TestStatsTools:
                 params={"from": 1609459200, "to": 1609545600, "period": "month"},
             )
 
+
+class TestFleetAirUsage:
+    """get_fleet_air_usageツールのテスト"""
+
+    def test_aggregates_fleet_usage(self) -> None:
+        """合計・グループ別・上位SIMの集計ケース（エラー混在）"""
+
+        def get(path: str, params: dict[str, Any]) -> list[dict[str, Any]]:
+            imsi = path.rsplit("/", 1)[-1]
+            if imsi == "3":
+                raise SoracomApiError("Forbidden", 403)
+            size = int(imsi) * 100
+            return [
+                {"uploadByteSizeTotal": size, "downloadByteSizeTotal": size},
+                {"uploadByteSizeTotal": size, "downloadByteSizeTotal": 0},
+            ]
+
+        with (
+            patch("soracom_data_mcp.subscribers.soracom_client") as sub_client,
+            patch("soracom_data_mcp.air_stats.soracom_client") as stats_client,
+        ):
+            sub_client.iter_pages.return_value = iter([[
+                {"imsi": "1", "groupId": "g1", "tags": {"name": "one"}},
+                {"imsi": "2", "groupId": "g1"},
+                {"imsi": "3", "groupId": "g2"},
+                {"imsi": "4"},
+            ]])
+            stats_client.get.side_effect = get
+            mcp = FastMCP("test")
+            register_stats_tools(mcp)
+
+            tool = mcp._tool_manager._tools["get_fleet_air_usage"]
+            result = tool.fn(from_time=0, to_time=86400, top_n=2)
+
+        assert result["sim_count"] == 4
+        assert result["totals"]["total_bytes"] == 300 * 7
+        assert result["groups"] == [
+            {
+                "group_id": None,
+                "sim_count": 1,
+                "upload_bytes": 800,
+                "download_bytes": 400,
+                "upload_packets": 0,
+                "download_packets": 0,
+                "total_bytes": 1200,
+            },
+            {
+                "group_id": "g1",
+                "sim_count": 2,
+                "upload_bytes": 600,
+                "download_bytes": 300,
+                "upload_packets": 0,
+                "download_packets": 0,
+                "total_bytes": 900,
+            },
+        ]
+        assert [sim["imsi"] for sim in result["top_consumers"]] == ["4", "2"]
+        assert result["error_count"] == 1
+        assert result["errors"][0]["imsi"] == "3"
+
+    def test_subscriber_listing_error(self) -> None:
+        """SIM一覧の取得に失敗したケース"""
+        with patch("soracom_data_mcp.subscribers.soracom_client") as sub_client:
+            sub_client.iter_pages.side_effect = SoracomApiError("Unauthorized", 401)
+            mcp = FastMCP("test")
+            register_stats_tools(mcp)
+
+            tool = mcp._tool_manager._tools["get_fleet_air_usage"]
+            result = tool.fn(from_time=0, to_time=86400)
+
+        assert "error" in result
+
+
+class TestSubscriberInventoryTools:
+    """SIMインベントリツールのテスト"""
+
+    def test_search_syncs_once(self) -> None:
+        """未同期の場合だけ同期してから検索することを確認"""
+        with patch("soracom_data_mcp.inventory.soracom_client") as mock_client:
+            mock_client.iter_pages.side_effect = lambda *args, **kwargs: iter([[
+                {"imsi": "1", "status": "active", "tags": {"name": "a"}},
+                {"imsi": "2", "status": "inactive", "tags": {"name": "b"}},
+            ]])
+            mcp = FastMCP("test")
+            register_stats_tools(mcp)
+
+            tool = mcp._tool_manager._tools["search_subscribers_local"]
+            result = tool.fn(status="active")
+            tool.fn(tags={"name": "b"})
+
+        assert mock_client.iter_pages.call_count == 1
+        assert result["total"] == 1
+        assert result["subscribers"][0]["imsi"] == "1"
+        assert result["synced_at"] is not None
+
+    def test_sync_error(self) -> None:
+        """同期の失敗時にエラーを返すことを確認"""
+        with patch("soracom_data_mcp.inventory.soracom_client") as mock_client:
+            mock_client.iter_pages.side_effect = SoracomApiError(500, "Server Error")
+            mcp = FastMCP("test")
+            register_stats_tools(mcp)
+
+            tool = mcp._tool_manager._tools["sync_subscriber_inventory"]
+            result = tool.fn()
+
+        assert "error" in result
+
+
+class TestSubscriberNameResolution:
+    """SIMの名前からIMSIを解決するツールのテスト"""
+
+    @staticmethod
+    def _sync(inventory: SubscriberInventory) -> None:
+        with patch("soracom_data_mcp.inventory.soracom_client") as mock_client:
+            mock_client.iter_pages.return_value = iter([[
+                {"imsi": "440000000000001", "tags": {"name": "door-sensor"}},
+                {"imsi": "440000000000002", "tags": {"name": "door-camera"}},
+            ]])
+            inventory.sync()
+
+    def test_air_stats_by_name(self, inventory: SubscriberInventory) -> None:
+        """名前を指定するとIMSIに変換してAPIを呼ぶことを確認"""
+        self._sync(inventory)
+        with patch("soracom_data_mcp.air_stats.soracom_client") as mock_client:
+            mock_client.get.return_value = []
+            mcp = FastMCP("test")
+            register_stats_tools(mcp)
+
+            tool = mcp._tool_manager._tools["get_air_stats"]
+            result = tool.fn(imsi="Door-Sensor", from_time=0, to_time=1)
+
+        assert result["imsi"] == "440000000000001"
+        assert mock_client.get.call_args[0][0] == (
+            "/stats/air/subscribers/440000000000001"
+        )
+
+    def test_resolve_subscribers(self, inventory: SubscriberInventory) -> None:
+        """前方一致で候補を返すことを確認"""
+        self._sync(inventory)
+        mcp = FastMCP("test")
+        register_stats_tools(mcp)
+
+        tool = mcp._tool_manager._tools["resolve_subscribers"]
+        result = tool.fn(query="door", match_mode="prefix")
+
+        assert result["count"] == 2
+        assert result["matches"][0] == {
+            "value": "door-camera",
+            "imsis": ["440000000000002"],
+        }
+        assert "error" in tool.fn(query="door", match_mode="regex")
+
+
+class TestAirStatsRollup:
+    """get_air_statsの時単位の合計のテスト"""
+
+    def test_rollup_hours(self) -> None:
+        """period=minutes の統計を1時間ごとに合計することを確認"""
+        with patch("soracom_data_mcp.air_stats.soracom_client") as mock_client:
+            mock_client.get.return_value = [
+                {"date": "202401010000", "uploadByteSizeTotal": 1},
+                {"date": "202401010030", "uploadByteSizeTotal": 2},
+            ]
+            mcp = FastMCP("test")
+            register_stats_tools(mcp)
+
+            tool = mcp._tool_manager._tools["get_air_stats"]
+            result = tool.fn(
+                imsi="440103012345678",
+                from_time=0,
+                to_time=3600,
+                period="minutes",
+                rollup_hours=True,
+            )
+
+        assert result["period"] == "hour"
+        assert result["stats"] == [{
+            "date": "2024010100",
+            "upload_bytes": 3,
+            "download_bytes": 0,
+            "upload_packets": 0,
+            "download_packets": 0,
+        }]
+
+
+class TestGroupUsageRollup:
+    """get_group_usage_rollupツールのテスト"""
+
+    def test_rollup(self, inventory: SubscriberInventory) -> None:
+        """インベントリのグループごとに合計と分布を返し、確定した統計を再利用することを確認"""
+        with patch("soracom_data_mcp.inventory.soracom_client") as mock_client:
+            mock_client.iter_pages.return_value = iter([[
+                {"imsi": "1", "groupId": "g1"},
+                {"imsi": "2", "groupId": "g1"},
+                {"imsi": "3"},
+            ]])
+            inventory.sync()
+
+        usage = {"1": 100, "2": 300, "3": 50}
+
+        def air_get(path: str, params: dict[str, Any]) -> list[dict[str, Any]]:
+            imsi = path.rsplit("/", 1)[1]
+            return [{"date": "20240101", "downloadByteSizeTotal": usage[imsi]}]
+
+        with (
+            patch("soracom_data_mcp.air_stats.soracom_client") as air_client,
+            patch("soracom_data_mcp.harvest_stats.soracom_client") as harvest_client,
+        ):
+            air_client.get.side_effect = air_get
+            harvest_client.get.return_value = [{"date": "20240101", "count": 2}]
+            mcp = FastMCP("test")
+            register_stats_tools(mcp)
+
+            tool = mcp._tool_manager._tools["get_group_usage_rollup"]
+            result = tool.fn(from_time=0, to_time=86400)
+            again = tool.fn(from_time=0, to_time=86400)
+
+        assert result["sim_count"] == 3
+        g1, ungrouped = result["groups"]
+        assert g1["group_id"] == "g1"
+        assert g1["sim_count"] == 2
+        assert g1["total_bytes"] == 400
+        assert g1["harvest_count"] == 4
+        assert g1["per_sim"]["total_bytes"]["max"] == 300
+        assert ungrouped["group_id"] is None
+        assert result["cached_stats"] == 0
+        assert again["cached_stats"] == 6
+        assert air_client.get.call_count == 3
+
+
+class TestSubscriberConnectivityChanges:
+    """get_subscriber_connectivity_changesツールのテスト"""
+
+    def test_changes_since_previous_snapshot(self) -> None:
+        """前回の一覧からの接続状態の変化だけを返すことを確認"""
+        pages = [
+            [
+                {"imsi": "1", "status": "active", "sessionStatus": {"online": True}},
+                {"imsi": "2", "status": "active", "sessionStatus": {"online": False}},
+                {"imsi": "3", "status": "active"},
+            ],
+            [
+                {"imsi": "1", "status": "active", "sessionStatus": {"online": False}},
+                {"imsi": "2", "status": "active", "sessionStatus": {"online": True}},
+                {"imsi": "4", "status": "inactive"},
+            ],
+        ]
+        with patch("soracom_data_mcp.subscribers.soracom_client") as mock_client:
+            mock_client.iter_pages.side_effect = [iter([page]) for page in pages]
+            mcp = FastMCP("test")
+            register_stats_tools(mcp)
+
+            tool = mcp._tool_manager._tools["get_subscriber_connectivity_changes"]
+            first = tool.fn()
+            second = tool.fn()
+
+        assert first["previous_taken_at"] is None
+        assert first["online_count"] == 1
+        assert first["added"] == ["1", "2", "3"]
+        assert second["previous_taken_at"] is not None
+        assert second["came_online"] == ["2"]
+        assert second["went_offline"] == ["1"]
+        assert second["added"] == ["4"]
+        assert second["removed"] == ["3"]
+        assert second["change_counts"]["status_changed"] == 0